@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, Depends, Body, Request
+from typing import Dict, Any
+from app.api.auth import get_current_admin
+from app.services.cache_maintenance import cache_maintenance
+from app.services.scheduler import scraping_scheduler
+from app.services.profiling import profile_store, request_profiler
+import asyncio
+
+router = APIRouter()
+
+@router.get("/cache/stats", response_model=Dict[str, Any])
+async def cache_stats(current_user: Dict = Depends(get_current_admin)):
+    try:
+        return cache_maintenance.report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve cache stats: {str(e)}")
+
+@router.post("/cache/sweep", response_model=Dict[str, Any])
+async def cache_sweep(current_user: Dict = Depends(get_current_admin)):
+    return await asyncio.to_thread(cache_maintenance.sweep)
+
+@router.get("/scheduler", response_model=Dict[str, Any])
+async def scheduler_stats(current_user: Dict = Depends(get_current_admin)):
+    return scraping_scheduler.stats()
+
+@router.put("/scheduler/weights/{user_id}", response_model=Dict[str, Any])
+async def set_scheduler_weight(
+    user_id: str,
+    weight: float = Body(..., embed=True),
+    current_user: Dict = Depends(get_current_admin)
+):
+    try:
+        scraping_scheduler.set_weight(user_id, weight)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return {"user_id": user_id, "weight": weight}
+
+@router.get("/startup", response_model=Dict[str, Any])
+async def startup_timings(request: Request, current_user: Dict = Depends(get_current_admin)):
+    timings = getattr(request.app.state, "startup_timings", {})
+    return {"phases_ms": timings, "total_ms": round(sum(timings.values()), 1)}
+
+@router.get("/profiles", response_model=Dict[str, Any])
+async def list_profiles(current_user: Dict = Depends(get_current_admin)):
+    return {
+        "profiles": profile_store.list(),
+        "sample_rates": request_profiler.sample_rates,
+        "default_sample_rate": request_profiler.default_sample_rate
+    }
+
+@router.get("/profiles/{profile_id}", response_model=Dict[str, Any])
+async def get_profile(profile_id: str, current_user: Dict = Depends(get_current_admin)):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.to_dict()
+
+@router.delete("/profiles", response_model=Dict[str, Any])
+async def clear_profiles(current_user: Dict = Depends(get_current_admin)):
+    profile_store.clear()
+    return {"message": "Profiles cleared"}
+
+@router.put("/profiles/sampling/{endpoint_url}", response_model=Dict[str, Any])
+async def set_profile_sample_rate(
+    endpoint_url: str,
+    rate: float = Body(..., embed=True),
+    current_user: Dict = Depends(get_current_admin)
+):
+    try:
+        request_profiler.set_sample_rate(endpoint_url, rate)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return {"endpoint_url": endpoint_url, "rate": rate}
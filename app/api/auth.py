@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
@@ -6,6 +6,7 @@ from datetime import timedelta
 from jose import JWTError, jwt
 from app.core.config import settings
 from app.db.database import supabase
+from app.db.storage import storage
 from app.core.security import create_access_token, verify_password, get_password_hash
 
 router = APIRouter()
@@ -46,21 +47,36 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user(email=token_data.email)
+    user = await get_user(email=token_data.email)
     if user is None:
         raise credentials_exception
     return user
 
-def get_user(email: str):
-    user = supabase.table("users").select("*").eq("email", email).execute()
-    if user.data:
-        print(user.data[0])
-        return UserInDB(**user.data[0])
+async def get_current_admin(current_user: UserInDB = Depends(get_current_user)):
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
+async def is_admin_request(request: Request) -> bool:
+    """Whether the request carries an admin bearer token. Never rejects the request itself."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        await get_current_admin(await get_current_user(token))
+    except HTTPException:
+        return False
+    return True
+
+async def get_user(email: str):
+    user = await storage.get_user_by_email(email)
+    if user is not None:
+        return UserInDB(**user)
     return None
 
 @router.post("/register", response_model=User)
 async def register(user: UserCreate):
-    db_user = get_user(user.email)
+    db_user = await get_user(user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     hashed_password = get_password_hash(user.password)
@@ -73,7 +89,7 @@ async def register(user: UserCreate):
 
 @router.post("/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = get_user(form_data.username)
+    user = await get_user(form_data.username)
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,32 +1,91 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, HttpUrl, Field, ValidationError, model_validator
+from typing import Dict, Any, List, Literal, Optional
 from app.db.database import (
     create_crawl_configuration,
     get_crawl_configurations,
+    get_recent_performance_metrics,
+    get_recent_error_logs,
     supabase,
 )
+from app.db.pagination import split_page
+from app.api.streaming import parse_fields, stream_page, iter_ndjson
+from app.core.config import settings
 from app.api.auth import get_current_user
 from app.services.scraping_service import validate_url, scrape_url
+from app.services.metrics import metrics_registry
+from app.services.routing import routing_table
+from app.services.bulk_configurations import parse_bulk_payload, write_configurations
+from app.services.crawler import crawl_jobs
+from app.services.scheduler import scraping_scheduler, QueueFullError, INTERACTIVE
+from app.services.history import history_store
+from app.services.url_frontier import normalize_url
+from app.services.render_profiles import DEFAULT_RENDER_PROFILE, RESOURCE_TYPES, WAIT_STRATEGIES
+from app.db.database import list_scraping_history
 import time
 
 router = APIRouter()
 
+class CrawlSettings(BaseModel):
+    max_depth: int = Field(default=2, ge=0, le=20)
+    max_pages: int = Field(default=100, ge=1, le=1_000_000)
+    same_site: bool = Field(default=True)
+    include_patterns: List[str] = Field(default=[])
+    exclude_patterns: List[str] = Field(default=[])
+    concurrency: int = Field(default=4, ge=1, le=32)
+
+class RenderProfile(BaseModel):
+    blocked_resource_types: List[Literal[RESOURCE_TYPES]] = Field(default=DEFAULT_RENDER_PROFILE["blocked_resource_types"])
+    blocked_domains: List[str] = Field(default=DEFAULT_RENDER_PROFILE["blocked_domains"])
+    wait_until: Literal[WAIT_STRATEGIES] = Field(default="domcontentloaded")
+    wait_for_selector: Optional[str] = Field(default=None)
+    viewport_width: int = Field(default=1280, ge=320, le=3840)
+    viewport_height: int = Field(default=720, ge=240, le=2160)
+    javascript: bool = Field(default=True)
+    max_script_bytes: Optional[int] = Field(default=None, ge=0)
+    timeout_ms: int = Field(default=30000, ge=1000, le=120000)
+
+    @model_validator(mode="after")
+    def check_wait_selector(self) -> "RenderProfile":
+        if self.wait_until == "selector" and not self.wait_for_selector:
+            raise ValueError("wait_for_selector is required when wait_until is 'selector'")
+        return self
+
 class CrawlConfigurationCreate(BaseModel):
     name: str
     url: HttpUrl
     selectors: Dict[str, str]
+    crawl_settings: Optional[CrawlSettings] = Field(default=None)
+    render_profile: Optional[RenderProfile] = Field(default=None)
 
 class CrawlConfigurationUpdate(BaseModel):
     name: Optional[str] = Field(default=None)
     url: Optional[HttpUrl] = Field(default=None)
     selectors: Optional[Dict[str, str]] = Field(default=None)
+    crawl_settings: Optional[CrawlSettings] = Field(default=None)
+    render_profile: Optional[RenderProfile] = Field(default=None)
+
+class CrawlConfigurationImport(CrawlConfigurationCreate):
+    id: Optional[str] = Field(default=None)
+
+class BulkImportError(BaseModel):
+    index: int
+    error: str
+
+class BulkImportResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: List[BulkImportError]
 
 class CrawlConfigurationResponse(BaseModel):
     id: str
     name: str
     url: HttpUrl
     selectors: Dict[str, str]
+    crawl_settings: Optional[Dict[str, Any]] = Field(default=None)
+    render_profile: Optional[Dict[str, Any]] = Field(default=None)
     created_at: str
     updated_at: str
 
@@ -43,7 +102,9 @@ async def create_configuration(
             user_id=current_user.id,
             name=config.name,
             url=str(config.url),
-            selectors=config.selectors
+            selectors=config.selectors,
+            crawl_settings=config.crawl_settings.dict() if config.crawl_settings else None,
+            render_profile=config.render_profile.dict() if config.render_profile else None
         )
         print("OKOKOKOKOK")
         if new_config.data and len(new_config.data) > 0:
@@ -53,13 +114,76 @@ async def create_configuration(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create configuration: {str(e)}")
 
-@router.get("/configurations", response_model=List[CrawlConfigurationResponse])
-async def get_configurations(current_user: Dict = Depends(get_current_user)):
+@router.get("/configurations")
+async def get_configurations(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
     try:
-        configs = get_crawl_configurations(user_id=current_user.id)
-        return [CrawlConfigurationResponse(**config) for config in configs.data]
+        configs = get_crawl_configurations(user_id=current_user.id, fields=parse_fields(fields), cursor=cursor, limit=limit)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve configurations: {str(e)}")
+    rows, next_cursor = split_page(configs.data, limit)
+    return stream_page(request, rows, next_cursor)
+
+@router.post("/configurations/bulk", response_model=BulkImportResponse)
+async def bulk_import_configurations(request: Request, current_user: Dict = Depends(get_current_user)):
+    try:
+        rows = parse_bulk_payload(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_IMPORT_MAX_ROWS} configurations per import")
+
+    # Validate every row up front so no database work is done for bad rows
+    valid, errors = [], []
+    for index, row in rows:
+        if isinstance(row, ValueError):
+            errors.append({"index": index, "error": str(row)})
+            continue
+        try:
+            config = CrawlConfigurationImport.model_validate(row)
+        except ValidationError as ve:
+            errors.append({"index": index, "error": str(ve)})
+            continue
+        if not validate_url(str(config.url)):
+            errors.append({"index": index, "error": "Invalid URL"})
+            continue
+        # Bulk writes need every row in a chunk to carry the same columns
+        row = config.model_dump(mode="json")
+        if row["id"] is None:
+            del row["id"]
+        valid.append((index, row))
+
+    report = write_configurations(current_user.id, valid, settings.BULK_WRITE_CHUNK_SIZE)
+    for updated in report.pop("updated_rows"):
+        routing_table.update_configuration(updated)
+    report["failed"] += len(errors)
+    report["errors"] = sorted(errors + report["errors"], key=lambda error: error["index"])
+    return report
+
+@router.get("/configurations/export")
+async def export_configurations(fields: Optional[str] = None, current_user: Dict = Depends(get_current_user)):
+    fields = parse_fields(fields)
+    try:
+        first_page = get_crawl_configurations(user_id=current_user.id, fields=fields, limit=settings.BULK_WRITE_CHUNK_SIZE)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    def iter_configurations():
+        rows, cursor = split_page(first_page.data, settings.BULK_WRITE_CHUNK_SIZE)
+        yield from rows
+        while cursor is not None:
+            page = get_crawl_configurations(user_id=current_user.id, fields=fields, cursor=cursor, limit=settings.BULK_WRITE_CHUNK_SIZE)
+            rows, cursor = split_page(page.data, settings.BULK_WRITE_CHUNK_SIZE)
+            yield from rows
+
+    return StreamingResponse(iter_ndjson(iter_configurations()), media_type="application/x-ndjson")
 
 @router.put("/configurations/{config_id}", response_model=CrawlConfigurationResponse)
 async def update_configuration(
@@ -73,10 +197,13 @@ async def update_configuration(
             raise HTTPException(status_code=404, detail="Configuration not found")
         
         update_data = config_update.dict(exclude_unset=True)
+        if "url" in update_data:
+            update_data["url"] = str(update_data["url"])
         if "url" in update_data and not validate_url(str(update_data["url"])):
             raise HTTPException(status_code=400, detail="Invalid URL")
         
         updated_config = supabase.table("crawl_configurations").update(update_data).eq("id", config_id).execute()
+        routing_table.update_configuration(updated_config.data[0])
         return CrawlConfigurationResponse(**updated_config.data[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update configuration: {str(e)}")
@@ -89,6 +216,7 @@ async def delete_configuration(config_id: str, current_user: Dict = Depends(get_
             raise HTTPException(status_code=404, detail="Configuration not found")
         
         supabase.table("crawl_configurations").delete().eq("id", config_id).execute()
+        routing_table.invalidate_configuration(config_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete configuration: {str(e)}")
 
@@ -99,25 +227,147 @@ async def test_configuration(config_id: str, current_user: Dict = Depends(get_cu
         if not config.data:
             raise HTTPException(status_code=404, detail="Configuration not found")
         
-        start_time = time.time()
-        result = scrape_url(config.data["url"], config.data["selectors"])
-        end_time = time.time()
+        async with scraping_scheduler.slot(current_user.id, INTERACTIVE) as queue_wait:
+            start_time = time.time()
+            result = await scrape_url(config.data["url"], config.data["selectors"], config.data.get("render_profile"))
+            end_time = time.time()
         
         execution_time = end_time - start_time
+        render = result.get("metadata", {}).get("render", {})
         supabase.table("performance_metrics").insert({
             "configuration_id": config_id,
             "execution_time": execution_time,
-            "memory_usage": None  # You might want to implement memory usage tracking
+            "memory_usage": None,  # You might want to implement memory usage tracking
+            "bytes_transferred": render.get("bytes_transferred"),
+            "render_time": render.get("render_time"),
+            "queue_wait": queue_wait
         }).execute()
+        metrics_registry.record(config_id, execution_time)
         
         return {
             "result": result,
             "execution_time": execution_time
         }
+    except QueueFullError as qe:
+        raise HTTPException(status_code=429, detail=str(qe))
     except Exception as e:
+        metrics_registry.record(config_id, None, error=True)
         supabase.table("error_logs").insert({
             "configuration_id": config_id,
             "error_message": str(e),
             "stack_trace": None  # You might want to implement stack trace capturing
         }).execute()
         raise HTTPException(status_code=500, detail=f"Configuration test failed: {str(e)}")
+
+def _get_owned_configuration_id(config_id: str, user_id: str) -> str:
+    # limit(1) rather than single(), which raises instead of returning no rows
+    config = supabase.table("crawl_configurations").select("id").eq("id", config_id).eq("user_id", user_id).limit(1).execute()
+    if not config.data:
+        raise HTTPException(status_code=404, detail="Configuration not found")
+    return config.data[0]["id"]
+
+@router.get("/configurations/{config_id}/metrics")
+async def get_configuration_metrics(
+    config_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    _get_owned_configuration_id(config_id, current_user.id)
+    try:
+        metrics = get_recent_performance_metrics(config_id, limit=limit, fields=parse_fields(fields), cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    rows, next_cursor = split_page(metrics.data, limit)
+    return stream_page(request, rows, next_cursor)
+
+@router.get("/configurations/{config_id}/errors")
+async def get_configuration_errors(
+    config_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    _get_owned_configuration_id(config_id, current_user.id)
+    try:
+        errors = get_recent_error_logs(config_id, limit=limit, fields=parse_fields(fields), cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    rows, next_cursor = split_page(errors.data, limit)
+    return stream_page(request, rows, next_cursor)
+
+@router.post("/configurations/{config_id}/crawl", response_model=Dict[str, Any])
+async def start_crawl(
+    config_id: str,
+    crawl_settings: Optional[CrawlSettings] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    config = supabase.table("crawl_configurations").select("*").eq("id", config_id).eq("user_id", current_user.id).limit(1).execute()
+    if not config.data:
+        raise HTTPException(status_code=404, detail="Configuration not found")
+    config = config.data[0]
+
+    if crawl_settings is None:
+        crawl_settings = CrawlSettings(**(config.get("crawl_settings") or {}))
+    job = crawl_jobs.start(config, current_user.id, crawl_settings.dict())
+    return job.to_dict()
+
+@router.get("/crawl-jobs", response_model=List[Dict[str, Any]])
+async def list_crawl_jobs(current_user: Dict = Depends(get_current_user)):
+    return [job.to_dict() for job in crawl_jobs.list(current_user.id)]
+
+@router.get("/crawl-jobs/{job_id}", response_model=Dict[str, Any])
+async def get_crawl_job(job_id: str, current_user: Dict = Depends(get_current_user)):
+    job = crawl_jobs.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    return job.to_dict()
+
+def _history_source(config_id: str, user_id: str, source_url: Optional[str]) -> str:
+    config = supabase.table("crawl_configurations").select("id,url").eq("id", config_id).eq("user_id", user_id).limit(1).execute()
+    if not config.data:
+        raise HTTPException(status_code=404, detail="Configuration not found")
+    url = source_url or config.data[0]["url"]
+    return normalize_url(url) or url
+
+@router.get("/configurations/{config_id}/history", response_model=List[Dict[str, Any]])
+async def get_configuration_history(
+    config_id: str,
+    source_url: Optional[str] = None,
+    before_version: Optional[int] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_user: Dict = Depends(get_current_user)
+):
+    source = _history_source(config_id, current_user.id, source_url)
+    return list_scraping_history(config_id, source, limit=limit, before_version=before_version).data
+
+@router.get("/configurations/{config_id}/history/diff", response_model=List[Dict[str, Any]])
+async def diff_configuration_history(
+    config_id: str,
+    from_version: int,
+    to_version: int,
+    source_url: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    source = _history_source(config_id, current_user.id, source_url)
+    try:
+        return history_store.diff(config_id, source, from_version, to_version)
+    except LookupError as le:
+        raise HTTPException(status_code=404, detail=str(le))
+
+@router.get("/configurations/{config_id}/history/{version}")
+async def get_configuration_history_version(
+    config_id: str,
+    version: int,
+    source_url: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    source = _history_source(config_id, current_user.id, source_url)
+    try:
+        return {"version": version, "result": history_store.reconstruct(config_id, source, version)}
+    except LookupError as le:
+        raise HTTPException(status_code=404, detail=str(le))
@@ -1,22 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl, Field
-from typing import Dict, Any, Optional
+from postgrest.exceptions import APIError
+from typing import Dict, Any, List, Optional
 from app.db.database import (
-    create_custom_endpoint, get_custom_endpoint, get_crawl_configurations,
-    get_cache, set_cache, create_performance_metric, create_error_log,
-    get_recent_performance_metrics, get_recent_error_logs
+    create_custom_endpoint, create_performance_metric, create_error_log, get_hot_cache_entries
 )
-from app.api.auth import get_current_user
+from app.db.storage import storage
+from app.api.auth import get_current_user, is_admin_request
 from app.services.scraping_service import scrape_url
 from app.services.data_processing import process_and_validate_data
+from app.services.metrics import metrics_registry, health_status
+from app.services.routing import routing_table, Route, owns
+from app.services.cache_maintenance import cache_maintenance
+from app.services.response_encoding import EncodedResponse, encoded_responses, encode_json, etag_matches
+from app.services.chunked_results import ResultLayout, ResultSlice, records_at, result_chunks, split_result, with_records
+from app.services.events import event_broker
+from app.services.shared_state import shared_responses
+from app.services.scheduler import scraping_scheduler, QueueFullError, INTERACTIVE
+from app.services.profiling import request_profiler, phase
+from app.api.responses import cached_json_response, encoded_json_response, not_modified_response, page_json_response
+from app.api.streaming import parse_fields
 from app.core.config import settings
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.core.rate_limit import limiter
+import asyncio
 import time
 from datetime import datetime, timedelta
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 class CustomEndpointCreate(BaseModel):
     configuration_id: str
@@ -37,6 +48,14 @@ async def create_dynamic_endpoint(
     endpoint: CustomEndpointCreate,
     current_user: Dict = Depends(get_current_user)
 ):
+    # Endpoints are public, so they may only publish their owner's configurations
+    try:
+        configuration = await storage.get_crawl_configuration(endpoint.configuration_id)
+    except (ValueError, APIError):
+        # An id that is not a UUID: postgres rejects it, PostgREST reports it
+        configuration = None
+    if not owns({"user_id": current_user.id}, configuration):
+        raise HTTPException(status_code=404, detail="Configuration not found")
     try:
         new_endpoint = create_custom_endpoint(
             user_id=current_user.id,
@@ -45,101 +64,321 @@ async def create_dynamic_endpoint(
             schema=endpoint.data_schema,
             transformations=endpoint.transformations
         )
+        routing_table.invalidate_endpoint(endpoint.endpoint_url)
         return CustomEndpointResponse(**new_endpoint.data[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create custom endpoint: {str(e)}")
 
-@router.get("/{endpoint_url}")
-@limiter.limit("10/minute")
-async def dynamic_endpoint(endpoint_url: str, request: Request):
-    print(11)
-    try:
-        endpoint = get_custom_endpoint(endpoint_url)
-        print(endpoint.data)
-        if not endpoint.data:
-            raise HTTPException(status_code=404, detail="Endpoint not found")
-
-        config = get_crawl_configurations(endpoint.data.get("user_id"))
-        if not config.data:
-            raise HTTPException(status_code=404, detail="Configuration not found")
-
-        # Implement caching
-        
-        cache_key = f"{endpoint_url}:{request.query_params}"
-        print(cache_key)
-        cached_result = get_cache(endpoint.data["configuration_id"], cache_key)
-        print(cached_result.data)
-        if cached_result.data:
-            print("cached data found")
-            return cached_result.data["cache_value"]
-
-        start_time = time.time()
-
-        print(start_time)
+def result_cache_key(endpoint_url: str) -> str:
+    # One cached result per endpoint; slicing and projection happen on read
+    return f"{endpoint_url}:"
 
-        print(config.data)
-        print(config.data[0]["url"])
-        print(config.data[0]["selectors"])
+def _etag_key(configuration_id: str, cache_key: str) -> str:
+    return f"etag:{configuration_id}:{cache_key}"
 
-        print(endpoint.data["configuration_id"])
+def shared_cached_response(configuration_id: str, cache_key: str) -> Optional[EncodedResponse]:
+    """Current result as published by any worker on this host, without a database read."""
+    etag = shared_responses.get(_etag_key(configuration_id, cache_key))
+    encoded = encoded_responses.get(etag.decode("ascii")) if etag else None
+    if encoded is not None:
+        cache_maintenance.note_key_access(configuration_id, cache_key)
+    return encoded
 
-        raw_result = await scrape_url(config.data[0]["url"], config.data[0]["selectors"])
-        print(raw_result)
+async def refresh_endpoint(route: Route, cache_key: str) -> EncodedResponse:
+    """Scrape, process and cache a route's result, recording metrics on the way."""
+    try:
+        # Endpoint traffic counts against the owner's share of scraping capacity
+        async with scraping_scheduler.slot(route.user_id, INTERACTIVE) as queue_wait:
+            start_time = time.time()
+            with phase("scrape"):
+                raw_result = await scrape_url(
+                    route.configuration["url"], route.configuration["selectors"], route.configuration.get("render_profile")
+                )
         # Process and validate the scraped data
-        processed_result = process_and_validate_data(
-            raw_result,
-            endpoint.data["data_schema"],
-            endpoint.data["transformations"]
-        )
+        with phase("process"):
+            processed_result = process_and_validate_data(
+                raw_result,
+                route.pipeline.schema,
+                route.pipeline.transformations
+            )
         
         end_time = time.time()
 
         execution_time = end_time - start_time
+        render = raw_result.get("metadata", {}).get("render", {})
         create_performance_metric(
-            configuration_id=endpoint.data["configuration_id"],
+            configuration_id=route.configuration_id,
             execution_time=execution_time,
-            memory_usage=None  # Implement memory usage tracking if needed
+            memory_usage=None,  # Implement memory usage tracking if needed
+            bytes_transferred=render.get("bytes_transferred"),
+            render_time=render.get("render_time"),
+            queue_wait=queue_wait
         )
+        metrics_registry.record(route.configuration_id, execution_time)
 
-        # Cache the processed result
-        set_cache(
-            configuration_id=endpoint.data["configuration_id"],
-            cache_key=cache_key,
-            cache_value=processed_result,
-            expires_at=(datetime.utcnow() + timedelta(minutes=15)).isoformat()
-        )
-
-        return processed_result
+        # Cache the processed result together with its ETag
+        with phase("encode"):
+            encoded = encoded_responses.put(EncodedResponse(encode_json(processed_result)))
+        with phase("cache_write"):
+            await store_result(route.configuration_id, cache_key, processed_result, encoded)
+        cache_maintenance.note_write(route.configuration_id)
+        try:
+            # Same lifetime as the cache row, so other workers can skip the lookup
+            shared_responses.set(
+                _etag_key(route.configuration_id, cache_key), encoded.etag.encode("ascii"),
+                settings.CACHE_TTL_MINUTES * 60
+            )
+        except OSError as e:
+            print(f"Shared cache pointer write failed: {str(e)}")
+        return encoded
+    except QueueFullError:
+        raise
     except Exception as e:
+        metrics_registry.record(route.configuration_id, None, error=True)
         create_error_log(
-            configuration_id=endpoint.data["configuration_id"],
+            configuration_id=route.configuration_id,
             error_message=str(e),
             stack_trace=None  # Implement stack trace capturing if needed
         )
+        raise
+
+async def store_result(configuration_id: str, cache_key: str, value: Any, encoded: EncodedResponse) -> None:
+    """Write a result to the cache, with a long record list split into chunk rows."""
+    expires_at = (datetime.utcnow() + timedelta(minutes=settings.CACHE_TTL_MINUTES)).isoformat()
+    envelope, records_key, chunks = split_result(value, settings.RESULT_CHUNK_RECORDS)
+    row = {
+        "cache_value": envelope,
+        "etag": encoded.etag,
+        "size_bytes": len(encoded.body),
+        "records_key": records_key,
+        "record_count": len(records_at(value, records_key)) if records_key is not None else None,
+        "chunk_size": settings.RESULT_CHUNK_RECORDS if chunks else None,
+    }
+    if chunks:
+        # Chunks go first so no reader finds a row whose chunks are not there yet
+        await storage.set_cache_chunks(configuration_id, cache_key, encoded.etag, chunks, expires_at)
+    await storage.set_cache(configuration_id=configuration_id, cache_key=cache_key, expires_at=expires_at, **row)
+    layout = ResultLayout.from_row(row)
+    result_chunks.put_layout(layout)
+    for index, records in enumerate(chunks):
+        result_chunks.put_chunk(layout, index, records)
+
+async def load_records(configuration_id: str, cache_key: str, layout: ResultLayout, start: int, stop: int) -> List[Any]:
+    """Records ``start`` to ``stop`` of a cached result, reading only the chunks they fall in.
+
+    Raises LookupError when chunks have gone from under a live cache row.
+    """
+    if not layout.chunked:
+        return (layout.records or [])[start:stop]
+    needed = layout.chunk_range(start, stop)
+    chunks = {index: result_chunks.get_chunk(layout.etag, index) for index in needed}
+    missing = [index for index, records in chunks.items() if records is None]
+    if missing:
+        with phase("chunk_read"):
+            rows = await storage.get_cache_chunks(configuration_id, cache_key, layout.etag, missing[0], missing[-1])
+        for row in rows:
+            chunks[row["chunk_index"]] = row["records"]
+            result_chunks.put_chunk(layout, row["chunk_index"], row["records"])
+        if any(chunks[index] is None for index in needed):
+            raise LookupError("Cached result is missing chunks")
+    base = needed.start * layout.chunk_size
+    records = [record for index in needed for record in chunks[index]]
+    return records[start - base:stop - base]
+
+async def encoded_result(configuration_id: str, cache_key: str, cached_result: Dict[str, Any]) -> EncodedResponse:
+    """Encoded full result of a cache row, reassembling a chunked result on a local miss."""
+    etag = cached_result.get("etag")
+    encoded = encoded_responses.get(etag) if etag else None
+    if encoded is None:
+        layout = ResultLayout.from_row(cached_result)
+        value = layout.envelope
+        if layout.chunked:
+            records = await load_records(configuration_id, cache_key, layout, 0, layout.record_count)
+            value = with_records(value, layout.records_key, records)
+        encoded = encoded_responses.put(EncodedResponse(encode_json(value), etag))
+    return encoded
+
+async def current_layout(route: Route, cache_key: str) -> ResultLayout:
+    """Layout of a route's cached result, refreshing it when the cache entry has expired."""
+    etag = shared_responses.get(_etag_key(route.configuration_id, cache_key))
+    layout = result_chunks.get_layout(etag.decode("ascii")) if etag else None
+    if layout is not None:
+        cache_maintenance.note_key_access(route.configuration_id, cache_key)
+        return layout
+    with phase("cache_read"):
+        cached_result = await storage.get_cache(route.configuration_id, cache_key)
+    if cached_result is None:
+        encoded = await refresh_endpoint(route, cache_key)
+        event_broker.publish(route.endpoint["endpoint_url"], encoded.etag, encoded.body)
+        layout = result_chunks.get_layout(encoded.etag)
+        if layout is not None:
+            return layout
+        cached_result = await storage.get_cache(route.configuration_id, cache_key)
+    else:
+        cache_maintenance.note_access(cached_result["id"])
+    layout = ResultLayout.from_row(cached_result)
+    result_chunks.put_layout(layout)
+    return layout
+
+async def current_result(endpoint_url: str) -> Optional[EncodedResponse]:
+    """Cached result of an endpoint, refreshing it when the cache entry has expired."""
+    route = await routing_table.resolve(endpoint_url)
+    if route is None:
+        return None
+    cache_key = result_cache_key(endpoint_url)
+    encoded = shared_cached_response(route.configuration_id, cache_key)
+    if encoded is not None:
+        return encoded
+    cached_result = await storage.get_cache(route.configuration_id, cache_key)
+    if cached_result is not None:
+        cache_maintenance.note_access(cached_result["id"])
+        try:
+            return await encoded_result(route.configuration_id, cache_key, cached_result)
+        except LookupError:
+            pass
+    return await refresh_endpoint(route, cache_key)
+
+def warm_cached_responses(limit: int) -> int:
+    """Pre-encode the most recently used cached results so first hits skip serialization."""
+    warmed = 0
+    for row in get_hot_cache_entries(limit).data:
+        # Rows written before ETags were stored, and chunked results, are encoded on first hit
+        if row.get("etag") and not row.get("chunk_size"):
+            encoded_responses.put(EncodedResponse(encode_json(row["cache_value"]), row["etag"]))
+            warmed += 1
+    return warmed
+
+async def profile_trigger(endpoint_url: str, request: Request) -> Optional[str]:
+    """Why this request should be profiled, if at all."""
+    if request.headers.get("X-Profile") and await is_admin_request(request):
+        return "header"
+    if request_profiler.should_sample(endpoint_url):
+        return "sampled"
+    return None
+
+@router.get("/{endpoint_url}")
+@limiter.limit("10/minute")
+async def dynamic_endpoint(
+    endpoint_url: str,
+    request: Request,
+    offset: Optional[int] = Query(default=None, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    try:
+        result_slice = ResultSlice.from_query(offset, limit, cursor, parse_fields(fields))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    async with request_profiler.profile(endpoint_url, await profile_trigger(endpoint_url, request)) as profile:
+        response = await serve_dynamic_endpoint(endpoint_url, request, result_slice)
+        if profile is not None:
+            profile.status_code = response.status_code
+    if profile is not None:
+        response.headers["X-Profile-Id"] = profile.id
+    return response
+
+async def serve_dynamic_endpoint(endpoint_url: str, request: Request, result_slice: ResultSlice):
+    with phase("resolve"):
+        route = await routing_table.resolve(endpoint_url)
+    if route is None:
+        raise HTTPException(status_code=404, detail="Endpoint not found")
+
+    try:
+        cache_key = result_cache_key(endpoint_url)
+        if not result_slice.whole:
+            return await serve_page(request, route, cache_key, result_slice)
+
+        encoded = shared_cached_response(route.configuration_id, cache_key)
+        if encoded is not None:
+            return encoded_json_response(request, encoded)
+        with phase("cache_read"):
+            cached_result = await storage.get_cache(route.configuration_id, cache_key)
+        if cached_result is not None:
+            cache_maintenance.note_access(cached_result["id"])
+            if not cached_result.get("chunk_size"):
+                return cached_json_response(request, cached_result["cache_value"], cached_result.get("etag"))
+            # Chunked results are only reassembled when the client needs the body
+            if etag_matches(request.headers.get("if-none-match"), cached_result["etag"]):
+                return not_modified_response(cached_result["etag"])
+            try:
+                return encoded_json_response(request, await encoded_result(route.configuration_id, cache_key, cached_result))
+            except LookupError:
+                pass
+
+        encoded = await refresh_endpoint(route, cache_key)
+        event_broker.publish(endpoint_url, encoded.etag, encoded.body)
+        return encoded_json_response(request, encoded)
+    except HTTPException:
+        raise
+    except QueueFullError as qe:
+        raise HTTPException(status_code=429, detail=str(qe))
+    except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping or processing failed: {str(e)}")
 
+async def serve_page(request: Request, route: Route, cache_key: str, result_slice: ResultSlice):
+    """A window of the cached result's records, with only the requested fields."""
+    layout = await current_layout(route, cache_key)
+    if layout.records_key is None and result_slice.windowed:
+        raise HTTPException(status_code=400, detail="This endpoint's result has no record list to page through")
+    start, stop = result_slice.bounds(layout.record_count)
+    try:
+        records = await load_records(route.configuration_id, cache_key, layout, start, stop)
+    except LookupError:
+        # Chunks were swept or evicted under a live row; rebuild the result
+        await refresh_endpoint(route, cache_key)
+        layout = await current_layout(route, cache_key)
+        records = await load_records(route.configuration_id, cache_key, layout, start, stop)
+
+    headers = {}
+    if layout.records_key is not None:
+        headers["X-Total-Count"] = str(layout.record_count)
+        next_cursor = result_slice.next_cursor(layout.record_count)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+            next_url = request.url.remove_query_params("offset").include_query_params(cursor=next_cursor)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+    return page_json_response(request, result_slice.page(layout, records), headers)
+
+@router.get("/{endpoint_url}/events")
+@limiter.limit("10/minute")
+async def dynamic_endpoint_events(endpoint_url: str, request: Request):
+    if await routing_table.resolve(endpoint_url) is None:
+        raise HTTPException(status_code=404, detail="Endpoint not found")
+
+    subscriber = event_broker.subscribe(endpoint_url)
+    event_broker.ensure_refresher(
+        endpoint_url, lambda: current_result(endpoint_url), settings.SSE_REFRESH_INTERVAL_SECONDS
+    )
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield frame
+        finally:
+            event_broker.unsubscribe(endpoint_url, subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 # Endpoint health monitoring
 @router.get("/health/{endpoint_url}")
 async def endpoint_health(endpoint_url: str):
     try:
-        endpoint = get_custom_endpoint(endpoint_url)
-        if not endpoint.data:
+        route = await routing_table.resolve(endpoint_url)
+        if route is None:
             return {"status": "not_found"}
 
-        # Check recent performance metrics and error logs
-        recent_metrics = get_recent_performance_metrics(endpoint.data["configuration_id"])
-        recent_errors = get_recent_error_logs(endpoint.data["configuration_id"])
-
-        avg_execution_time = sum(metric["execution_time"] for metric in recent_metrics) / len(recent_metrics) if recent_metrics else None
-        error_rate = len(recent_errors) / len(recent_metrics) if recent_metrics else None
-
-        return {
-            "status": "healthy" if error_rate is None or error_rate < 0.1 else "unhealthy",
-            "avg_execution_time": avg_execution_time,
-            "error_rate": error_rate
-        }
+        # Served from this worker's in-memory rolling window, no database reads
+        snapshot = metrics_registry.snapshot(route.configuration_id)
+        return {"status": health_status(snapshot), "scope": "worker", **snapshot}
     except Exception as e:
         return {"status": "error", "message": str(e)}
-
-# Implement these functions in app/db/database.py
-
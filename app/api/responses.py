@@ -0,0 +1,51 @@
+from fastapi import Request, Response
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.services.response_encoding import (
+    EncodedResponse, encoded_responses, encode_json, etag_matches, choose_encoding
+)
+
+def cached_json_response(request: Request, value: Any, etag: Optional[str] = None) -> Response:
+    """JSON response with a strong ETag, If-None-Match handling and cached compression.
+
+    When the ETag is already known (stored with the cache row) a matching
+    If-None-Match is answered without serializing the value at all.
+    """
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+
+    entry = encoded_responses.get(etag) if etag is not None else None
+    if entry is None:
+        entry = encoded_responses.put(EncodedResponse(encode_json(value), etag))
+    return encoded_json_response(request, entry)
+
+def encoded_json_response(request: Request, entry: EncodedResponse) -> Response:
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache", "ETag": entry.etag}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = encoded_responses.variant(
+        entry, choose_encoding(request.headers.get("accept-encoding")), settings.RESPONSE_COMPRESSION_MIN_BYTES
+    )
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"Vary": "Accept-Encoding", "Cache-Control": "no-cache", "ETag": etag})
+
+def page_json_response(request: Request, value: Any, headers: Dict[str, str]) -> Response:
+    """JSON response for a slice of a cached result.
+
+    Pages are encoded per request and never cached, so their cost follows
+    the size of the page rather than of the whole result.
+    """
+    entry = EncodedResponse(encode_json(value))
+    headers = {**headers, "Vary": "Accept-Encoding", "Cache-Control": "no-cache", "ETag": entry.etag}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = entry.variant(choose_encoding(request.headers.get("accept-encoding")), settings.RESPONSE_COMPRESSION_MIN_BYTES)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -3,6 +3,7 @@ from pydantic import BaseModel, HttpUrl
 from typing import Dict, Any
 from app.services.scraping_service import scrape_url, format_output
 from app.api.auth import get_current_user
+from app.services.scheduler import scraping_scheduler, QueueFullError, BULK
 import json
 
 router = APIRouter()
@@ -18,10 +19,12 @@ class ScrapeResponse(BaseModel):
 async def scrape(request: ScrapeRequest, current_user: Dict = Depends(get_current_user)):
     try:
 
-        print(1)
-        result = await scrape_url(str(request.url), request.selectors)
+        async with scraping_scheduler.slot(current_user.id, BULK):
+            result = await scrape_url(str(request.url), request.selectors)
         formatted_result = format_output(result)
         return ScrapeResponse(result=json.loads(formatted_result))
+    except QueueFullError as qe:
+        raise HTTPException(status_code=429, detail=str(qe))
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
@@ -0,0 +1,32 @@
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import json
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma separated ``fields`` query parameter."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+def iter_json_array(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    for row in rows:
+        if not first:
+            yield b","
+        first = False
+        yield json.dumps(row, default=str).encode("utf-8")
+    yield b"]"
+
+def stream_page(request: Request, rows: Iterable[Dict[str, Any]], next_cursor: Optional[str]) -> StreamingResponse:
+    """Stream a page as a JSON array, advertising the next page in headers."""
+    headers = {}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return StreamingResponse(iter_json_array(rows), media_type="application/json", headers=headers)
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    for row in rows:
+        yield json.dumps(row, default=str).encode("utf-8") + b"\n"
@@ -1,4 +1,5 @@
 from pydantic import Field
+from typing import List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -10,6 +11,42 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_KEY: str
     SUPABASE_JWT_SECRET: str
+    STORAGE_BACKEND: str = Field(default="supabase")
+    DATABASE_URL: str = Field(default="")
+    DATABASE_POOL_MIN_SIZE: int = Field(default=2)
+    DATABASE_POOL_MAX_SIZE: int = Field(default=10)
+    ADMIN_EMAILS: List[str] = Field(default=[])
+    CACHE_TTL_MINUTES: int = Field(default=15)
+    ROUTE_TTL_SECONDS: int = Field(default=60)
+    CACHE_SWEEP_INTERVAL_SECONDS: int = Field(default=300)
+    CACHE_SWEEP_BATCH_SIZE: int = Field(default=1000)
+    CACHE_QUOTA_BYTES_PER_CONFIGURATION: int = Field(default=50 * 1024 * 1024)
+    BULK_IMPORT_MAX_ROWS: int = Field(default=10000)
+    BULK_WRITE_CHUNK_SIZE: int = Field(default=500)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = Field(default=1024)
+    RESPONSE_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+    RESULT_CHUNK_RECORDS: int = Field(default=500)
+    RESULT_CHUNK_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+    SHARED_STATE_DIR: str = Field(default="")
+    SHARED_RESPONSE_CACHE_MAX_BYTES: int = Field(default=256 * 1024 * 1024)
+    RATE_LIMIT_STORAGE_URI: str = Field(default="shm://")
+    WARMUP_BROWSER: bool = Field(default=False)
+    WARMUP_CACHED_RESPONSES: int = Field(default=0)
+    SCRAPE_MAX_CONCURRENCY: int = Field(default=16)
+    SCRAPE_USER_MAX_CONCURRENCY: int = Field(default=4)
+    SCRAPE_USER_MAX_QUEUED: int = Field(default=50)
+    SCRAPE_INTERACTIVE_RESERVED: int = Field(default=4)
+    SSE_REFRESH_INTERVAL_SECONDS: int = Field(default=30)
+    SSE_KEEPALIVE_SECONDS: int = Field(default=15)
+    SSE_SUBSCRIBER_QUEUE_SIZE: int = Field(default=8)
+    HISTORY_SNAPSHOT_INTERVAL: int = Field(default=20)
+    HISTORY_COMPRESSION_THRESHOLD_BYTES: int = Field(default=8 * 1024)
+    METRICS_WINDOW_SECONDS: int = Field(default=600)
+    METRICS_SLOT_SECONDS: int = Field(default=10)
+    METRICS_CHECKPOINT_INTERVAL_SECONDS: int = Field(default=60)
+    PROFILE_SAMPLE_RATE: float = Field(default=0.0)
+    PROFILE_STORE_MAX_ENTRIES: int = Field(default=50)
+    PROFILE_TOP_N: int = Field(default=30)
 
     model_config = SettingsConfigDict(env_file=".env")
 
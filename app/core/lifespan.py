@@ -0,0 +1,79 @@
+from typing import Dict
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
+import time
+from fastapi import FastAPI
+from app.core.config import settings
+from app.db.storage import storage
+from app.services.metrics import metrics_registry, run_checkpoints
+from app.services.routing import routing_table
+from app.services.cache_maintenance import cache_maintenance, run_sweeper
+
+class StartupTimer:
+    """Wall-clock duration of each startup phase, in milliseconds."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+            print(f"Startup phase {name}: {self.phases[name]} ms")
+
+async def warm_browser() -> None:
+    """Import crawl4ai and launch a browser once, so the first scrape doesn't pay for it."""
+    from app.services.scraping_service import AsyncWebCrawler
+    async with AsyncWebCrawler(verbose=False):
+        pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    timer = StartupTimer()
+    app.state.startup_timings = timer.phases
+
+    # Only the supabase backend builds the supabase-py client here, and only
+    # if nothing has swapped it out; other callers still create it lazily
+    with timer.phase("storage"):
+        await storage.connect()
+
+    with timer.phase("routing_table"):
+        try:
+            routing_table.load()
+        except Exception as e:
+            # Routes are resolved lazily on first request if the preload fails
+            print(f"Routing table preload failed: {str(e)}")
+
+    with timer.phase("background_tasks"):
+        tasks = [
+            asyncio.create_task(run_checkpoints(metrics_registry, settings.METRICS_CHECKPOINT_INTERVAL_SECONDS)),
+            asyncio.create_task(run_sweeper(cache_maintenance, settings.CACHE_SWEEP_INTERVAL_SECONDS)),
+        ]
+
+    if settings.WARMUP_CACHED_RESPONSES:
+        from app.api.dynamic_endpoints import warm_cached_responses
+        with timer.phase("warm_cached_responses"):
+            try:
+                warm_cached_responses(settings.WARMUP_CACHED_RESPONSES)
+            except Exception as e:
+                print(f"Cached response warmup failed: {str(e)}")
+
+    if settings.WARMUP_BROWSER:
+        with timer.phase("warm_browser"):
+            try:
+                await warm_browser()
+            except Exception as e:
+                print(f"Browser warmup failed: {str(e)}")
+
+    print(f"Startup complete in {sum(timer.phases.values()):.1f} ms")
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Let cancelled tasks unwind before the storage they use goes away
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await storage.close()
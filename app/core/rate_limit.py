@@ -0,0 +1,9 @@
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.core.config import settings
+# Registers the shm:// storage scheme with limits
+import app.services.shared_state  # noqa: F401
+
+# One limiter for the whole app. With the default shm:// storage the
+# counters live in shared memory, so limits hold across uvicorn workers.
+limiter = Limiter(key_func=get_remote_address, storage_uri=settings.RATE_LIMIT_STORAGE_URI)
@@ -0,0 +1,52 @@
+from typing import Dict, Any, List, Optional
+
+class StorageBackend:
+    """Hot-path reads and writes, behind one interface per storage technology.
+
+    Rows come back as plain dicts shaped like PostgREST returns them: ids
+    and timestamps as strings, JSON columns decoded. Everything else still
+    goes through ``app.db.database``.
+    """
+
+    name = "base"
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def get_cache(self, configuration_id: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Live (unexpired) cache row for the key, or None."""
+        raise NotImplementedError
+
+    async def set_cache(
+        self,
+        configuration_id: str,
+        cache_key: str,
+        cache_value: Any,
+        expires_at: str,
+        etag: Optional[str] = None,
+        size_bytes: Optional[int] = None,
+        records_key: Optional[str] = None,
+        record_count: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> None:
+        """Upsert a cache row. Chunked results give their layout and write chunks first."""
+        raise NotImplementedError
+
+    async def get_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, first: int, last: int) -> List[Dict[str, Any]]:
+        """Chunk rows ``first`` to ``last`` inclusive of one result version, in order."""
+        raise NotImplementedError
+
+    async def set_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, chunks: List[List[Any]], expires_at: str) -> None:
+        raise NotImplementedError
+
+    async def get_custom_endpoint(self, endpoint_url: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def get_crawl_configuration(self, configuration_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
@@ -0,0 +1,66 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import copy
+import json
+import uuid
+from app.db.backends.base import StorageBackend
+
+class MemoryBackend(StorageBackend):
+    """Process-local tables, for tests and benchmarks."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.cache_chunks: Dict[Tuple[str, str, str, int], Dict[str, Any]] = {}
+        self.custom_endpoints: Dict[str, Dict[str, Any]] = {}
+        self.crawl_configurations: Dict[str, Dict[str, Any]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+
+    async def get_cache(self, configuration_id: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        row = self.cache.get((configuration_id, cache_key))
+        if row is None or row["expires_at"] <= datetime.utcnow().isoformat():
+            return None
+        return dict(row)
+
+    async def set_cache(self, configuration_id: str, cache_key: str, cache_value: Any, expires_at: str, etag: Optional[str] = None, size_bytes: Optional[int] = None, records_key: Optional[str] = None, record_count: Optional[int] = None, chunk_size: Optional[int] = None) -> None:
+        now = datetime.utcnow().isoformat()
+        existing = self.cache.get((configuration_id, cache_key))
+        self.cache[(configuration_id, cache_key)] = {
+            "id": existing["id"] if existing else str(uuid.uuid4()),
+            "configuration_id": configuration_id,
+            "cache_key": cache_key,
+            "cache_value": copy.deepcopy(cache_value),
+            "size_bytes": size_bytes if size_bytes is not None else len(json.dumps(cache_value, default=str).encode("utf-8")),
+            "etag": etag,
+            "records_key": records_key,
+            "record_count": record_count,
+            "chunk_size": chunk_size,
+            "expires_at": expires_at,
+            "last_accessed_at": now,
+            "created_at": existing["created_at"] if existing else now,
+        }
+
+    async def get_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, first: int, last: int) -> List[Dict[str, Any]]:
+        rows = (self.cache_chunks.get((configuration_id, cache_key, etag, index)) for index in range(first, last + 1))
+        return [{"chunk_index": row["chunk_index"], "records": row["records"]} for row in rows if row is not None]
+
+    async def set_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, chunks: List[List[Any]], expires_at: str) -> None:
+        for index, records in enumerate(chunks):
+            self.cache_chunks[(configuration_id, cache_key, etag, index)] = {
+                "chunk_index": index,
+                "records": copy.deepcopy(records),
+                "expires_at": expires_at,
+            }
+
+    async def get_custom_endpoint(self, endpoint_url: str) -> Optional[Dict[str, Any]]:
+        row = self.custom_endpoints.get(endpoint_url)
+        return dict(row) if row is not None else None
+
+    async def get_crawl_configuration(self, configuration_id: str) -> Optional[Dict[str, Any]]:
+        row = self.crawl_configurations.get(configuration_id)
+        return dict(row) if row is not None else None
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        row = self.users.get(email)
+        return dict(row) if row is not None else None
@@ -0,0 +1,143 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import json
+import uuid
+from app.db.backends.base import StorageBackend
+
+GET_CACHE = """
+SELECT * FROM cache
+WHERE configuration_id = $1 AND cache_key = $2 AND expires_at > now()
+"""
+
+SET_CACHE = """
+INSERT INTO cache (
+    configuration_id, cache_key, cache_value, size_bytes, etag,
+    records_key, record_count, chunk_size, expires_at, last_accessed_at
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, now())
+ON CONFLICT (configuration_id, cache_key) DO UPDATE SET
+    cache_value = EXCLUDED.cache_value,
+    size_bytes = EXCLUDED.size_bytes,
+    etag = EXCLUDED.etag,
+    records_key = EXCLUDED.records_key,
+    record_count = EXCLUDED.record_count,
+    chunk_size = EXCLUDED.chunk_size,
+    expires_at = EXCLUDED.expires_at,
+    last_accessed_at = EXCLUDED.last_accessed_at
+"""
+
+GET_CACHE_CHUNKS = """
+SELECT chunk_index, records FROM cache_chunks
+WHERE configuration_id = $1 AND cache_key = $2 AND etag = $3 AND chunk_index BETWEEN $4 AND $5
+ORDER BY chunk_index
+"""
+
+SET_CACHE_CHUNK = """
+INSERT INTO cache_chunks (configuration_id, cache_key, etag, chunk_index, records, expires_at)
+VALUES ($1, $2, $3, $4, $5, $6)
+ON CONFLICT (configuration_id, cache_key, etag, chunk_index) DO UPDATE SET
+    records = EXCLUDED.records,
+    expires_at = EXCLUDED.expires_at
+"""
+
+GET_CUSTOM_ENDPOINT = "SELECT * FROM custom_endpoints WHERE endpoint_url = $1"
+GET_CRAWL_CONFIGURATION = "SELECT * FROM crawl_configurations WHERE id = $1"
+GET_USER_BY_EMAIL = "SELECT * FROM users WHERE email = $1"
+
+def _timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # The app writes naive UTC timestamps (datetime.utcnow().isoformat())
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+def _row(record) -> Optional[Dict[str, Any]]:
+    """Convert a record to the shape PostgREST returns: str ids and ISO timestamps."""
+    if record is None:
+        return None
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        row[key] = value
+    return row
+
+async def _init_connection(connection) -> None:
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+class PostgresBackend(StorageBackend):
+    """Direct connections to the Supabase Postgres through an asyncpg pool.
+
+    asyncpg prepares each statement once per connection and reuses it from
+    its statement cache, so a hot lookup is one round trip on an open
+    connection instead of an HTTP request to PostgREST. asyncpg is only
+    imported when the pool is created.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, min_size: int = 2, max_size: int = 10):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool = None
+        self._connecting = asyncio.Lock()
+
+    async def connect(self) -> None:
+        async with self._connecting:
+            if self.pool is None:
+                try:
+                    import asyncpg
+                except ImportError:
+                    raise RuntimeError("The postgres storage backend requires asyncpg (pip install asyncpg)")
+                self.pool = await asyncpg.create_pool(
+                    self.dsn, min_size=self.min_size, max_size=self.max_size, init=_init_connection
+                )
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def _fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        if self.pool is None:
+            await self.connect()
+        return _row(await self.pool.fetchrow(query, *args))
+
+    async def get_cache(self, configuration_id: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        return await self._fetchrow(GET_CACHE, uuid.UUID(configuration_id), cache_key)
+
+    async def set_cache(self, configuration_id: str, cache_key: str, cache_value: Any, expires_at: str, etag: Optional[str] = None, size_bytes: Optional[int] = None, records_key: Optional[str] = None, record_count: Optional[int] = None, chunk_size: Optional[int] = None) -> None:
+        if size_bytes is None:
+            size_bytes = len(json.dumps(cache_value, default=str).encode("utf-8"))
+        if self.pool is None:
+            await self.connect()
+        await self.pool.execute(
+            SET_CACHE, uuid.UUID(configuration_id), cache_key, cache_value, size_bytes, etag,
+            records_key, record_count, chunk_size, _timestamp(expires_at)
+        )
+
+    async def get_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, first: int, last: int) -> List[Dict[str, Any]]:
+        if self.pool is None:
+            await self.connect()
+        records = await self.pool.fetch(GET_CACHE_CHUNKS, uuid.UUID(configuration_id), cache_key, etag, first, last)
+        return [_row(record) for record in records]
+
+    async def set_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, chunks: List[List[Any]], expires_at: str) -> None:
+        if self.pool is None:
+            await self.connect()
+        configuration_uuid, expires = uuid.UUID(configuration_id), _timestamp(expires_at)
+        await self.pool.executemany(SET_CACHE_CHUNK, [
+            (configuration_uuid, cache_key, etag, index, records, expires) for index, records in enumerate(chunks)
+        ])
+
+    async def get_custom_endpoint(self, endpoint_url: str) -> Optional[Dict[str, Any]]:
+        return await self._fetchrow(GET_CUSTOM_ENDPOINT, endpoint_url)
+
+    async def get_crawl_configuration(self, configuration_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetchrow(GET_CRAWL_CONFIGURATION, uuid.UUID(configuration_id))
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return await self._fetchrow(GET_USER_BY_EMAIL, email)
@@ -0,0 +1,41 @@
+from typing import Dict, Any, List, Optional
+from app.db import database
+from app.db.backends.base import StorageBackend
+
+def _first(rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # Lookups use limit(1) rather than single(), which raises on a miss
+    return rows[0] if rows else None
+
+class SupabaseBackend(StorageBackend):
+    """The default: every call is a PostgREST request through supabase-py."""
+
+    name = "supabase"
+
+    async def connect(self) -> None:
+        if isinstance(database.supabase, database.LazySupabaseClient):
+            database.supabase.connect()
+
+    async def get_cache(self, configuration_id: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        return _first(database.get_cache(configuration_id, cache_key).data)
+
+    async def set_cache(self, configuration_id: str, cache_key: str, cache_value: Any, expires_at: str, etag: Optional[str] = None, size_bytes: Optional[int] = None, records_key: Optional[str] = None, record_count: Optional[int] = None, chunk_size: Optional[int] = None) -> None:
+        database.set_cache(
+            configuration_id, cache_key, cache_value, expires_at, etag=etag, size_bytes=size_bytes,
+            records_key=records_key, record_count=record_count, chunk_size=chunk_size
+        )
+
+    async def get_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, first: int, last: int) -> List[Dict[str, Any]]:
+        return database.get_cache_chunks(configuration_id, cache_key, etag, first, last).data
+
+    async def set_cache_chunks(self, configuration_id: str, cache_key: str, etag: str, chunks: List[List[Any]], expires_at: str) -> None:
+        database.set_cache_chunks(configuration_id, cache_key, etag, chunks, expires_at)
+
+    async def get_custom_endpoint(self, endpoint_url: str) -> Optional[Dict[str, Any]]:
+        return _first(database.get_custom_endpoint(endpoint_url).data)
+
+    async def get_crawl_configuration(self, configuration_id: str) -> Optional[Dict[str, Any]]:
+        return _first(database.get_crawl_configuration(configuration_id).data)
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        users = database.supabase.table("users").select("*").eq("email", email).execute().data
+        return users[0] if users else None
@@ -1,9 +1,40 @@
-from supabase import create_client
 from app.core.config import settings
-from typing import Dict, Any, List
+from app.db.pagination import select_columns, keyset_page
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime, timedelta
+import json
+import sys
 
-supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+class LazySupabaseClient:
+    """Stand-in for the Supabase client that creates it on first use.
+
+    Importing supabase-py and building the client is the slowest part of
+    importing the app, so it waits until ``connect()`` is called from the
+    lifespan or a query is made. Modules that imported ``supabase`` by name
+    hold this object, so it forwards to whatever ``app.db.database.supabase``
+    currently is; replacing that attribute swaps the client everywhere.
+    """
+
+    def __init__(self):
+        self.client = None
+
+    def connect(self):
+        if self.client is None:
+            from supabase import create_client
+            self.client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        return self.client
+
+    def __getattr__(self, name: str):
+        current = sys.modules[__name__].supabase
+        if current is not self:
+            return getattr(current, name)
+        return getattr(self.connect(), name)
+
+supabase = LazySupabaseClient()
+
+CONFIGURATION_FIELDS = ("id", "name", "url", "selectors", "crawl_settings", "render_profile", "created_at", "updated_at")
+PERFORMANCE_METRIC_FIELDS = ("id", "configuration_id", "execution_time", "memory_usage", "bytes_transferred", "render_time", "queue_wait", "created_at")
+ERROR_LOG_FIELDS = ("id", "configuration_id", "error_message", "stack_trace", "created_at")
 
 def create_user(email: str, full_name: str, hashed_password: str) -> Dict[str, Any]:
     return supabase.table("users").insert({"email": email, "full_name": full_name, "hashed_password": hashed_password}).execute()
@@ -11,17 +42,36 @@ def create_user(email: str, full_name: str, hashed_password: str) -> Dict[str, A
 def get_user_by_email(email: str) -> Dict[str, Any]:
     return supabase.table("users").select("*").eq("email", email).single().execute()
 
-def create_crawl_configuration(user_id: str, name: str, url: str, selectors: Dict[str, Any]) -> Dict[str, Any]:
+def create_crawl_configuration(user_id: str, name: str, url: str, selectors: Dict[str, Any], crawl_settings: Optional[Dict[str, Any]] = None, render_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     result = supabase.table("crawl_configurations").insert({
         "user_id": user_id,
         "name": name,
         "url": url,
-        "selectors": selectors
+        "selectors": selectors,
+        "crawl_settings": crawl_settings,
+        "render_profile": render_profile
     }).execute()
     return result
 
-def get_crawl_configurations(user_id: str) -> List[Dict[str, Any]]:
-    return supabase.table("crawl_configurations").select("*").eq("user_id", user_id).execute()
+def create_crawl_configurations(configurations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return supabase.table("crawl_configurations").insert(configurations).execute()
+
+def upsert_crawl_configurations(configurations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return supabase.table("crawl_configurations").upsert(configurations, on_conflict="id").execute()
+
+def get_owned_configuration_ids(user_id: str, configuration_ids: List[str]) -> List[str]:
+    result = supabase.table("crawl_configurations").select("id").eq("user_id", user_id).in_("id", configuration_ids).execute()
+    return [row["id"] for row in result.data]
+
+def get_crawl_configurations(user_id: str, fields: Optional[Sequence[str]] = None, cursor: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    query = supabase.table("crawl_configurations").select(select_columns(fields, CONFIGURATION_FIELDS)).eq("user_id", user_id)
+    return keyset_page(query, cursor, limit).execute()
+
+def get_crawl_configuration(configuration_id: str) -> Dict[str, Any]:
+    return supabase.table("crawl_configurations").select("*").eq("id", configuration_id).limit(1).execute()
+
+def get_crawl_configurations_by_ids(configuration_ids: List[str]) -> List[Dict[str, Any]]:
+    return supabase.table("crawl_configurations").select("*").in_("id", configuration_ids).execute()
 
 def create_custom_endpoint(user_id: str, endpoint_url: str, configuration_id: str, schema: Dict[str, Any], transformations: Dict[str, str]) -> Dict[str, Any]:
     return supabase.table("custom_endpoints").insert({
@@ -33,15 +83,29 @@ def create_custom_endpoint(user_id: str, endpoint_url: str, configuration_id: st
     }).execute()
 
 def get_custom_endpoint(endpoint_url: str) -> Dict[str, Any]:
-    return supabase.table("custom_endpoints").select("*").eq("endpoint_url", endpoint_url).single().execute()
+    return supabase.table("custom_endpoints").select("*").eq("endpoint_url", endpoint_url).limit(1).execute()
 
-def create_scraping_history(configuration_id: str, status: str, result: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
-    return supabase.table("scraping_history").insert({
-        "configuration_id": configuration_id,
-        "status": status,
-        "result": result,
-        "metadata": metadata
-    }).execute()
+def get_custom_endpoints() -> List[Dict[str, Any]]:
+    return supabase.table("custom_endpoints").select("*").execute()
+
+def insert_scraping_history(row: Dict[str, Any]) -> Dict[str, Any]:
+    return supabase.table("scraping_history").insert(row).execute()
+
+def get_latest_scraping_history(configuration_id: str, source_url: str) -> List[Dict[str, Any]]:
+    return supabase.table("scraping_history").select("*").eq("configuration_id", configuration_id).eq("source_url", source_url).order("version", desc=True).limit(1).execute()
+
+def get_scraping_history_snapshot(configuration_id: str, source_url: str, version: int) -> List[Dict[str, Any]]:
+    """Latest full snapshot at or before the given version."""
+    return supabase.table("scraping_history").select("*").eq("configuration_id", configuration_id).eq("source_url", source_url).eq("kind", "snapshot").lte("version", version).order("version", desc=True).limit(1).execute()
+
+def get_scraping_history_range(configuration_id: str, source_url: str, after_version: int, to_version: int) -> List[Dict[str, Any]]:
+    return supabase.table("scraping_history").select("*").eq("configuration_id", configuration_id).eq("source_url", source_url).gt("version", after_version).lte("version", to_version).order("version").execute()
+
+def list_scraping_history(configuration_id: str, source_url: str, limit: int = 100, before_version: Optional[int] = None) -> List[Dict[str, Any]]:
+    query = supabase.table("scraping_history").select("id,version,kind,base_version,status,metadata,created_at").eq("configuration_id", configuration_id).eq("source_url", source_url)
+    if before_version is not None:
+        query = query.lt("version", before_version)
+    return query.order("version", desc=True).limit(limit).execute()
 
 def create_error_log(configuration_id: str, error_message: str, stack_trace: str) -> Dict[str, Any]:
     return supabase.table("error_logs").insert({
@@ -50,26 +114,85 @@ def create_error_log(configuration_id: str, error_message: str, stack_trace: str
         "stack_trace": stack_trace
     }).execute()
 
-def create_performance_metric(configuration_id: str, execution_time: float, memory_usage: float) -> Dict[str, Any]:
+def create_performance_metric(configuration_id: str, execution_time: float, memory_usage: float, bytes_transferred: Optional[int] = None, render_time: Optional[float] = None, queue_wait: Optional[float] = None) -> Dict[str, Any]:
     return supabase.table("performance_metrics").insert({
         "configuration_id": configuration_id,
         "execution_time": execution_time,
-        "memory_usage": memory_usage
+        "memory_usage": memory_usage,
+        "bytes_transferred": bytes_transferred,
+        "render_time": render_time,
+        "queue_wait": queue_wait
     }).execute()
 
-def set_cache(configuration_id: str, cache_key: str, cache_value: Dict[str, Any], expires_at: str) -> Dict[str, Any]:
-    return supabase.table("cache").insert({
+def set_cache(
+    configuration_id: str,
+    cache_key: str,
+    cache_value: Dict[str, Any],
+    expires_at: str,
+    etag: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+    records_key: Optional[str] = None,
+    record_count: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    now = datetime.utcnow().isoformat()
+    return supabase.table("cache").upsert({
         "configuration_id": configuration_id,
         "cache_key": cache_key,
         "cache_value": cache_value,
-        "expires_at": expires_at
-    }).execute()
+        "size_bytes": size_bytes if size_bytes is not None else len(json.dumps(cache_value, default=str).encode("utf-8")),
+        "etag": etag,
+        "records_key": records_key,
+        "record_count": record_count,
+        "chunk_size": chunk_size,
+        "expires_at": expires_at,
+        "last_accessed_at": now
+    }, on_conflict="configuration_id,cache_key").execute()
+
+def set_cache_chunks(configuration_id: str, cache_key: str, etag: str, chunks: List[List[Any]], expires_at: str) -> Dict[str, Any]:
+    return supabase.table("cache_chunks").upsert([
+        {
+            "configuration_id": configuration_id,
+            "cache_key": cache_key,
+            "etag": etag,
+            "chunk_index": index,
+            "records": records,
+            "expires_at": expires_at
+        } for index, records in enumerate(chunks)
+    ], on_conflict="configuration_id,cache_key,etag,chunk_index").execute()
+
+def get_cache_chunks(configuration_id: str, cache_key: str, etag: str, first: int, last: int) -> List[Dict[str, Any]]:
+    return supabase.table("cache_chunks").select("chunk_index,records").eq("configuration_id", configuration_id).eq("cache_key", cache_key).eq("etag", etag).gte("chunk_index", first).lte("chunk_index", last).order("chunk_index").execute()
 
 def get_cache(configuration_id: str, cache_key: str) -> Dict[str, Any]:
-    return supabase.table("cache").select("*").eq("configuration_id", configuration_id).eq("cache_key", cache_key).single().execute()
+    return supabase.table("cache").select("*").eq("configuration_id", configuration_id).eq("cache_key", cache_key).gt("expires_at", datetime.utcnow().isoformat()).limit(1).execute()
+
+def get_hot_cache_entries(limit: int) -> List[Dict[str, Any]]:
+    """Most recently read live cache rows, for warming in-process caches at startup."""
+    return supabase.table("cache").select("configuration_id,cache_key,cache_value,etag,chunk_size").gt("expires_at", datetime.utcnow().isoformat()).order("last_accessed_at", desc=True).limit(limit).execute()
+
+def touch_cache_entries(cache_ids: List[str], accessed_at: str) -> Dict[str, Any]:
+    return supabase.table("cache").update({"last_accessed_at": accessed_at}).in_("id", cache_ids).execute()
+
+def touch_cache_keys(configuration_id: str, cache_keys: List[str], accessed_at: str) -> Dict[str, Any]:
+    return supabase.table("cache").update({"last_accessed_at": accessed_at}).eq("configuration_id", configuration_id).in_("cache_key", cache_keys).execute()
+
+def sweep_expired_cache(batch_size: int) -> Dict[str, Any]:
+    return supabase.rpc("sweep_expired_cache", {"p_batch_size": batch_size}).execute()
+
+def evict_cache_lru(configuration_id: str, quota_bytes: int) -> Dict[str, Any]:
+    return supabase.rpc("evict_cache_lru", {"p_configuration_id": configuration_id, "p_quota_bytes": quota_bytes}).execute()
+
+def get_cache_table_stats() -> Dict[str, Any]:
+    return supabase.rpc("cache_table_stats", {}).execute()
+
+def get_recent_performance_metrics(configuration_id: str, limit: int = 100, fields: Optional[Sequence[str]] = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+    query = supabase.table("performance_metrics").select(select_columns(fields, PERFORMANCE_METRIC_FIELDS)).eq("configuration_id", configuration_id)
+    return keyset_page(query, cursor, limit, descending=True).execute()
 
-def get_recent_performance_metrics(configuration_id: str, limit: int = 100) -> List[Dict[str, Any]]:
-    return supabase.table("performance_metrics").select("*").eq("configuration_id", configuration_id).order("created_at", desc=True).limit(limit).execute()
+def get_recent_error_logs(configuration_id: str, limit: int = 100, fields: Optional[Sequence[str]] = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+    query = supabase.table("error_logs").select(select_columns(fields, ERROR_LOG_FIELDS)).eq("configuration_id", configuration_id)
+    return keyset_page(query, cursor, limit, descending=True).execute()
 
-def get_recent_error_logs(configuration_id: str, limit: int = 100) -> List[Dict[str, Any]]:
-    return supabase.table("error_logs").select("*").eq("configuration_id", configuration_id).order("created_at", desc=True).limit(limit).execute()
+def create_metrics_checkpoints(checkpoints: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return supabase.table("metrics_checkpoints").insert(checkpoints).execute()
@@ -0,0 +1,61 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import json
+import uuid
+
+# Columns every keyset page is ordered by; they are always selected so the
+# last row of a page can be turned into the next cursor.
+KEYSET_COLUMNS = ("created_at", "id")
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor into (created_at, id).
+
+    Both values end up quoted inside a PostgREST filter, so anything that is
+    not a timestamp and a UUID is rejected rather than passed through.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        datetime.fromisoformat(created_at)
+        return created_at, str(uuid.UUID(row_id))
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor")
+
+def select_columns(fields: Optional[Sequence[str]], allowed: Sequence[str]) -> str:
+    """Build a PostgREST column list, always including the keyset columns."""
+    if not fields:
+        fields = allowed
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    columns = list(KEYSET_COLUMNS) + [field for field in fields if field not in KEYSET_COLUMNS]
+    return ",".join(columns)
+
+def keyset_page(query, cursor: Optional[str], limit: int, descending: bool = False):
+    """Order a query by (created_at, id) and continue after the given cursor.
+
+    postgrest-py 0.10 has neither ``or_`` nor multi-column ``order``, so
+    both are written to the query parameters directly. One extra row is
+    requested to tell whether another page exists.
+    """
+    direction = "desc" if descending else "asc"
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        op = "lt" if descending else "gt"
+        query.params = query.params.add(
+            "or",
+            f'(created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}."{row_id}"))'
+        )
+    query.params = query.params.add("order", f"created_at.{direction},id.{direction}")
+    return query.limit(limit + 1)
+
+def split_page(rows: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
@@ -0,0 +1,19 @@
+from app.core.config import settings
+from app.db.backends.base import StorageBackend
+
+def create_storage(name: str) -> StorageBackend:
+    """Build the storage backend named by STORAGE_BACKEND; drivers load on connect."""
+    if name == "supabase":
+        from app.db.backends.supabase_backend import SupabaseBackend
+        return SupabaseBackend()
+    if name == "postgres":
+        if not settings.DATABASE_URL:
+            raise ValueError("DATABASE_URL is required for the postgres storage backend")
+        from app.db.backends.postgres_backend import PostgresBackend
+        return PostgresBackend(settings.DATABASE_URL, settings.DATABASE_POOL_MIN_SIZE, settings.DATABASE_POOL_MAX_SIZE)
+    if name == "memory":
+        from app.db.backends.memory_backend import MemoryBackend
+        return MemoryBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
+
+storage = create_storage(settings.STORAGE_BACKEND)
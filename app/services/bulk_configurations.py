@@ -0,0 +1,71 @@
+from typing import Dict, Any, List, Tuple
+import json
+from app.db.database import (
+    create_crawl_configurations, upsert_crawl_configurations, get_owned_configuration_ids
+)
+
+def parse_bulk_payload(body: bytes, content_type: str) -> List[Tuple[int, Any]]:
+    """Split a JSON array or NDJSON body into (index, row) pairs.
+
+    Lines that are not valid JSON are returned as ValueError instances so
+    they can be reported per row instead of failing the whole import. For
+    NDJSON the index is the zero-based line number in the body, blank
+    lines included, so reports point at the right line of the user's file.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows = []
+        for index, line in enumerate(body.decode("utf-8").splitlines()):
+            if not line.strip():
+                continue
+            try:
+                rows.append((index, json.loads(line)))
+            except ValueError as e:
+                rows.append((index, ValueError(f"Invalid JSON: {str(e)}")))
+        return rows
+
+    payload = json.loads(body)
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array or NDJSON body")
+    return list(enumerate(payload))
+
+def _chunks(rows: List[Any], chunk_size: int):
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+def write_configurations(user_id: str, rows: List[Tuple[int, Dict[str, Any]]], chunk_size: int) -> Dict[str, Any]:
+    """Insert new rows and update existing ones in chunks, collecting per-row errors.
+
+    Rows carrying an ``id`` are upserted, but only after checking in one
+    query per chunk that the ids belong to the user.
+    """
+    report = {"created": 0, "updated": 0, "failed": 0, "errors": [], "updated_rows": []}
+
+    def fail(indexes: List[int], error: str) -> None:
+        report["failed"] += len(indexes)
+        report["errors"].extend({"index": index, "error": error} for index in indexes)
+
+    new_rows = [(index, {**row, "user_id": user_id}) for index, row in rows if not row.get("id")]
+    existing_rows = [(index, {**row, "user_id": user_id}) for index, row in rows if row.get("id")]
+
+    for chunk in _chunks(new_rows, chunk_size):
+        try:
+            result = create_crawl_configurations([row for _, row in chunk])
+            report["created"] += len(result.data)
+        except Exception as e:
+            fail([index for index, _ in chunk], f"Insert failed: {str(e)}")
+
+    for chunk in _chunks(existing_rows, chunk_size):
+        try:
+            owned = set(get_owned_configuration_ids(user_id, [row["id"] for _, row in chunk]))
+            fail([index for index, row in chunk if row["id"] not in owned], "Configuration not found")
+            chunk = [(index, row) for index, row in chunk if row["id"] in owned]
+            if not chunk:
+                continue
+            result = upsert_crawl_configurations([row for _, row in chunk])
+            report["updated"] += len(result.data)
+            report["updated_rows"].extend(result.data)
+        except Exception as e:
+            fail([index for index, _ in chunk], f"Upsert failed: {str(e)}")
+
+    report["errors"].sort(key=lambda error: error["index"])
+    return report
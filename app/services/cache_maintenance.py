@@ -0,0 +1,98 @@
+from typing import Dict, Any, List, Set, Tuple
+from datetime import datetime
+import asyncio
+from app.core.config import settings
+from app.db.database import (
+    sweep_expired_cache, evict_cache_lru, touch_cache_entries, touch_cache_keys, get_cache_table_stats
+)
+
+class CacheMaintenance:
+    """Expiry sweeping, LRU quota enforcement and size accounting for the cache table.
+
+    Cache hits and writes are only noted in memory; the sweeper flushes
+    access times and enforces quotas in batches so the request path never
+    pays for maintenance.
+    """
+
+    def __init__(self, batch_size: int, quota_bytes: int):
+        self.batch_size = batch_size
+        self.quota_bytes = quota_bytes
+        self.accessed: Set[str] = set()
+        self.accessed_keys: Set[Tuple[str, str]] = set()
+        self.written: Set[str] = set()
+        self.stats: Dict[str, Any] = {
+            "sweeps": 0,
+            "expired_rows_deleted": 0,
+            "expired_bytes_reclaimed": 0,
+            "evicted_rows": 0,
+            "evicted_bytes_reclaimed": 0,
+            "last_sweep_at": None,
+            "last_sweep_duration": None,
+            "last_error": None,
+        }
+
+    def note_access(self, cache_id: str) -> None:
+        self.accessed.add(cache_id)
+
+    def note_key_access(self, configuration_id: str, cache_key: str) -> None:
+        # Hits served from the shared response pointer never read the row, so they have no id
+        self.accessed_keys.add((configuration_id, cache_key))
+
+    def note_write(self, configuration_id: str) -> None:
+        self.written.add(configuration_id)
+
+    def flush_access_times(self) -> None:
+        accessed, self.accessed = self.accessed, set()
+        accessed_keys, self.accessed_keys = self.accessed_keys, set()
+        accessed_at = datetime.utcnow().isoformat()
+        ids = list(accessed)
+        for start in range(0, len(ids), self.batch_size):
+            touch_cache_entries(ids[start:start + self.batch_size], accessed_at)
+        by_configuration: Dict[str, List[str]] = {}
+        for configuration_id, cache_key in accessed_keys:
+            by_configuration.setdefault(configuration_id, []).append(cache_key)
+        for configuration_id, cache_keys in by_configuration.items():
+            for start in range(0, len(cache_keys), self.batch_size):
+                touch_cache_keys(configuration_id, cache_keys[start:start + self.batch_size], accessed_at)
+
+    def sweep_expired(self) -> None:
+        while True:
+            result = sweep_expired_cache(self.batch_size).data[0]
+            self.stats["expired_rows_deleted"] += result["deleted_rows"]
+            self.stats["expired_bytes_reclaimed"] += result["deleted_bytes"]
+            if result["deleted_rows"] < self.batch_size:
+                break
+
+    def enforce_quotas(self) -> None:
+        written, self.written = self.written, set()
+        for configuration_id in written:
+            result = evict_cache_lru(configuration_id, self.quota_bytes).data[0]
+            self.stats["evicted_rows"] += result["deleted_rows"]
+            self.stats["evicted_bytes_reclaimed"] += result["deleted_bytes"]
+
+    def sweep(self) -> Dict[str, Any]:
+        started = datetime.utcnow()
+        try:
+            # Access times go first so LRU eviction sees recent hits
+            self.flush_access_times()
+            self.sweep_expired()
+            self.enforce_quotas()
+            self.stats["last_error"] = None
+        except Exception as e:
+            self.stats["last_error"] = str(e)
+        self.stats["sweeps"] += 1
+        self.stats["last_sweep_at"] = started.isoformat()
+        self.stats["last_sweep_duration"] = (datetime.utcnow() - started).total_seconds()
+        return self.stats
+
+    def report(self) -> Dict[str, Any]:
+        table = get_cache_table_stats().data
+        return {"table": table[0] if table else None, "maintenance": self.stats}
+
+cache_maintenance = CacheMaintenance(settings.CACHE_SWEEP_BATCH_SIZE, settings.CACHE_QUOTA_BYTES_PER_CONFIGURATION)
+
+async def run_sweeper(maintenance: CacheMaintenance, interval_seconds: float) -> None:
+    """Periodically sweep the cache table off the event loop."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await asyncio.to_thread(maintenance.sweep)
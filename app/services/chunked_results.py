@@ -0,0 +1,204 @@
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+import base64
+import json
+from app.core.config import settings
+
+def _lists(value: Any, prefix: str = "") -> Iterator[Tuple[str, List[Any]]]:
+    if not isinstance(value, dict):
+        return
+    for key, item in value.items():
+        if not isinstance(key, str) or "." in key:
+            continue
+        if isinstance(item, list):
+            yield prefix + key, item
+        elif isinstance(item, dict):
+            yield from _lists(item, f"{prefix}{key}.")
+
+def find_records_key(value: Any) -> Optional[str]:
+    """Dotted path of the list in a result that holds its records: the longest one.
+
+    Lists inside nested objects count too, since the pipeline returns
+    ``{"data": ..., "metadata": ...}`` with the records under ``data``.
+    """
+    records_key, longest = None, -1
+    for path, item in _lists(value):
+        if len(item) > longest:
+            records_key, longest = path, len(item)
+    return records_key
+
+def records_at(value: Any, records_key: str) -> List[Any]:
+    for key in records_key.split("."):
+        value = value[key]
+    return value
+
+def with_records(value: Dict[str, Any], records_key: str, records: List[Any]) -> Dict[str, Any]:
+    """Copy of ``value`` with the list at ``records_key`` replaced, sharing everything else."""
+    key, _, rest = records_key.partition(".")
+    return {**value, key: with_records(value[key], rest, records) if rest else records}
+
+def split_result(value: Any, chunk_records: int) -> Tuple[Any, Optional[str], List[List[Any]]]:
+    """Split a result into what the cache row stores and the chunks of its record list.
+
+    Results whose records fit in one chunk are stored whole, without chunks.
+    Otherwise the row keeps the envelope with an empty record list.
+    """
+    records_key = find_records_key(value)
+    if records_key is None or len(records_at(value, records_key)) <= chunk_records:
+        return value, records_key, []
+    records = records_at(value, records_key)
+    chunks = [records[start:start + chunk_records] for start in range(0, len(records), chunk_records)]
+    return with_records(value, records_key, []), records_key, chunks
+
+class ResultLayout:
+    """Where a cached result's records live: inline in the cache row or in chunk rows."""
+
+    __slots__ = ("etag", "envelope", "records_key", "record_count", "chunk_size", "records", "size_bytes")
+
+    def __init__(
+        self,
+        etag: Optional[str],
+        envelope: Any,
+        records_key: Optional[str],
+        record_count: int,
+        chunk_size: Optional[int] = None,
+        records: Optional[List[Any]] = None,
+        size_bytes: int = 0
+    ):
+        self.etag = etag
+        self.envelope = envelope
+        self.records_key = records_key
+        self.record_count = record_count
+        self.chunk_size = chunk_size
+        self.records = records
+        self.size_bytes = size_bytes
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ResultLayout":
+        value = row["cache_value"]
+        size_bytes = row.get("size_bytes") or 0
+        if row.get("chunk_size"):
+            return cls(row.get("etag"), value, row["records_key"], row["record_count"], row["chunk_size"], size_bytes=size_bytes)
+        # Small results, and rows written before results were chunked
+        records_key = row.get("records_key") or find_records_key(value)
+        records = records_at(value, records_key) if records_key is not None else None
+        return cls(row.get("etag"), value, records_key, len(records) if records is not None else 0, records=records, size_bytes=size_bytes)
+
+    @property
+    def chunked(self) -> bool:
+        return self.chunk_size is not None
+
+    def chunk_range(self, start: int, stop: int) -> range:
+        if stop <= start:
+            return range(0)
+        return range(start // self.chunk_size, (stop - 1) // self.chunk_size + 1)
+
+    def chunk_bytes(self, records: int) -> int:
+        """Approximate share of the encoded result taken by ``records`` records."""
+        return self.size_bytes * records // max(self.record_count, 1)
+
+def encode_offset_cursor(offset: int) -> str:
+    raw = json.dumps([offset], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (offset,) = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+def project(item: Any, fields: Optional[List[str]]) -> Any:
+    if not fields or not isinstance(item, dict):
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+class ResultSlice:
+    """A window of a result's records and the fields to keep in each."""
+
+    def __init__(self, offset: int = 0, limit: Optional[int] = None, fields: Optional[List[str]] = None):
+        self.offset = offset
+        self.limit = limit
+        self.fields = fields
+
+    @classmethod
+    def from_query(cls, offset: Optional[int], limit: Optional[int], cursor: Optional[str], fields: Optional[List[str]]) -> "ResultSlice":
+        if cursor is not None and offset is not None:
+            raise ValueError("Use either offset or cursor, not both")
+        if cursor is not None:
+            offset = decode_offset_cursor(cursor)
+        return cls(offset or 0, limit, fields)
+
+    @property
+    def windowed(self) -> bool:
+        return self.offset > 0 or self.limit is not None
+
+    @property
+    def whole(self) -> bool:
+        return not self.windowed and not self.fields
+
+    def bounds(self, total: int) -> Tuple[int, int]:
+        start = min(self.offset, total)
+        stop = total if self.limit is None else min(start + self.limit, total)
+        return start, stop
+
+    def next_cursor(self, total: int) -> Optional[str]:
+        _, stop = self.bounds(total)
+        return encode_offset_cursor(stop) if stop < total else None
+
+    def page(self, layout: ResultLayout, records: List[Any]) -> Any:
+        """The result as the client asked for it: sliced records, projected fields.
+
+        A result without a record list can only be projected, on its top-level keys.
+        """
+        if layout.records_key is None:
+            return project(layout.envelope, self.fields)
+        return with_records(layout.envelope, layout.records_key, [project(record, self.fields) for record in records])
+
+class ResultChunkCache:
+    """Byte-bounded LRU of result layouts and decoded record chunks.
+
+    Everything is keyed by the result's ETag, a content hash, so entries
+    never go stale; they are only evicted for space.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple[str, Optional[int]], Tuple[Any, int]]" = OrderedDict()
+        self.total_bytes = 0
+
+    def _get(self, key: Tuple[str, Optional[int]]) -> Any:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key: Tuple[str, Optional[int]], value: Any, size: int) -> None:
+        existing = self.entries.pop(key, None)
+        if existing is not None:
+            self.total_bytes -= existing[1]
+        self.entries[key] = (value, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def get_layout(self, etag: str) -> Optional[ResultLayout]:
+        return self._get((etag, None))
+
+    def put_layout(self, layout: ResultLayout) -> None:
+        if layout.etag is not None:
+            # Inline layouts carry their records; chunked ones only the envelope
+            self._put((layout.etag, None), layout, layout.chunk_bytes(0 if layout.chunked else layout.record_count) + 256)
+
+    def get_chunk(self, etag: str, index: int) -> Optional[List[Any]]:
+        return self._get((etag, index))
+
+    def put_chunk(self, layout: ResultLayout, index: int, records: List[Any]) -> None:
+        self._put((layout.etag, index), records, layout.chunk_bytes(len(records)))
+
+result_chunks = ResultChunkCache(settings.RESULT_CHUNK_CACHE_MAX_BYTES)
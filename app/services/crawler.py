@@ -0,0 +1,182 @@
+from typing import Dict, Any, Callable, Iterator, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import re
+import uuid
+from app.services.history import create_scraping_history
+from app.services.scheduler import scraping_scheduler, QueueFullError, BULK
+from app.services import scraping_service
+from app.services.scraping_service import scrape_single_url
+from app.services.render_profiles import install_render_hooks
+from app.services.url_frontier import UrlFrontier, normalize_url, site_of
+
+MAX_TRACKED_JOBS = 1000
+QUEUE_FULL_RETRY_SECONDS = 0.5
+QUEUE_FULL_MAX_RETRY_SECONDS = 5.0
+
+def iter_links(links: Any) -> Iterator[str]:
+    """Yield hrefs from crawl4ai's ``result.links`` in any of its shapes."""
+    if isinstance(links, dict):
+        for group in links.values():
+            yield from iter_links(group)
+    elif isinstance(links, list):
+        for link in links:
+            if isinstance(link, dict):
+                if link.get("href"):
+                    yield link["href"]
+            elif isinstance(link, str):
+                yield link
+
+class CrawlJob:
+    def __init__(self, configuration: Dict[str, Any], user_id: str, crawl_settings: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.configuration = configuration
+        self.user_id = user_id
+        self.settings = crawl_settings
+        self.status = "pending"
+        self.pages_crawled = 0
+        self.pages_failed = 0
+        self.pages_queued = 0
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "configuration_id": self.configuration["id"],
+            "status": self.status,
+            "settings": self.settings,
+            "pages_crawled": self.pages_crawled,
+            "pages_failed": self.pages_failed,
+            "pages_queued": self.pages_queued,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+async def _scrape(crawler: Any, job: CrawlJob, url: str, selectors: Dict[str, str]) -> Dict[str, Any]:
+    # Bulk work waits for room in the user's queue rather than failing the page
+    delay = QUEUE_FULL_RETRY_SECONDS
+    while True:
+        try:
+            async with scraping_scheduler.slot(job.user_id, BULK):
+                return await scrape_single_url(crawler, url, selectors, job.configuration.get("render_profile"))
+        except QueueFullError:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, QUEUE_FULL_MAX_RETRY_SECONDS)
+
+def _allowed(url: str, root_site: str, crawl_settings: Dict[str, Any]) -> bool:
+    if crawl_settings.get("same_site", True) and site_of(url) != root_site:
+        return False
+    include = crawl_settings.get("include_patterns") or []
+    if include and not any(re.search(pattern, url) for pattern in include):
+        return False
+    return not any(re.search(pattern, url) for pattern in crawl_settings.get("exclude_patterns") or [])
+
+async def _crawl_page(crawler: Any, job: CrawlJob, frontier: UrlFrontier, url: str, depth: int, root_site: str) -> None:
+    crawl_settings = job.settings
+    try:
+        result = await _scrape(crawler, job, url, job.configuration["selectors"])
+    except Exception as e:
+        result = {"error": str(e)}
+    status = "error" if "error" in result else "success"
+    if status == "error":
+        job.pages_failed += 1
+    else:
+        job.pages_crawled += 1
+        for href in iter_links(result.get("links")):
+            link = normalize_url(href, base=url)
+            if link is not None and _allowed(link, root_site, crawl_settings):
+                frontier.push(link, depth + 1)
+    # A blocking Supabase write; keep it off the event loop
+    await asyncio.to_thread(
+        create_scraping_history,
+        configuration_id=job.configuration["id"],
+        status=status,
+        result={key: value for key, value in result.items() if key != "links"},
+        metadata={"url": url, "depth": depth, "crawl_job_id": job.id}
+    )
+
+async def run_crawl(job: CrawlJob, crawler_class: Optional[Callable[..., Any]] = None) -> None:
+    """Breadth-first crawl from the configuration URL, following extracted links.
+
+    ``concurrency`` workers drain the frontier through the shared-crawler
+    batch path, each taking the next URL as soon as its page is done, and
+    every page is written to scraping_history. The crawl ends when the
+    frontier is empty and no page is in flight.
+    """
+    crawl_settings = job.settings
+    start_url = normalize_url(job.configuration["url"])
+    root_site = site_of(start_url)
+    frontier = UrlFrontier(crawl_settings.get("max_depth", 2), crawl_settings.get("max_pages", 100))
+    frontier.push(start_url, 0)
+    changed = asyncio.Condition()
+    in_flight = 0
+
+    async def worker(crawler: Any) -> None:
+        nonlocal in_flight
+        while True:
+            async with changed:
+                await changed.wait_for(lambda: len(frontier) > 0 or in_flight == 0)
+                if not len(frontier):
+                    return
+                url, depth = frontier.pop()
+                in_flight += 1
+            try:
+                await _crawl_page(crawler, job, frontier, url, depth, root_site)
+            finally:
+                async with changed:
+                    in_flight -= 1
+                    job.pages_queued = len(frontier)
+                    changed.notify_all()
+
+    job.status = "running"
+    job.started_at = datetime.utcnow().isoformat()
+    try:
+        crawler_class = crawler_class or scraping_service.AsyncWebCrawler
+        async with crawler_class(verbose=False) as crawler:
+            install_render_hooks(crawler)
+            workers = [asyncio.create_task(worker(crawler)) for _ in range(crawl_settings.get("concurrency", 4))]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        job.status = "completed"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.utcnow().isoformat()
+
+class CrawlJobRegistry:
+    """Running and recently finished crawl jobs, bounded to the newest entries."""
+
+    def __init__(self, max_jobs: int = MAX_TRACKED_JOBS):
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, CrawlJob]" = OrderedDict()
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, configuration: Dict[str, Any], user_id: str, crawl_settings: Dict[str, Any]) -> CrawlJob:
+        job = CrawlJob(configuration, user_id, crawl_settings)
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+        task = asyncio.create_task(run_crawl(job))
+        self.tasks[job.id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(job.id, None))
+        return job
+
+    def get(self, job_id: str, user_id: str) -> Optional[CrawlJob]:
+        job = self.jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def list(self, user_id: str) -> List[CrawlJob]:
+        return [job for job in self.jobs.values() if job.user_id == user_id]
+
+crawl_jobs = CrawlJobRegistry()
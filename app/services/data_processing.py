@@ -1,6 +1,5 @@
 from typing import Dict, Any, List
 import re
-from bs4 import BeautifulSoup
 from datetime import datetime
 import json
 
@@ -10,6 +9,7 @@ def clean_text(text: str) -> str:
 
 def extract_text_from_html(html: str) -> str:
     """Extract text content from HTML."""
+    from bs4 import BeautifulSoup  # deferred: only needed once data is processed
     soup = BeautifulSoup(html, 'html.parser')
     return clean_text(soup.get_text())
 
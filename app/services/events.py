@@ -0,0 +1,103 @@
+from typing import Dict, Any, Awaitable, Callable, Optional, Set
+import asyncio
+from app.core.config import settings
+
+def format_event(event_id: str, data: bytes, event: str = "update") -> bytes:
+    """Frame a compact JSON body as a server-sent event."""
+    return b"id: " + event_id.encode("utf-8") + b"\nevent: " + event.encode("utf-8") + b"\ndata: " + data + b"\n\n"
+
+class Subscriber:
+    """One SSE connection's outbox.
+
+    Every event carries the complete current result, so when a slow
+    consumer's queue is full the oldest pending event is dropped: the
+    consumer skips intermediate states but always ends on the latest one.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, frame: bytes) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+class Topic:
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self.last_etag: Optional[str] = None
+        self.last_frame: Optional[bytes] = None
+        self.refresher: Optional[asyncio.Task] = None
+
+class EventBroker:
+    """Fan-out of dynamic endpoint changes to SSE subscribers.
+
+    Each change is framed once and the same bytes object is queued for
+    every subscriber. While a topic has subscribers a single refresher
+    task per topic keeps it up to date, however many clients listen.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.topics: Dict[str, Topic] = {}
+
+    def subscribe(self, key: str) -> Subscriber:
+        topic = self.topics.setdefault(key, Topic())
+        subscriber = Subscriber(self.queue_size)
+        if topic.last_frame is not None:
+            subscriber.offer(topic.last_frame)
+        topic.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, key: str, subscriber: Subscriber) -> None:
+        topic = self.topics.get(key)
+        if topic is None:
+            return
+        topic.subscribers.discard(subscriber)
+        if not topic.subscribers:
+            if topic.refresher is not None:
+                topic.refresher.cancel()
+            del self.topics[key]
+
+    def publish(self, key: str, etag: str, body: bytes) -> bool:
+        """Send a result to subscribers if it differs from the last one sent."""
+        topic = self.topics.get(key)
+        if topic is None or topic.last_etag == etag:
+            return False
+        topic.last_etag = etag
+        topic.last_frame = format_event(etag.strip('"'), body)
+        for subscriber in topic.subscribers:
+            subscriber.offer(topic.last_frame)
+        return True
+
+    def ensure_refresher(self, key: str, refresh: Callable[[], Awaitable[Any]], interval_seconds: float) -> None:
+        topic = self.topics.get(key)
+        if topic is None or (topic.refresher is not None and not topic.refresher.done()):
+            return
+        topic.refresher = asyncio.create_task(self._refresh_loop(key, refresh, interval_seconds))
+
+    async def _refresh_loop(self, key: str, refresh: Callable[[], Awaitable[Any]], interval_seconds: float) -> None:
+        while key in self.topics:
+            try:
+                encoded = await refresh()
+                if encoded is not None:
+                    self.publish(key, encoded.etag, encoded.body)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Event refresh failed for {key}: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            key: {
+                "subscribers": len(topic.subscribers),
+                "dropped": sum(subscriber.dropped for subscriber in topic.subscribers),
+                "last_etag": topic.last_etag,
+            }
+            for key, topic in self.topics.items()
+        }
+
+event_broker = EventBroker(settings.SSE_SUBSCRIBER_QUEUE_SIZE)
@@ -0,0 +1,149 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import base64
+import json
+import threading
+import zlib
+from postgrest.exceptions import APIError
+from app.core.config import settings
+from app.db.database import (
+    insert_scraping_history, get_latest_scraping_history, get_scraping_history_snapshot,
+    get_scraping_history_range
+)
+from app.services.json_patch import make_patch, apply_patch
+from app.services.url_frontier import normalize_url
+
+MAX_CACHED_CHAINS = 1000
+MAX_WRITE_ATTEMPTS = 3
+UNIQUE_VIOLATION = "23505"
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+def encode_snapshot(result: Any, compression_threshold: int) -> Dict[str, Any]:
+    """Columns for a full snapshot, zlib-compressing payloads above the threshold."""
+    raw = json.dumps(result, separators=(",", ":")).encode("utf-8")
+    if len(raw) <= compression_threshold:
+        return {"result": result, "compressed_result": None}
+    return {"result": None, "compressed_result": base64.b64encode(zlib.compress(raw, 6)).decode("ascii")}
+
+def decode_snapshot(row: Dict[str, Any]) -> Any:
+    if row.get("compressed_result"):
+        return json.loads(zlib.decompress(base64.b64decode(row["compressed_result"])))
+    return row.get("result")
+
+def source_key(metadata: Optional[Dict[str, Any]]) -> str:
+    url = (metadata or {}).get("url")
+    return (normalize_url(url) or url) if url else ""
+
+class HistoryStore:
+    """Versioned scraping history stored as periodic snapshots plus JSON-patch deltas.
+
+    Each (configuration_id, source_url) pair is its own chain. The head of
+    recently written chains is kept in memory so a new run only needs a
+    diff against the previous result, not a reconstruction from the table.
+    Another worker may have extended the chain since; its version then
+    collides on the unique index, and the head is reloaded and the write
+    retried.
+    """
+
+    def __init__(self, snapshot_interval: int, compression_threshold: int, max_cached_chains: int = MAX_CACHED_CHAINS):
+        self.snapshot_interval = snapshot_interval
+        self.compression_threshold = compression_threshold
+        self.max_cached_chains = max_cached_chains
+        self.heads: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        # Crawls record from worker threads
+        self.lock = threading.Lock()
+
+    def _remember(self, key: Tuple[str, str], head: Dict[str, Any]) -> None:
+        self.heads[key] = head
+        self.heads.move_to_end(key)
+        while len(self.heads) > self.max_cached_chains:
+            self.heads.popitem(last=False)
+
+    def _head(self, configuration_id: str, source_url: str) -> Optional[Dict[str, Any]]:
+        key = (configuration_id, source_url)
+        head = self.heads.get(key)
+        if head is not None:
+            self.heads.move_to_end(key)
+            return head
+        latest = get_latest_scraping_history(configuration_id, source_url).data
+        if not latest:
+            return None
+        version = latest[0]["version"]
+        head = {
+            "version": version,
+            "base_version": latest[0]["base_version"],
+            "result": self.reconstruct(configuration_id, source_url, version),
+        }
+        self._remember(key, head)
+        return head
+
+    def record(self, configuration_id: str, status: str, result: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        # Round-trip through JSON so the cached head matches what reconstruction returns
+        result = json.loads(json.dumps(result, default=str))
+        source_url = source_key(metadata)
+        key = (configuration_id, source_url)
+        with self.lock:
+            for attempt in range(MAX_WRITE_ATTEMPTS):
+                row = self._row(configuration_id, source_url, status, result, metadata)
+                try:
+                    inserted = insert_scraping_history(row)
+                except APIError as e:
+                    if e.code != UNIQUE_VIOLATION or attempt == MAX_WRITE_ATTEMPTS - 1:
+                        raise
+                    self.heads.pop(key, None)
+                    continue
+                self._remember(key, {"version": row["version"], "base_version": row["base_version"], "result": result})
+                return inserted
+
+    def _row(self, configuration_id: str, source_url: str, status: str, result: Any, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        head = self._head(configuration_id, source_url)
+        version = head["version"] + 1 if head else 1
+
+        row = {
+            "configuration_id": configuration_id,
+            "source_url": source_url,
+            "version": version,
+            "status": status,
+            "metadata": metadata,
+        }
+        delta = None
+        if head is not None and version - head["base_version"] < self.snapshot_interval:
+            patch = make_patch(head["result"], result)
+            # Fall back to a snapshot when the change is most of the document
+            if _json_size(patch) * 2 < _json_size(result):
+                delta = patch
+        if delta is not None:
+            row.update({"kind": "delta", "base_version": head["base_version"], "delta": delta})
+        else:
+            row.update({"kind": "snapshot", "base_version": version})
+            row.update(encode_snapshot(result, self.compression_threshold))
+        return row
+
+    def reconstruct(self, configuration_id: str, source_url: str, version: int) -> Any:
+        snapshot = get_scraping_history_snapshot(configuration_id, source_url, version).data
+        if not snapshot:
+            raise LookupError(f"History version {version} not found")
+        snapshot = snapshot[0]
+        result = decode_snapshot(snapshot)
+        if snapshot["version"] == version:
+            return result
+        deltas = get_scraping_history_range(configuration_id, source_url, snapshot["version"], version).data
+        if not deltas or deltas[-1]["version"] != version:
+            raise LookupError(f"History version {version} not found")
+        # Copy once on the first patch, then patch that copy in place
+        for index, row in enumerate(deltas):
+            result = apply_patch(result, row["delta"], in_place=index > 0)
+        return result
+
+    def diff(self, configuration_id: str, source_url: str, from_version: int, to_version: int) -> List[Dict[str, Any]]:
+        return make_patch(
+            self.reconstruct(configuration_id, source_url, from_version),
+            self.reconstruct(configuration_id, source_url, to_version),
+        )
+
+history_store = HistoryStore(settings.HISTORY_SNAPSHOT_INTERVAL, settings.HISTORY_COMPRESSION_THRESHOLD_BYTES)
+
+def create_scraping_history(configuration_id: str, status: str, result: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return history_store.record(configuration_id, status, result, metadata)
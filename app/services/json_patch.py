@@ -0,0 +1,73 @@
+from typing import Any, Dict, List
+import copy
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def make_patch(source: Any, target: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Build an RFC 6902 patch (add/remove/replace only) turning source into target."""
+    if type(source) is not type(target):
+        return [{"op": "replace", "path": path, "value": target}]
+
+    if isinstance(source, dict):
+        ops = []
+        for key in source:
+            if key not in target:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            if key not in source:
+                ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": value})
+            else:
+                ops.extend(make_patch(source[key], value, f"{path}/{_escape(key)}"))
+        return ops
+
+    if isinstance(source, list):
+        ops = []
+        common = min(len(source), len(target))
+        for index in range(common):
+            ops.extend(make_patch(source[index], target[index], f"{path}/{index}"))
+        for index in range(common, len(target)):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": target[index]})
+        # Remove from the end so earlier indexes stay valid
+        for index in range(len(source) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        return ops
+
+    if source != target:
+        return [{"op": "replace", "path": path, "value": target}]
+    return []
+
+def apply_patch(document: Any, patch: List[Dict[str, Any]], in_place: bool = False) -> Any:
+    """Apply a patch produced by make_patch, returning the patched document."""
+    if not in_place:
+        document = copy.deepcopy(document)
+    for op in patch:
+        if op["path"] == "":
+            document = copy.deepcopy(op["value"]) if op["op"] != "remove" else None
+            continue
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            elif op["op"] == "replace":
+                parent[index] = copy.deepcopy(op["value"])
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+        else:
+            if op["op"] in ("add", "replace"):
+                parent[last] = copy.deepcopy(op["value"])
+            elif op["op"] == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+    return document
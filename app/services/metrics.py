@@ -0,0 +1,237 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import math
+import os
+import socket
+import time
+from app.core.config import settings
+from app.db.database import create_metrics_checkpoints
+
+class QuantileSketch:
+    """Mergeable log-bucketed quantile sketch with bounded relative error."""
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= self.min_value:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def subtract(self, other: "QuantileSketch") -> None:
+        """Remove the contents of a sketch previously merged into this one."""
+        for index, count in other.bins.items():
+            remaining = self.bins.get(index, 0) - count
+            if remaining > 0:
+                self.bins[index] = remaining
+            else:
+                self.bins.pop(index, None)
+        self.zero_count -= other.zero_count
+        self.count -= other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return self._value(index)
+        return self._value(max(self.bins))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "bins": {str(index): count for index, count in self.bins.items()},
+        }
+
+class _WindowSlot:
+    __slots__ = ("epoch", "count", "error_count", "total", "sketch")
+
+    def __init__(self, relative_accuracy: float):
+        self.epoch = -1
+        self.count = 0
+        self.error_count = 0
+        self.total = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+class RollingAggregator:
+    """Rolling window of request outcomes for a single configuration.
+
+    The window is a ring of fixed-width time slots. Running totals are kept
+    for the whole window and expired slots are subtracted out, so reading
+    the current stats never scans stored samples. Slots only expire when
+    the clock enters a new slot, and the snapshot is computed once per
+    slot, so it may lag new requests by up to ``slot_seconds``.
+    """
+
+    def __init__(self, window_seconds: int = 600, slot_seconds: int = 10, relative_accuracy: float = 0.01):
+        self.slot_seconds = slot_seconds
+        self.slots = [_WindowSlot(relative_accuracy) for _ in range(max(1, window_seconds // slot_seconds))]
+        self.count = 0
+        self.error_count = 0
+        self.total = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.relative_accuracy = relative_accuracy
+        self.dirty = False
+        self.expired_epoch = -1
+        self.cached_epoch = -1
+        self.cached: Optional[Dict[str, Any]] = None
+
+    def _expire(self, now: float) -> None:
+        epoch = int(now // self.slot_seconds)
+        if epoch == self.expired_epoch:
+            return
+        self.expired_epoch = epoch
+        oldest_epoch = epoch - len(self.slots) + 1
+        for slot in self.slots:
+            if slot.epoch != -1 and slot.epoch < oldest_epoch:
+                self._clear_slot(slot)
+
+    def _clear_slot(self, slot: _WindowSlot) -> None:
+        self.count -= slot.count
+        self.error_count -= slot.error_count
+        self.total -= slot.total
+        self.sketch.subtract(slot.sketch)
+        slot.epoch = -1
+        slot.count = 0
+        slot.error_count = 0
+        slot.total = 0.0
+        slot.sketch = QuantileSketch(self.relative_accuracy)
+
+    def record(self, execution_time: Optional[float], error: bool = False, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self._expire(now)
+        epoch = int(now // self.slot_seconds)
+        slot = self.slots[epoch % len(self.slots)]
+        if slot.epoch != epoch:
+            self._clear_slot(slot)
+            slot.epoch = epoch
+        slot.count += 1
+        self.count += 1
+        if error:
+            slot.error_count += 1
+            self.error_count += 1
+        if execution_time is not None:
+            slot.total += execution_time
+            self.total += execution_time
+            slot.sketch.add(execution_time)
+            self.sketch.add(execution_time)
+        self.dirty = True
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        epoch = int(now // self.slot_seconds)
+        if self.cached is None or self.cached_epoch != epoch:
+            self.cached = self.compute(now)
+            self.cached_epoch = epoch
+        return self.cached
+
+    def compute(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Current stats, bypassing the per-slot snapshot cache."""
+        self._expire(time.time() if now is None else now)
+        timed = self.sketch.count
+        return {
+            "count": self.count,
+            "error_count": self.error_count,
+            "error_rate": self.error_count / self.count if self.count else None,
+            "avg_execution_time": self.total / timed if timed else None,
+            "p50": self.sketch.quantile(0.50),
+            "p95": self.sketch.quantile(0.95),
+            "p99": self.sketch.quantile(0.99),
+        }
+
+class MetricsRegistry:
+    """Per-configuration rolling aggregators, kept in process memory.
+
+    Each worker process only sees the requests it served itself, so under
+    several workers /health reports one worker's share of the traffic.
+    Checkpoints are tagged with the worker that wrote them; the combined
+    view is the merge of each worker's latest checkpoint sketch.
+    """
+
+    def __init__(self, window_seconds: int = 600, slot_seconds: int = 10):
+        self.window_seconds = window_seconds
+        self.slot_seconds = slot_seconds
+        self.aggregators: Dict[str, RollingAggregator] = {}
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+
+    def get(self, configuration_id: str) -> RollingAggregator:
+        aggregator = self.aggregators.get(configuration_id)
+        if aggregator is None:
+            aggregator = RollingAggregator(self.window_seconds, self.slot_seconds)
+            self.aggregators[configuration_id] = aggregator
+        return aggregator
+
+    def record(self, configuration_id: str, execution_time: Optional[float], error: bool = False) -> None:
+        self.get(configuration_id).record(execution_time, error)
+
+    def snapshot(self, configuration_id: str) -> Dict[str, Any]:
+        return self.get(configuration_id).snapshot()
+
+    def checkpoint(self) -> List[Dict[str, Any]]:
+        """Collect snapshots of every aggregator that changed since the last checkpoint."""
+        rows = []
+        for configuration_id, aggregator in self.aggregators.items():
+            if not aggregator.dirty:
+                continue
+            aggregator.dirty = False
+            row = aggregator.compute()
+            row.pop("error_rate")
+            row["configuration_id"] = configuration_id
+            row["worker"] = self.worker
+            row["window_seconds"] = self.window_seconds
+            row["sketch"] = aggregator.sketch.to_dict()
+            rows.append(row)
+        return rows
+
+    def mark_dirty(self, configuration_ids: List[str]) -> None:
+        """Include these aggregators in the next checkpoint again, after a failed write."""
+        for configuration_id in configuration_ids:
+            aggregator = self.aggregators.get(configuration_id)
+            if aggregator is not None:
+                aggregator.dirty = True
+
+metrics_registry = MetricsRegistry(settings.METRICS_WINDOW_SECONDS, settings.METRICS_SLOT_SECONDS)
+
+def health_status(snapshot: Dict[str, Any], max_error_rate: float = 0.1) -> str:
+    error_rate = snapshot["error_rate"]
+    return "healthy" if error_rate is None or error_rate < max_error_rate else "unhealthy"
+
+async def run_checkpoints(registry: MetricsRegistry, interval_seconds: float) -> None:
+    """Periodically persist aggregator snapshots to the metrics_checkpoints table."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        rows = registry.checkpoint()
+        if not rows:
+            continue
+        try:
+            create_metrics_checkpoints(rows)
+        except Exception as e:
+            registry.mark_dirty([row["configuration_id"] for row in rows])
+            print(f"Metrics checkpoint failed: {str(e)}")
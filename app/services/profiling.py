@@ -0,0 +1,183 @@
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+import cProfile
+import pstats
+import random
+import time
+import tracemalloc
+import uuid
+from app.core.config import settings
+
+_current: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+_no_phase = nullcontext()
+
+class Profile:
+    """What one profiled request spent its time and memory on."""
+
+    def __init__(self, endpoint_url: str, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.endpoint_url = endpoint_url
+        self.trigger = trigger
+        self.started_at = datetime.utcnow().isoformat()
+        self.wall_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+        self.phases_ms: Dict[str, float] = {}
+        self.functions: List[Dict[str, Any]] = []
+        self.allocations: List[Dict[str, Any]] = []
+        self.memory_peak_bytes: Optional[int] = None
+        self.status_code: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def add_phase(self, name: str, elapsed: float) -> None:
+        self.phases_ms[name] = round(self.phases_ms.get(name, 0.0) + elapsed * 1000, 3)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "endpoint_url": self.endpoint_url,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "status_code": self.status_code,
+            "error": self.error,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.summary(),
+            "phases_ms": self.phases_ms,
+            "functions": self.functions,
+            "allocations": self.allocations,
+            "memory_peak_bytes": self.memory_peak_bytes,
+        }
+
+class ProfileStore:
+    """The most recent profiles, oldest evicted first."""
+
+    def __init__(self, max_entries: int = 50):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Profile]" = OrderedDict()
+
+    def add(self, profile: Profile) -> None:
+        self.entries[profile.id] = profile
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self.entries.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [profile.summary() for profile in reversed(self.entries.values())]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+def phase(name: str):
+    """Time a block under the request's profile. Costs nothing when the request is not profiled."""
+    profile = _current.get()
+    return _no_phase if profile is None else _timed_phase(profile, name)
+
+@contextmanager
+def _timed_phase(profile: Profile, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(name, time.perf_counter() - start)
+
+def _function_stats(profiler: cProfile.Profile, limit: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({function})",
+            "calls": ncalls,
+            "total_ms": round(tottime * 1000, 3),
+            "cumulative_ms": round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+def _allocation_stats(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int) -> List[Dict[str, Any]]:
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    differences = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    return [
+        {
+            "location": str(difference.traceback),
+            "size_bytes": difference.size_diff,
+            "count": difference.count_diff,
+        }
+        for difference in differences[:limit] if difference.size_diff > 0
+    ]
+
+class RequestProfiler:
+    """cProfile and tracemalloc capture for individual requests.
+
+    One request is profiled at a time; requests arriving while a profile
+    is running are served normally. cProfile only sees code running on
+    the event loop thread, including other requests' coroutines while the
+    profiled one awaits, so time spent waiting on the browser or the
+    database shows up as the gap between wall and CPU time and in the
+    named phases rather than in the function table.
+    """
+
+    def __init__(self, store: ProfileStore, default_sample_rate: float = 0.0, top_n: int = 30):
+        self.store = store
+        self.default_sample_rate = default_sample_rate
+        self.top_n = top_n
+        self.sample_rates: Dict[str, float] = {}
+        self.active = False
+
+    def set_sample_rate(self, endpoint_url: str, rate: float) -> None:
+        if not 0 <= rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+        self.sample_rates[endpoint_url] = rate
+
+    def should_sample(self, endpoint_url: str) -> bool:
+        rate = self.sample_rates.get(endpoint_url, self.default_sample_rate)
+        return rate > 0 and random.random() < rate
+
+    @asynccontextmanager
+    async def profile(self, endpoint_url: str, trigger: Optional[str]):
+        """Profile the enclosed block if a trigger is given, yielding the Profile or None."""
+        if trigger is None or self.active:
+            yield None
+            return
+        profiler = cProfile.Profile()
+        self.active = True
+        profile = Profile(endpoint_url, trigger)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        token = _current.set(profile)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        profiler.enable()
+        try:
+            yield profile
+        except Exception as e:
+            # HTTPException carries the status the client will see
+            profile.status_code = getattr(e, "status_code", None)
+            profile.error = str(getattr(e, "detail", e))
+            raise
+        finally:
+            profiler.disable()
+            profile.wall_ms = round((time.perf_counter() - wall_start) * 1000, 3)
+            profile.cpu_ms = round((time.process_time() - cpu_start) * 1000, 3)
+            _current.reset(token)
+            after = tracemalloc.take_snapshot()
+            profile.memory_peak_bytes = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+            self.active = False
+            profile.functions = _function_stats(profiler, self.top_n)
+            profile.allocations = _allocation_stats(before, after, self.top_n)
+            self.store.add(profile)
+
+profile_store = ProfileStore(settings.PROFILE_STORE_MAX_ENTRIES)
+request_profiler = RequestProfiler(profile_store, settings.PROFILE_SAMPLE_RATE, settings.PROFILE_TOP_N)
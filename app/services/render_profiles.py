@@ -0,0 +1,169 @@
+from typing import Dict, Any, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+import asyncio
+import time
+
+# Extraction only reads text through CSS selectors, so nothing here is needed
+LEAN_BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet")
+TRACKER_DOMAINS = (
+    "*.google-analytics.com",
+    "*.googletagmanager.com",
+    "*.doubleclick.net",
+    "*.facebook.net",
+    "*.hotjar.com",
+)
+# Playwright resource types that can be blocked; the document itself never is
+RESOURCE_TYPES = (
+    "stylesheet", "image", "media", "font", "script", "texttrack",
+    "xhr", "fetch", "eventsource", "websocket", "manifest", "other",
+)
+WAIT_STRATEGIES = ("domcontentloaded", "networkidle", "selector")
+
+DEFAULT_RENDER_PROFILE: Dict[str, Any] = {
+    "blocked_resource_types": list(LEAN_BLOCKED_RESOURCE_TYPES),
+    "blocked_domains": list(TRACKER_DOMAINS),
+    "wait_until": "domcontentloaded",
+    "wait_for_selector": None,
+    "viewport_width": 1280,
+    "viewport_height": 720,
+    "javascript": True,
+    "max_script_bytes": None,
+    "timeout_ms": 30000,
+}
+
+def resolve_render_profile(render_profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """A configuration's render profile with unset keys taken from the lean default."""
+    profile = {**DEFAULT_RENDER_PROFILE, **{key: value for key, value in (render_profile or {}).items() if value is not None}}
+    if not profile["javascript"] and "script" not in profile["blocked_resource_types"]:
+        profile["blocked_resource_types"] = [*profile["blocked_resource_types"], "script"]
+    return profile
+
+class RenderStats:
+    """Network and timing cost of rendering one page."""
+
+    def __init__(self):
+        self.bytes_transferred: Optional[int] = None
+        self.requests = 0
+        self.blocked_requests = 0
+        self.script_bytes = 0
+        self.render_time: Optional[float] = None
+        self.pending: List[asyncio.Task] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bytes_transferred": self.bytes_transferred,
+            "requests": self.requests,
+            "blocked_requests": self.blocked_requests,
+            "render_time": self.render_time,
+        }
+
+class _RenderSession:
+    __slots__ = ("profile", "stats")
+
+    def __init__(self, profile: Dict[str, Any], stats: RenderStats):
+        self.profile = profile
+        self.stats = stats
+
+_session: ContextVar[Optional[_RenderSession]] = ContextVar("render_session", default=None)
+
+@contextmanager
+def render_session(render_profile: Optional[Dict[str, Any]]):
+    """Apply a render profile to pages the current task renders, yielding their RenderStats.
+
+    Hooks run inside the task that awaits ``arun``, so concurrent pages on
+    a shared crawler each see their own profile and stats.
+    """
+    stats = RenderStats()
+    token = _session.set(_RenderSession(resolve_render_profile(render_profile), stats))
+    start = time.time()
+    try:
+        yield stats
+    finally:
+        stats.render_time = time.time() - start
+        _session.reset(token)
+
+def _blocked(session: _RenderSession, resource_type: str, url: str) -> bool:
+    profile = session.profile
+    if resource_type in profile["blocked_resource_types"]:
+        return True
+    budget = profile["max_script_bytes"]
+    if resource_type == "script" and budget is not None and session.stats.script_bytes >= budget:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(_domain_matches(host, pattern) for pattern in profile["blocked_domains"])
+
+def _domain_matches(host: str, pattern: str) -> bool:
+    # "*.example.com" covers example.com itself as well as its subdomains
+    return fnmatch(host, pattern) or (pattern.startswith("*.") and host == pattern[2:])
+
+async def _count_transfer(stats: RenderStats, request: Any) -> None:
+    try:
+        sizes = await request.sizes()
+    except Exception:
+        return
+    size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+    stats.bytes_transferred = (stats.bytes_transferred or 0) + size
+    if request.resource_type == "script":
+        stats.script_bytes += sizes.get("responseBodySize", 0)
+
+async def _before_goto(page: Any, *args, **kwargs) -> Any:
+    session = _session.get()
+    if session is None:
+        return page
+    stats = session.stats
+    await page.set_viewport_size({"width": session.profile["viewport_width"], "height": session.profile["viewport_height"]})
+
+    async def route(route: Any) -> None:
+        request = route.request
+        if _blocked(session, request.resource_type, request.url):
+            stats.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def finished(request: Any) -> None:
+        stats.requests += 1
+        stats.pending.append(asyncio.ensure_future(_count_transfer(stats, request)))
+
+    await page.route("**/*", route)
+    page.on("requestfinished", finished)
+    return page
+
+async def _after_goto(page: Any, *args, **kwargs) -> Any:
+    session = _session.get()
+    if session is None:
+        return page
+    profile = session.profile
+    try:
+        if profile["wait_until"] == "networkidle":
+            await page.wait_for_load_state("networkidle", timeout=profile["timeout_ms"])
+        elif profile["wait_until"] == "selector" and profile["wait_for_selector"]:
+            await page.wait_for_selector(profile["wait_for_selector"], timeout=profile["timeout_ms"])
+    except Exception as e:
+        # Extract whatever has rendered rather than failing the page
+        print(f"Render wait ({profile['wait_until']}) timed out: {str(e)}")
+    return page
+
+async def _before_return_html(page: Any, html: str = "", *args, **kwargs) -> Any:
+    session = _session.get()
+    if session is not None and session.stats.pending:
+        await asyncio.gather(*session.stats.pending, return_exceptions=True)
+        session.stats.pending.clear()
+    return page
+
+RENDER_HOOKS = {
+    "before_goto": _before_goto,
+    "after_goto": _after_goto,
+    "before_return_html": _before_return_html,
+}
+
+def install_render_hooks(crawler: Any) -> None:
+    """Register the render profile hooks on a crawler's Playwright strategy."""
+    strategy = getattr(crawler, "crawler_strategy", None)
+    if strategy is None or not hasattr(strategy, "set_hook"):
+        return
+    for hook_type, hook in RENDER_HOOKS.items():
+        strategy.set_hook(hook_type, hook)
@@ -0,0 +1,138 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import gzip
+import hashlib
+import json
+from app.core.config import settings
+from app.services.shared_state import SharedBlobStore, shared_responses
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+def encode_json(value: Any) -> bytes:
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class EncodedResponse:
+    """Serialized body of a cached value plus its lazily built compressed variants."""
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        self.body = body
+        self.etag = etag or make_etag(body)
+        self.variants: Dict[str, bytes] = {}
+
+    def variant(self, encoding: Optional[str], min_bytes: int) -> Tuple[bytes, Optional[str]]:
+        if encoding is None or len(self.body) < min_bytes:
+            return self.body, None
+        if encoding not in self.variants:
+            if encoding == "br":
+                self.variants[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self.variants[encoding] = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self.variants[encoding], encoding
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+class EncodedResponseCache:
+    """Byte-bounded LRU of encoded responses keyed by ETag.
+
+    Keys are content hashes, so entries never go stale; they only need to
+    be evicted for space. With a shared store, bodies and compressed
+    variants are also published there so other workers on the host can
+    serve them without re-serializing or re-compressing.
+    """
+
+    def __init__(self, max_bytes: int, shared: Optional[SharedBlobStore] = None, shared_ttl_seconds: float = 0):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self.entries: "OrderedDict[str, EncodedResponse]" = OrderedDict()
+        self.total_bytes = 0
+
+    def get(self, etag: str) -> Optional[EncodedResponse]:
+        entry = self.entries.get(etag)
+        if entry is not None:
+            self.entries.move_to_end(etag)
+            return entry
+        body = self.shared.get(etag) if self.shared is not None else None
+        return self._add(EncodedResponse(body, etag)) if body is not None else None
+
+    def put(self, entry: EncodedResponse) -> EncodedResponse:
+        if entry.etag not in self.entries:
+            self._share(entry.etag, entry.body)
+        return self._add(entry)
+
+    def variant(self, entry: EncodedResponse, encoding: Optional[str], min_bytes: int) -> Tuple[bytes, Optional[str]]:
+        before = entry.size
+        shareable = self.shared is not None and encoding is not None and len(entry.body) >= min_bytes
+        if shareable and encoding not in entry.variants:
+            compressed = self.shared.get(f"{entry.etag}:{encoding}")
+            if compressed is not None:
+                entry.variants[encoding] = compressed
+            else:
+                self._share(f"{entry.etag}:{encoding}", entry.variant(encoding, min_bytes)[0])
+        result = entry.variant(encoding, min_bytes)
+        if entry.etag in self.entries:
+            self.total_bytes += entry.size - before
+            self._trim()
+        return result
+
+    def _add(self, entry: EncodedResponse) -> EncodedResponse:
+        existing = self.entries.pop(entry.etag, None)
+        if existing is not None:
+            self.total_bytes -= existing.size
+        self.entries[entry.etag] = entry
+        self.total_bytes += entry.size
+        self._trim()
+        return entry
+
+    def _share(self, key: str, value: bytes) -> None:
+        if self.shared is None:
+            return
+        try:
+            self.shared.set(key, value, self.shared_ttl_seconds)
+        except OSError as e:
+            # The local copy still serves this worker
+            print(f"Shared response store write failed: {str(e)}")
+
+    def _trim(self) -> None:
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+
+encoded_responses = EncodedResponseCache(
+    settings.RESPONSE_CACHE_MAX_BYTES, shared=shared_responses, shared_ttl_seconds=settings.CACHE_TTL_MINUTES * 60
+)
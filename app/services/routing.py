@@ -0,0 +1,168 @@
+from typing import Dict, Any, List, Optional, Set
+from datetime import datetime
+import time
+from app.core.config import settings
+from app.db.database import get_custom_endpoints, get_crawl_configurations_by_ids
+from app.db.storage import storage
+from app.services.shared_state import SharedCounters, shared_counters
+
+GENERATION_KEY = "routing:generation"
+GENERATION_TTL = 10 * 365 * 24 * 3600
+
+SCHEMA_TYPES = {
+    "string": str,
+    "str": str,
+    "integer": int,
+    "int": int,
+    "number": float,
+    "float": float,
+    "boolean": bool,
+    "bool": bool,
+    "object": dict,
+    "dict": dict,
+    "array": list,
+    "list": list,
+    "datetime": datetime,
+}
+
+TRANSFORMATIONS = {
+    "upper": lambda x: x.upper(),
+    "lower": lambda x: x.lower(),
+    "strip": lambda x: x.strip(),
+    "title": lambda x: x.title(),
+    "int": int,
+    "float": float,
+    "str": str,
+}
+
+class Pipeline:
+    """Schema and transformations of a custom endpoint, resolved once per route."""
+
+    def __init__(self, schema: Optional[Dict[str, Any]], transformations: Optional[Dict[str, Any]]):
+        self.schema = {key: SCHEMA_TYPES.get(value, value) if isinstance(value, str) else value
+                       for key, value in (schema or {}).items()}
+        self.transformations = {key: TRANSFORMATIONS.get(value, value) if isinstance(value, str) else value
+                                for key, value in (transformations or {}).items()}
+
+class Route:
+    __slots__ = ("endpoint", "configuration", "pipeline", "loaded_at")
+
+    def __init__(self, endpoint: Dict[str, Any], configuration: Dict[str, Any]):
+        self.endpoint = endpoint
+        self.configuration = configuration
+        self.loaded_at = time.monotonic()
+        self.pipeline = Pipeline(
+            endpoint.get("data_schema", endpoint.get("schema")),
+            endpoint.get("transformations"),
+        )
+
+    @property
+    def configuration_id(self) -> str:
+        return self.endpoint["configuration_id"]
+
+    @property
+    def user_id(self) -> str:
+        return self.endpoint["user_id"]
+
+class RoutingTable:
+    """In-memory map of endpoint_url to its endpoint, configuration and pipeline.
+
+    Loaded at startup and filled lazily on misses. Writers to
+    custom_endpoints or crawl_configurations must call the matching
+    invalidation method. Invalidations bump a generation counter shared
+    by every worker on the host, and a worker that sees the generation
+    move drops its whole table. Routes also expire after ``ttl`` seconds,
+    which bounds staleness for writes made on other hosts.
+
+    An endpoint only routes to a configuration owned by the same user.
+    """
+
+    def __init__(self, ttl: float = 60.0, counters: Optional[SharedCounters] = None):
+        self.ttl = ttl
+        self.counters = counters
+        self.generation = 0
+        self.routes: Dict[str, Route] = {}
+        self.by_configuration: Dict[str, Set[str]] = {}
+
+    def _clear(self) -> None:
+        self.routes.clear()
+        self.by_configuration.clear()
+
+    def _sync(self) -> None:
+        if self.counters is None:
+            return
+        generation = self.counters.get(GENERATION_KEY)
+        if generation != self.generation:
+            self._clear()
+            self.generation = generation
+
+    def _broadcast(self) -> None:
+        if self.counters is None:
+            return
+        generation = self.counters.incr(GENERATION_KEY, GENERATION_TTL)
+        # Another worker invalidated since our last sync, so ours may be stale too
+        if generation != self.generation + 1:
+            self._clear()
+        self.generation = generation
+
+    def _add(self, endpoint: Dict[str, Any], configuration: Dict[str, Any]) -> Route:
+        route = Route(endpoint, configuration)
+        self.routes[endpoint["endpoint_url"]] = route
+        self.by_configuration.setdefault(route.configuration_id, set()).add(endpoint["endpoint_url"])
+        return route
+
+    def load(self) -> int:
+        endpoints = get_custom_endpoints().data or []
+        configuration_ids = list({endpoint["configuration_id"] for endpoint in endpoints})
+        configurations = {}
+        if configuration_ids:
+            configurations = {config["id"]: config for config in get_crawl_configurations_by_ids(configuration_ids).data or []}
+        self._clear()
+        if self.counters is not None:
+            self.generation = self.counters.get(GENERATION_KEY)
+        for endpoint in endpoints:
+            configuration = configurations.get(endpoint["configuration_id"])
+            if owns(endpoint, configuration):
+                self._add(endpoint, configuration)
+        return len(self.routes)
+
+    async def resolve(self, endpoint_url: str) -> Optional[Route]:
+        self._sync()
+        route = self.routes.get(endpoint_url)
+        if route is not None and time.monotonic() - route.loaded_at < self.ttl:
+            return route
+        endpoint = await storage.get_custom_endpoint(endpoint_url)
+        if endpoint is None:
+            self.invalidate_endpoint(endpoint_url, broadcast=False)
+            return None
+        configuration = await storage.get_crawl_configuration(endpoint["configuration_id"])
+        if not owns(endpoint, configuration):
+            self.invalidate_endpoint(endpoint_url, broadcast=False)
+            return None
+        return self._add(endpoint, configuration)
+
+    def all(self) -> List[Route]:
+        return list(self.routes.values())
+
+    def invalidate_endpoint(self, endpoint_url: str, broadcast: bool = True) -> None:
+        route = self.routes.pop(endpoint_url, None)
+        if route is not None:
+            self.by_configuration.get(route.configuration_id, set()).discard(endpoint_url)
+        if broadcast:
+            self._broadcast()
+
+    def update_configuration(self, configuration: Dict[str, Any]) -> None:
+        for endpoint_url in self.by_configuration.get(configuration["id"], set()):
+            self.routes[endpoint_url].configuration = configuration
+        self._broadcast()
+
+    def invalidate_configuration(self, configuration_id: str) -> None:
+        for endpoint_url in self.by_configuration.pop(configuration_id, set()):
+            self.routes.pop(endpoint_url, None)
+        self._broadcast()
+
+def owns(endpoint: Dict[str, Any], configuration: Optional[Dict[str, Any]]) -> bool:
+    """Whether an endpoint may serve a configuration: both must belong to one user."""
+    return configuration is not None and configuration.get("user_id") == endpoint["user_id"]
+
+routing_table = RoutingTable(settings.ROUTE_TTL_SECONDS, shared_counters)
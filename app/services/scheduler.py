@@ -0,0 +1,181 @@
+from typing import Dict, Any, Deque, Optional
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import time
+from app.core.config import settings
+from app.services.metrics import RollingAggregator
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+class QueueFullError(Exception):
+    """Raised when a user already has the maximum number of scrapes waiting."""
+
+class _Waiter:
+    __slots__ = ("user_id", "priority", "tag", "enqueued_at", "future")
+
+    def __init__(self, user_id: str, priority: str, tag: float):
+        self.user_id = user_id
+        self.priority = priority
+        self.tag = tag
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+class _UserState:
+    __slots__ = ("weight", "running", "last_tag", "queues")
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.running = 0
+        self.last_tag = 0.0
+        self.queues: Dict[str, Deque[_Waiter]] = {priority: deque() for priority in PRIORITIES}
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+class FairScheduler:
+    """Weighted fair queuing of scraping work across users.
+
+    Every queued request gets a virtual finish tag of
+    ``max(virtual_time, user's last tag) + 1 / weight`` and a free slot goes
+    to the smallest tag among users under their concurrency cap, so a user
+    with a deep queue cannot push ahead of others. Interactive requests are
+    always dispatched before bulk ones, and ``interactive_reserved`` slots
+    are never given to bulk work so interactive latency does not depend on
+    how long bulk scrapes take.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        user_max_concurrency: int,
+        user_max_queued: int,
+        interactive_reserved: int = 0,
+        window_seconds: int = 600,
+        slot_seconds: int = 10
+    ):
+        self.max_concurrency = max_concurrency
+        self.user_max_concurrency = user_max_concurrency
+        self.user_max_queued = user_max_queued
+        self.interactive_reserved = min(interactive_reserved, max_concurrency - 1)
+        self.users: Dict[str, _UserState] = {}
+        self.weights: Dict[str, float] = {}
+        self.virtual_time = 0.0
+        self.running = {priority: 0 for priority in PRIORITIES}
+        self.rejected = {priority: 0 for priority in PRIORITIES}
+        self.wait_times = {priority: RollingAggregator(window_seconds, slot_seconds) for priority in PRIORITIES}
+
+    def set_weight(self, user_id: str, weight: float) -> None:
+        if weight <= 0:
+            raise ValueError("Weight must be positive")
+        self.weights[user_id] = weight
+        if user_id in self.users:
+            self.users[user_id].weight = weight
+
+    def _user(self, user_id: str) -> _UserState:
+        user = self.users.get(user_id)
+        if user is None:
+            user = self.users[user_id] = _UserState(self.weights.get(user_id, 1.0))
+        return user
+
+    async def acquire(self, user_id: str, priority: str = BULK) -> float:
+        """Wait for a scraping slot and return the time spent queued, in seconds."""
+        user = self._user(user_id)
+        if user.queued >= self.user_max_queued:
+            self.rejected[priority] += 1
+            raise QueueFullError(f"Too many queued scraping requests for user {user_id}")
+
+        user.last_tag = max(self.virtual_time, user.last_tag) + 1 / user.weight
+        waiter = _Waiter(user_id, priority, user.last_tag)
+        user.queues[priority].append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just as the caller went away
+                self.release(user_id, priority)
+            else:
+                user.queues[priority].remove(waiter)
+                self._forget(user_id)
+            raise
+        wait = time.monotonic() - waiter.enqueued_at
+        self.wait_times[priority].record(wait)
+        return wait
+
+    def release(self, user_id: str, priority: str = BULK) -> None:
+        self.users[user_id].running -= 1
+        self.running[priority] -= 1
+        self._forget(user_id)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, priority: str = BULK):
+        """Hold a scraping slot for the block, which gets the time spent queued."""
+        wait = await self.acquire(user_id, priority)
+        try:
+            yield wait
+        finally:
+            self.release(user_id, priority)
+
+    def _forget(self, user_id: str) -> None:
+        user = self.users.get(user_id)
+        if user is not None and user.running == 0 and user.queued == 0:
+            del self.users[user_id]
+
+    def _has_capacity(self, priority: str) -> bool:
+        total = sum(self.running.values())
+        if priority == INTERACTIVE:
+            return total < self.max_concurrency
+        return total < self.max_concurrency and self.running[BULK] < self.max_concurrency - self.interactive_reserved
+
+    def _next(self, priority: str) -> Optional[_Waiter]:
+        best: Optional[_UserState] = None
+        for user in self.users.values():
+            queue = user.queues[priority]
+            if queue and user.running < self.user_max_concurrency and (best is None or queue[0].tag < best.queues[priority][0].tag):
+                best = user
+        return best.queues[priority].popleft() if best is not None else None
+
+    def _dispatch(self) -> None:
+        while True:
+            waiter = None
+            for priority in PRIORITIES:
+                if self._has_capacity(priority):
+                    waiter = self._next(priority)
+                    if waiter is not None:
+                        break
+            if waiter is None:
+                return
+            self.users[waiter.user_id].running += 1
+            self.running[waiter.priority] += 1
+            self.virtual_time = max(self.virtual_time, waiter.tag)
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            priority: {
+                "running": self.running[priority],
+                "queued": sum(len(user.queues[priority]) for user in self.users.values()),
+                "rejected": self.rejected[priority],
+                "queue_wait": self.wait_times[priority].snapshot(),
+            }
+            for priority in PRIORITIES
+        }
+        stats["users"] = {
+            user_id: {"running": user.running, "queued": user.queued, "weight": user.weight}
+            for user_id, user in self.users.items()
+        }
+        return stats
+
+scraping_scheduler = FairScheduler(
+    settings.SCRAPE_MAX_CONCURRENCY,
+    settings.SCRAPE_USER_MAX_CONCURRENCY,
+    settings.SCRAPE_USER_MAX_QUEUED,
+    settings.SCRAPE_INTERACTIVE_RESERVED,
+    settings.METRICS_WINDOW_SECONDS,
+    settings.METRICS_SLOT_SECONDS
+)
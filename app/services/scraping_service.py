@@ -1,9 +1,27 @@
-from typing import Dict, List, Any
-from crawl4ai import AsyncWebCrawler
+from typing import Dict, List, Any, Optional
 from urllib.parse import urlparse
 import json
-from crawl4ai.extraction_strategy import JsonCssExtractionStrategy
 import asyncio
+from app.services.render_profiles import install_render_hooks, render_session
+
+# crawl4ai pulls in playwright and its model dependencies, so it is imported
+# on first use. The names stay module attributes, which keeps them patchable.
+CRAWL4AI_NAMES = ("AsyncWebCrawler", "JsonCssExtractionStrategy")
+
+def _crawl4ai(name: str) -> Any:
+    value = globals().get(name)
+    if value is None:
+        from crawl4ai import AsyncWebCrawler
+        from crawl4ai.extraction_strategy import JsonCssExtractionStrategy
+        globals().setdefault("AsyncWebCrawler", AsyncWebCrawler)
+        globals().setdefault("JsonCssExtractionStrategy", JsonCssExtractionStrategy)
+        value = globals()[name]
+    return value
+
+def __getattr__(name: str) -> Any:
+    if name in CRAWL4AI_NAMES:
+        return _crawl4ai(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def validate_url(url: str) -> bool:
     try:
@@ -22,31 +40,37 @@ def clean_data(data: Any) -> Any:
     else:
         return data
 
-async def scrape_url(url: str, selectors: Dict[str, str]) -> Dict[str, Any]:
+def build_extraction_strategy(selectors: Dict[str, str]) -> "JsonCssExtractionStrategy":
+    schema = {
+        "name": "Basic Extraction",
+        "baseSelector": "html",
+        "fields": [
+            {
+                "name": key,
+                "selector": value,
+                "type": "text"
+            } for key, value in selectors.items()
+        ]
+    }
+    return _crawl4ai("JsonCssExtractionStrategy")(schema, verbose=True)
+
+async def scrape_url(url: str, selectors: Dict[str, str], render_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     if not validate_url(url):
         raise ValueError("Invalid URL provided")
     
-    async with AsyncWebCrawler(verbose=True) as crawler:
+    async with _crawl4ai("AsyncWebCrawler")(verbose=True) as crawler:
+        install_render_hooks(crawler)
         try:
-            schema = {
-                "name": "Basic Extraction",
-                "baseSelector": "html",
-                "fields": [
-                    {
-                        "name": key,
-                        "selector": value,
-                        "type": "text"
-                    } for key, value in selectors.items()
-                ]
-            }
-            extraction_strategy = JsonCssExtractionStrategy(schema, verbose=True)
-            result = await crawler.arun(url=url, extraction_strategy=extraction_strategy)
+            extraction_strategy = build_extraction_strategy(selectors)
+            with render_session(render_profile) as render_stats:
+                result = await crawler.arun(url=url, extraction_strategy=extraction_strategy)
 
             cleaned_result = clean_data(result.extracted_content)
             
             metadata = {
                 "url": url,
                 "status": result.status_code,
+                "render": render_stats.to_dict(),
             }
             
             return {
@@ -60,18 +84,21 @@ async def scrape_url(url: str, selectors: Dict[str, str]) -> Dict[str, Any]:
 def format_output(scrape_result: Dict[str, Any]) -> str:
     return json.dumps(scrape_result, indent=2)
 
-async def scrape_multiple_urls(urls: List[str], selectors: Dict[str, str]) -> List[Dict[str, Any]]:
-    async with AsyncWebCrawler(verbose=True) as crawler:
-        tasks = [scrape_single_url(crawler, url, selectors) for url in urls]
+async def scrape_multiple_urls(urls: List[str], selectors: Dict[str, str], render_profile: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    async with _crawl4ai("AsyncWebCrawler")(verbose=True) as crawler:
+        install_render_hooks(crawler)
+        tasks = [scrape_single_url(crawler, url, selectors, render_profile) for url in urls]
         results = await asyncio.gather(*tasks, return_exceptions=True)
     return results
 
-async def scrape_single_url(crawler: AsyncWebCrawler, url: str, selectors: Dict[str, str]) -> Dict[str, Any]:
+async def scrape_single_url(crawler: "AsyncWebCrawler", url: str, selectors: Dict[str, str], render_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Scrape one page on a shared crawler. Render profiles apply once install_render_hooks has run on it."""
     if not validate_url(url):
         raise ValueError(f"Invalid URL provided: {url}")
 
     try:
-        result = await crawler.arun(url=url, css_selector=selectors)
+        with render_session(render_profile) as render_stats:
+            result = await crawler.arun(url=url, extraction_strategy=build_extraction_strategy(selectors))
         cleaned_result = clean_data(result.extracted_content)
         
         return {
@@ -79,7 +106,8 @@ async def scrape_single_url(crawler: AsyncWebCrawler, url: str, selectors: Dict[
             "metadata": {
                 "url": url,
                 "timestamp": result.timestamp,
-                "status": result.status_code
+                "status": result.status_code,
+                "render": render_stats.to_dict()
             },
             "links": result.links
         }
@@ -0,0 +1,246 @@
+from typing import Optional, Tuple
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from limits.storage import Storage
+from app.core.config import settings
+
+# key hash, counter, expiry timestamp
+SLOT = struct.Struct("<16sqd")
+EMPTY_KEY = b"\0" * 16
+
+def default_state_dir() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "crawato")
+
+def state_dir() -> str:
+    return settings.SHARED_STATE_DIR or default_state_dir()
+
+def _key_hash(key: str) -> bytes:
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+class SharedCounters:
+    """Expiring counters in a memory-mapped file shared by every worker on the host.
+
+    The file is split into stripes of fixed-size slots. A key always lives
+    in the stripe picked by its hash, and each stripe has its own byte-range
+    lock, so workers only contend when they touch the same stripe. When a
+    stripe is full the slot closest to expiry is reused.
+    """
+
+    def __init__(self, path: str, stripes: int = 4096, slots_per_stripe: int = 16):
+        self.path = path
+        self.stripes = stripes
+        self.slots_per_stripe = slots_per_stripe
+        self.stripe_bytes = slots_per_stripe * SLOT.size
+        size = stripes * self.stripe_bytes
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size, mmap.MAP_SHARED)
+        # fcntl locks are per process, so threads also need a local lock
+        self.local_locks = [threading.Lock() for _ in range(64)]
+
+    def _stripe(self, key_hash: bytes) -> int:
+        return int.from_bytes(key_hash[:8], "little") % self.stripes
+
+    @contextmanager
+    def _locked(self, stripe: int):
+        local_lock = self.local_locks[stripe % len(self.local_locks)]
+        with local_lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.stripe_bytes, stripe * self.stripe_bytes)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, self.stripe_bytes, stripe * self.stripe_bytes)
+
+    def _find(self, stripe: int, key_hash: bytes) -> Tuple[int, int, float, bool]:
+        """Return (offset, count, expiry, found) for the key's slot, or for the slot to reuse.
+
+        Empty slots are reused first, then the one that expires soonest,
+        which is an already expired slot whenever there is one.
+        """
+        start = stripe * self.stripe_bytes
+        victim, victim_rank = start, None
+        for offset in range(start, start + self.stripe_bytes, SLOT.size):
+            slot_hash, count, expiry = SLOT.unpack_from(self.map, offset)
+            if slot_hash == key_hash:
+                return offset, count, expiry, True
+            rank = -1.0 if slot_hash == EMPTY_KEY else expiry
+            if victim_rank is None or rank < victim_rank:
+                victim, victim_rank = offset, rank
+        return victim, 0, 0.0, False
+
+    def incr(self, key: str, expiry: float, amount: int = 1, elastic_expiry: bool = False) -> int:
+        key_hash = _key_hash(key)
+        stripe = self._stripe(key_hash)
+        now = time.time()
+        with self._locked(stripe):
+            offset, count, expires_at, found = self._find(stripe, key_hash)
+            if not found or expires_at <= now:
+                count, expires_at = 0, now + expiry
+            elif elastic_expiry:
+                expires_at = now + expiry
+            count += amount
+            SLOT.pack_into(self.map, offset, key_hash, count, expires_at)
+        return count
+
+    def get(self, key: str) -> int:
+        key_hash = _key_hash(key)
+        stripe = self._stripe(key_hash)
+        now = time.time()
+        with self._locked(stripe):
+            _, count, expires_at, found = self._find(stripe, key_hash)
+        return count if found and expires_at > now else 0
+
+    def get_expiry(self, key: str) -> float:
+        key_hash = _key_hash(key)
+        stripe = self._stripe(key_hash)
+        now = time.time()
+        with self._locked(stripe):
+            _, _, expires_at, found = self._find(stripe, key_hash)
+        return expires_at if found and expires_at > now else now
+
+    def clear(self, key: str) -> None:
+        key_hash = _key_hash(key)
+        stripe = self._stripe(key_hash)
+        with self._locked(stripe):
+            offset, _, _, found = self._find(stripe, key_hash)
+            if found:
+                SLOT.pack_into(self.map, offset, EMPTY_KEY, 0, 0.0)
+
+    def reset(self) -> None:
+        for stripe in range(self.stripes):
+            with self._locked(stripe):
+                start = stripe * self.stripe_bytes
+                self.map[start:start + self.stripe_bytes] = b"\0" * self.stripe_bytes
+
+class SharedMemoryStorage(Storage):
+    """limits storage backend on SharedCounters, for ``shm://`` storage URIs.
+
+    ``shm://`` uses the shared state directory; ``shm:///some/file``
+    picks an explicit counter file.
+    """
+
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = urlparse(uri).path if uri else ""
+        self.counters = SharedCounters(path or os.path.join(state_dir(), "ratelimit.bin"))
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        return self.counters.incr(key, expiry, amount, elastic_expiry)
+
+    def get(self, key: str) -> int:
+        return self.counters.get(key)
+
+    def get_expiry(self, key: str) -> float:
+        return self.counters.get_expiry(key)
+
+    def check(self) -> bool:
+        return True
+
+    def reset(self) -> Optional[int]:
+        self.counters.reset()
+        return None
+
+    def clear(self, key: str) -> None:
+        self.counters.clear(key)
+
+class SharedBlobStore:
+    """Expiring byte values shared between workers through files in a tmpfs directory.
+
+    Writers publish with an atomic rename, so readers never see a partial
+    value and need no locks. Space is bounded by a periodic sweep that
+    drops expired entries and then the least recently written ones.
+    """
+
+    HEADER = struct.Struct("<d")
+
+    def __init__(self, directory: str, max_bytes: int, sweep_every: int = 256):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sweep_every = sweep_every
+        self.writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, _key_hash(key).hex())
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Only set() writes these files, but anything truncated is a miss, not an error
+        if len(data) < self.HEADER.size:
+            return None
+        (expires_at,) = self.HEADER.unpack_from(data)
+        if expires_at <= time.time():
+            return None
+        return data[self.HEADER.size:]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.HEADER.pack(time.time() + ttl))
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.writes += 1
+        if self.writes % self.sweep_every == 0:
+            self.sweep()
+
+    def sweep(self) -> int:
+        now = time.time()
+        entries, removed = [], 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                    if entry.name.startswith(".tmp-"):
+                        if stat.st_mtime < now - 60:
+                            os.unlink(entry.path)
+                        continue
+                    with open(entry.path, "rb") as f:
+                        (expires_at,) = self.HEADER.unpack(f.read(self.HEADER.size))
+                except (FileNotFoundError, struct.error):
+                    continue
+                if expires_at <= now:
+                    os.unlink(entry.path)
+                    removed += 1
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+# Small general-purpose counters, such as invalidation generations
+shared_counters = SharedCounters(os.path.join(state_dir(), "counters.bin"), stripes=64)
+shared_responses = SharedBlobStore(os.path.join(state_dir(), "responses"), settings.SHARED_RESPONSE_CACHE_MAX_BYTES)
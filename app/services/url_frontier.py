@@ -0,0 +1,103 @@
+from typing import Any, Iterator, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from collections import deque
+import hashlib
+import math
+
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Canonicalize a URL so equivalent spellings deduplicate to one key.
+
+    Resolves it against ``base``, lowercases scheme and host, drops default
+    ports, fragments and tracking parameters, and sorts the query string.
+    Returns None for anything that is not an http(s) URL.
+    """
+    if base is not None:
+        url = urljoin(base, url.strip())
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower().rstrip(".")
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+def site_of(url: str) -> str:
+    """Host used for same-site checks, ignoring a leading ``www.``."""
+    host = urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Sized from the expected number of items and the acceptable false
+    positive rate; ten million URLs at 1e-4 take about 24 MB.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (first + i * second) % self.num_bits
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add an item, returning False if it was (probably) already present."""
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+class UrlFrontier:
+    """Breadth-first URL frontier with depth and page limits."""
+
+    def __init__(self, max_depth: int, max_pages: int, seen: Any = None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.seen = seen if seen is not None else BloomFilter(max(max_pages, 1000))
+        self.queue = deque()
+        self.enqueued = 0
+
+    def push(self, url: str, depth: int) -> bool:
+        if depth > self.max_depth or self.enqueued >= self.max_pages:
+            return False
+        if not self.seen.add(url):
+            return False
+        self.queue.append((url, depth))
+        self.enqueued += 1
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        return self.queue.popleft() if self.queue else None
+
+    def __len__(self) -> int:
+        return len(self.queue)
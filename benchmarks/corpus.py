@@ -0,0 +1,86 @@
+from typing import Dict, Any, List
+import random
+
+WORDS = (
+    "market price volume bitcoin ether wallet exchange order trade asset chain block token fee "
+    "account deposit transfer staking yield network protocol layer bridge custody ledger"
+).split()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    return "\n".join(f"<p>{_sentence(rng, rng.randint(8, 30))}</p>" for _ in range(count))
+
+def _page(title: str, body: str, head: str = "") -> str:
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title>{head}</head>\n<body>\n<h1 class=\"title\">{title}</h1>\n"
+        f"<time class=\"published\">2024-03-15</time>\n{body}\n</body></html>\n"
+    )
+
+def small_page(rng: random.Random) -> str:
+    return _page("Small page", _paragraphs(rng, 3))
+
+def huge_page(rng: random.Random) -> str:
+    sections = "\n".join(
+        f"<section><h2>{_sentence(rng, 4)}</h2>\n{_paragraphs(rng, 40)}</section>" for _ in range(50)
+    )
+    return _page("Huge page", sections)
+
+def list_page(rng: random.Random) -> str:
+    rows = "\n".join(
+        f"<li class=\"item\"><a href=\"/items/{index}\">{_sentence(rng, 3)}</a>"
+        f"<span class=\"price\">{rng.uniform(1, 70000):.2f}</span>"
+        f"<span class=\"change\">{rng.uniform(-10, 10):+.2f}%</span></li>"
+        for index in range(5000)
+    )
+    return _page("List page", f"<ul class=\"items\">\n{rows}\n</ul>")
+
+def js_light_page(rng: random.Random) -> str:
+    head = (
+        "<link rel=\"stylesheet\" href=\"/static/site.css\">"
+        "<script src=\"/static/app.js\" defer></script>"
+        "<script>window.dataLayer=window.dataLayer||[];document.documentElement.className='js';</script>"
+    )
+    body = _paragraphs(rng, 20) + "\n<div id=\"app\" data-hydrate=\"true\"></div>"
+    return _page("JS-light page", body, head)
+
+PAGE_BUILDERS = {
+    "small": small_page,
+    "huge": huge_page,
+    "list": list_page,
+    "js-light": js_light_page,
+}
+
+SELECTORS = {
+    "small": {"title": "h1.title", "published": "time.published", "body": "p"},
+    "huge": {"title": "h1.title", "published": "time.published", "headings": "h2"},
+    "list": {"title": "h1.title", "items": "li.item a", "prices": "span.price"},
+    "js-light": {"title": "h1.title", "published": "time.published", "body": "p"},
+}
+
+STATIC_FILES = {
+    "/static/site.css": (b"body{font-family:sans-serif}h1{font-size:2em}", "text/css"),
+    "/static/app.js": (b"document.getElementById('app').textContent='hydrated';", "application/javascript"),
+}
+
+def build_corpus(seed: int = 1234) -> Dict[str, str]:
+    """HTML for every page kind, deterministic for a given seed."""
+    rng = random.Random(seed)
+    return {name: builder(rng) for name, builder in PAGE_BUILDERS.items()}
+
+def _record(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "title": f"<span class=\"title\">  {_sentence(rng, 5)}  </span>",
+        "publishedDate": "2024-03-15",
+        "summary": _sentence(rng, 25),
+        "priceUsd": f"{rng.uniform(1, 70000):.2f}",
+        "details": {"authorName": f"<b>{rng.choice(WORDS)}</b>", "tagList": [rng.choice(WORDS) for _ in range(5)]},
+        "links": [{"linkText": _sentence(rng, 2), "href": f"/items/{rng.randint(0, 10000)}"} for _ in range(5)],
+    }
+
+def scraped_records(seed: int = 1234, count: int = 200) -> List[Dict[str, Any]]:
+    """Records shaped like extracted_content, with HTML fragments, dates and nesting."""
+    rng = random.Random(seed)
+    return [_record(rng) for _ in range(count)]
@@ -0,0 +1,217 @@
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from datetime import datetime
+import copy
+import re
+import uuid
+import httpx
+from postgrest.exceptions import APIError
+
+# The (created_at, id) continuation written by app.db.pagination.keyset_page
+KEYSET_OR = re.compile(
+    r'^\(created_at\.(gt|lt)\."([^"]*)",and\(created_at\.eq\."([^"]*)",id\.(gt|lt)\."([^"]*)"\)\)$'
+)
+
+class FakeResponse:
+    def __init__(self, data: Any):
+        self.data = data
+        self.count = len(data) if isinstance(data, list) else None
+
+class FakeQuery:
+    """The subset of the postgrest-py request builder that app.db.database uses."""
+
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.payload: Any = None
+        self.on_conflict = "id"
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.orders: List[Tuple[str, bool]] = []
+        self.row_limit: Optional[int] = None
+        self.single_row = False
+        self.maybe = False
+        self.params = httpx.QueryParams()
+
+    def select(self, columns: str = "*", **kwargs) -> "FakeQuery":
+        self.columns = columns
+        return self
+
+    def insert(self, rows: Any, **kwargs) -> "FakeQuery":
+        self.action, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = "id", **kwargs) -> "FakeQuery":
+        self.action, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs) -> "FakeQuery":
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self, **kwargs) -> "FakeQuery":
+        self.action = "delete"
+        return self
+
+    def _filter(self, column: str, test: Callable[[Any], bool]) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) is not None and test(row[column]))
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, lambda current: current > value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, lambda current: current >= value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, lambda current: current < value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, lambda current: current <= value)
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        allowed = set(values)
+        self.filters.append(lambda row: row.get(column) in allowed)
+        return self
+
+    def order(self, column: str, desc: bool = False, **kwargs) -> "FakeQuery":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs) -> "FakeQuery":
+        self.row_limit = size
+        return self
+
+    def single(self) -> "FakeQuery":
+        self.single_row = True
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        self.single_row = self.maybe = True
+        return self
+
+    def _apply_params(self) -> None:
+        for key, value in self.params.multi_items():
+            if key == "order":
+                for part in value.split(","):
+                    column, _, direction = part.partition(".")
+                    self.orders.append((column, direction.startswith("desc")))
+            elif key == "or":
+                match = KEYSET_OR.match(value)
+                if match is None:
+                    raise NotImplementedError(f"Unsupported or filter: {value}")
+                op, created_at, _, _, row_id = match.groups()
+                if op == "gt":
+                    self.filters.append(lambda row: (row["created_at"], row["id"]) > (created_at, row_id))
+                else:
+                    self.filters.append(lambda row: (row["created_at"], row["id"]) < (created_at, row_id))
+            else:
+                raise NotImplementedError(f"Unsupported query parameter: {key}")
+
+    def _matching(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [row for row in rows if all(test(row) for test in self.filters)]
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        # Rows are copied on write, so reads can share nested values; a
+        # deep copy here would dominate every benchmark with large rows
+        if self.columns.strip() == "*":
+            return dict(row)
+        return {column: row.get(column) for column in (c.strip() for c in self.columns.split(","))}
+
+    def execute(self) -> FakeResponse:
+        self._apply_params()
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.action in ("insert", "upsert"):
+            result = [self.client.write(self.table, row, self.on_conflict if self.action == "upsert" else None) for row in _as_list(self.payload)]
+        elif self.action == "update":
+            result = self._matching(rows)
+            for row in result:
+                row.update(copy.deepcopy(self.payload))
+        elif self.action == "delete":
+            result = self._matching(rows)
+            self.client.tables[self.table] = [row for row in rows if not any(row is deleted for deleted in result)]
+        else:
+            result = self._matching(rows)
+            # Stable sorts applied last key first give a multi-column order
+            for column, desc in reversed(self.orders):
+                result.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            if self.row_limit is not None:
+                result = result[:self.row_limit]
+        data = [self._project(row) for row in result]
+        if self.single_row:
+            if len(data) == 1:
+                return FakeResponse(data[0])
+            if self.maybe and not data:
+                return None
+            raise APIError({
+                "code": "PGRST116",
+                "message": "JSON object requested, multiple (or no) rows returned",
+                "details": f"Results contain {len(data)} rows, application/vnd.pgrst.object+json requires 1 row",
+                "hint": None,
+            })
+        return FakeResponse(data)
+
+def _as_list(payload: Any) -> List[Dict[str, Any]]:
+    return payload if isinstance(payload, list) else [payload]
+
+class FakeRpc:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+    def execute(self) -> FakeResponse:
+        return FakeResponse(self.data)
+
+class FakeSupabase:
+    """In-memory stand-in for the supabase client, good enough to run the app.
+
+    Rows get an ``id`` and ``created_at`` on insert like the real schema.
+    ``single()`` raises PostgREST's PGRST116 APIError unless exactly one
+    row matches, and ``maybe_single()`` returns None on a miss, as
+    postgrest-py does.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.tables: Dict[str, List[Dict[str, Any]]] = tables or {}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def write(self, table: str, row: Dict[str, Any], on_conflict: Optional[str]) -> Dict[str, Any]:
+        row = copy.deepcopy(row)
+        rows = self.tables.setdefault(table, [])
+        if on_conflict is not None:
+            keys = [key.strip() for key in on_conflict.split(",")]
+            for existing in rows:
+                if all(existing.get(key) == row.get(key) for key in keys) and all(row.get(key) is not None for key in keys):
+                    existing.update(row)
+                    return existing
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.utcnow().isoformat())
+        rows.append(row)
+        return row
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> FakeRpc:
+        if name in ("sweep_expired_cache", "evict_cache_lru"):
+            return FakeRpc([{"deleted_rows": 0, "deleted_bytes": 0}])
+        if name == "cache_table_stats":
+            rows = self.tables.get("cache", [])
+            return FakeRpc([{
+                "total_rows": len(rows),
+                "expired_rows": 0,
+                "tracked_bytes": sum(row.get("size_bytes") or 0 for row in rows),
+                "relation_bytes": None,
+            }])
+        raise NotImplementedError(f"Unsupported rpc: {name}")
+
+def install_fake_supabase(fake: FakeSupabase) -> None:
+    """Swap the client for every module; they all go through app.db.database.supabase."""
+    import app.db.database as database
+    database.supabase = fake
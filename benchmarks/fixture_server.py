@@ -0,0 +1,57 @@
+from typing import Dict, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from benchmarks.corpus import STATIC_FILES, build_corpus
+
+class FixtureServer:
+    """Serves the benchmark corpus on a local port from a background thread.
+
+    Pages are at ``/pages/<kind>``; anything else is a 404, so scrapes
+    never leave the machine.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, str]] = None, host: str = "127.0.0.1", port: int = 0):
+        self.files = {f"/pages/{name}": (html.encode("utf-8"), "text/html; charset=utf-8") for name, html in (pages or build_corpus()).items()}
+        self.files.update(STATIC_FILES)
+        files = self.files
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                body, content_type = files.get(self.path.split("?", 1)[0], (b"not found", "text/plain"))
+                self.send_response(200 if self.path.split("?", 1)[0] in files else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, kind: str) -> str:
+        return f"{self.base_url}/pages/{kind}"
+
+    def start(self) -> "FixtureServer":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fixture-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
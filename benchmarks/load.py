@@ -0,0 +1,139 @@
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import time
+import httpx
+from benchmarks.corpus import SELECTORS, scraped_records
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.stats import summarize_latencies
+
+BENCH_USER = {"id": "bench-user", "email": "bench@example.com", "full_name": "Bench User", "hashed_password": "unused"}
+RECORDS_PER_PAGE = {"small": 5, "huge": 500, "list": 2000, "js-light": 20}
+EXTRA_CONFIGURATIONS = 1000
+
+def seed_tables(fake: FakeSupabase, server: FixtureServer) -> None:
+    """One configuration, endpoint and warm cache row per page kind, plus filler configurations."""
+    from app.core.config import settings
+    from app.db.database import set_cache, set_cache_chunks
+    from app.services.chunked_results import split_result
+    from app.services.data_processing import process_scraped_data
+    from app.services.response_encoding import encode_json, make_etag
+
+    fake.write("users", BENCH_USER, None)
+    expires_at = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    for kind, selectors in SELECTORS.items():
+        configuration_id = f"bench-{kind}"
+        fake.write("crawl_configurations", {
+            "id": configuration_id,
+            "user_id": BENCH_USER["id"],
+            "name": f"Benchmark {kind}",
+            "url": server.url(kind),
+            "selectors": selectors,
+            "crawl_settings": None,
+            "render_profile": None,
+        }, None)
+        fake.write("custom_endpoints", {
+            "user_id": BENCH_USER["id"],
+            "endpoint_url": configuration_id,
+            "configuration_id": configuration_id,
+            "data_schema": {},
+            "transformations": {},
+        }, None)
+        records = scraped_records(count=RECORDS_PER_PAGE[kind])
+        value = {"items": [process_scraped_data(record) for record in records]}
+        body = encode_json(value)
+        etag = make_etag(body)
+        # Stored the way store_result stores it: ETag included, long lists in chunk rows
+        envelope, records_key, chunks = split_result(value, settings.RESULT_CHUNK_RECORDS)
+        if chunks:
+            set_cache_chunks(configuration_id, f"{configuration_id}:", etag, chunks, expires_at)
+        set_cache(
+            configuration_id, f"{configuration_id}:", envelope, expires_at, etag=etag, size_bytes=len(body),
+            records_key=records_key, record_count=len(value["items"]),
+            chunk_size=settings.RESULT_CHUNK_RECORDS if chunks else None
+        )
+    for index in range(EXTRA_CONFIGURATIONS):
+        fake.write("crawl_configurations", {
+            "user_id": BENCH_USER["id"],
+            "name": f"Filler {index}",
+            "url": server.url("small"),
+            "selectors": SELECTORS["small"],
+            "crawl_settings": None,
+            "render_profile": None,
+        }, None)
+
+async def generate_load(
+    send: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int,
+    ok_statuses: tuple = (200, 304)
+) -> Dict[str, Any]:
+    """Issue ``total`` requests from ``concurrency`` workers and summarize their latency."""
+    latencies: List[float] = []
+    errors = 0
+    indexes = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                response = await send(index)
+                ok = response.status_code in ok_statuses
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize_latencies(latencies, time.perf_counter() - started, errors)
+
+async def run_app_scenarios(total: int, concurrency: int) -> Dict[str, Any]:
+    from app.main import app
+    from app.core.rate_limit import limiter
+    from app.core.security import create_access_token
+
+    # The limiter would reject nearly everything a load test sends
+    limiter.enabled = False
+    auth = {"Authorization": f"Bearer {create_access_token(data={'sub': BENCH_USER['email']})}"}
+    gzip = {"Accept-Encoding": "gzip"}
+
+    async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+        first = await client.get("/dynamic/bench-list")
+        first.raise_for_status()
+        not_modified = {"If-None-Match": first.headers["etag"]}
+        scenarios = {
+            "dynamic_cached_small": lambda _: client.get("/dynamic/bench-small", headers=gzip),
+            "dynamic_cached_list": lambda _: client.get("/dynamic/bench-list", headers=gzip),
+            "dynamic_not_modified": lambda _: client.get("/dynamic/bench-list", headers=not_modified),
+            "dynamic_page_list": lambda index: client.get(
+                "/dynamic/bench-list", params={"offset": index * 50 % 2000, "limit": 50, "fields": "title,price_usd"}, headers=gzip
+            ),
+            "endpoint_health": lambda _: client.get("/dynamic/health/bench-small"),
+            "configurations_page": lambda _: client.get("/configurations/configurations?limit=100", headers=auth),
+        }
+        return {name: await generate_load(send, total, concurrency) for name, send in scenarios.items()}
+
+async def run_scrape_scenario(server: FixtureServer, total: int, concurrency: int) -> Dict[str, Any]:
+    """Browser scrapes of the fixture pages; needs crawl4ai and a working browser."""
+    from app.services.scraping_service import scrape_url
+
+    kinds = list(SELECTORS)
+    results = {}
+    for kind in kinds:
+        async def send(_, kind=kind):
+            await scrape_url(server.url(kind), SELECTORS[kind])
+            return httpx.Response(200)
+        results[f"scrape_{kind}"] = await generate_load(send, total, concurrency)
+    return results
+
+async def run_load(server: FixtureServer, fake: FakeSupabase, total: int, concurrency: int, scrape_requests: Optional[int] = None) -> Dict[str, Any]:
+    seed_tables(fake, server)
+    results = await run_app_scenarios(total, concurrency)
+    if scrape_requests:
+        results.update(await run_scrape_scenario(server, scrape_requests, min(concurrency, 4)))
+    return results
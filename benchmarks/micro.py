@@ -0,0 +1,33 @@
+from typing import Dict, Any, Callable
+import statistics
+import timeit
+from benchmarks.corpus import scraped_records
+
+def time_call(func: Callable[[], Any], repeat: int = 5) -> Dict[str, Any]:
+    """Time a zero-argument callable with timeit, reporting per-call figures."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "calls_per_round": number,
+        "best_us": round(min(per_call) * 1e6, 2),
+        "median_us": round(statistics.median(per_call) * 1e6, 2),
+        "ops_per_second": round(1 / min(per_call), 1),
+    }
+
+def run_micro(repeat: int = 5) -> Dict[str, Any]:
+    from app.services.data_processing import process_scraped_data, serialize_data
+    from app.services.scraping_service import clean_data
+
+    records = scraped_records()
+    record = records[0]
+    processed = [process_scraped_data(item) for item in records]
+    nested = {"data": records, "metadata": {"url": "http://127.0.0.1/pages/list", "status": 200}}
+
+    cases = {
+        "process_scraped_data.record": lambda: process_scraped_data(record),
+        "process_scraped_data.page": lambda: process_scraped_data({"items": records}),
+        "clean_data.page": lambda: clean_data(nested),
+        "serialize_data.page": lambda: serialize_data({"items": processed}),
+    }
+    return {name: time_call(func, repeat) for name, func in cases.items()}
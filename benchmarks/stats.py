@@ -0,0 +1,23 @@
+from typing import Dict, Any, List, Optional
+import math
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize_latencies(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    values = sorted(latencies)
+    milliseconds = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(values) / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": milliseconds(percentile(values, 0.50)),
+        "p95_ms": milliseconds(percentile(values, 0.95)),
+        "p99_ms": milliseconds(percentile(values, 0.99)),
+        "max_ms": milliseconds(values[-1] if values else None),
+    }
@@ -15,6 +15,8 @@ CREATE TABLE crawl_configurations (
     name TEXT NOT NULL,
     url TEXT NOT NULL,
     selectors JSONB NOT NULL,
+    crawl_settings JSONB,
+    render_profile JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -33,8 +35,14 @@ CREATE TABLE custom_endpoints (
 CREATE TABLE scraping_history (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     configuration_id UUID REFERENCES crawl_configurations(id),
+    source_url TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'snapshot',
+    base_version INTEGER NOT NULL,
     status TEXT NOT NULL,
     result JSONB,
+    compressed_result TEXT,
+    delta JSONB,
     metadata JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -54,6 +62,9 @@ CREATE TABLE performance_metrics (
     configuration_id UUID REFERENCES crawl_configurations(id),
     execution_time FLOAT NOT NULL,
     memory_usage FLOAT,
+    bytes_transferred BIGINT,
+    render_time FLOAT,
+    queue_wait FLOAT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -63,15 +74,111 @@ CREATE TABLE cache (
     configuration_id UUID REFERENCES crawl_configurations(id),
     cache_key TEXT NOT NULL,
     cache_value JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    etag TEXT,
+    records_key TEXT,
+    record_count INTEGER,
+    chunk_size INTEGER,
     expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_accessed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Record chunks of cached results too long to store in one cache row
+CREATE TABLE cache_chunks (
+    configuration_id UUID REFERENCES crawl_configurations(id),
+    cache_key TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    records JSONB NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (configuration_id, cache_key, etag, chunk_index)
+);
+
+-- Rolling endpoint health checkpoints table
+CREATE TABLE metrics_checkpoints (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    configuration_id UUID REFERENCES crawl_configurations(id),
+    worker TEXT,
+    window_seconds INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    avg_execution_time FLOAT,
+    p50 FLOAT,
+    p95 FLOAT,
+    p99 FLOAT,
+    sketch JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Indexes
-CREATE INDEX idx_crawl_configurations_user_id ON crawl_configurations(user_id);
+CREATE INDEX idx_crawl_configurations_user_id_created_at ON crawl_configurations(user_id, created_at, id);
 CREATE INDEX idx_custom_endpoints_user_id ON custom_endpoints(user_id);
-CREATE INDEX idx_scraping_history_configuration_id ON scraping_history(configuration_id);
-CREATE INDEX idx_error_logs_configuration_id ON error_logs(configuration_id);
-CREATE INDEX idx_performance_metrics_configuration_id ON performance_metrics(configuration_id);
-CREATE INDEX idx_cache_configuration_id ON cache(configuration_id);
+CREATE UNIQUE INDEX idx_scraping_history_chain_version ON scraping_history(configuration_id, source_url, version);
+CREATE INDEX idx_scraping_history_crawl_job_id ON scraping_history((metadata->>'crawl_job_id'));
+CREATE INDEX idx_error_logs_configuration_id_created_at ON error_logs(configuration_id, created_at, id);
+CREATE INDEX idx_performance_metrics_configuration_id_created_at ON performance_metrics(configuration_id, created_at, id);
+CREATE UNIQUE INDEX idx_cache_configuration_id_cache_key ON cache(configuration_id, cache_key);
+CREATE INDEX idx_cache_configuration_id_last_accessed_at ON cache(configuration_id, last_accessed_at);
 CREATE INDEX idx_cache_expires_at ON cache(expires_at);
+CREATE INDEX idx_cache_chunks_expires_at ON cache_chunks(expires_at);
+CREATE INDEX idx_metrics_checkpoints_configuration_id ON metrics_checkpoints(configuration_id, created_at);
+
+-- Cache maintenance functions
+-- Delete up to p_batch_size expired rows and chunks, skipping rows locked by writers
+CREATE OR REPLACE FUNCTION sweep_expired_cache(p_batch_size INTEGER)
+RETURNS TABLE(deleted_rows BIGINT, deleted_bytes BIGINT) AS $$
+    WITH doomed AS (
+        DELETE FROM cache
+        WHERE id IN (
+            SELECT id FROM cache
+            WHERE expires_at < CURRENT_TIMESTAMP
+            ORDER BY expires_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING size_bytes
+    ), doomed_chunks AS (
+        DELETE FROM cache_chunks
+        WHERE ctid IN (
+            SELECT ctid FROM cache_chunks
+            WHERE expires_at < CURRENT_TIMESTAMP
+            ORDER BY expires_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING 1
+    )
+    SELECT
+        (SELECT COUNT(*) FROM doomed) + (SELECT COUNT(*) FROM doomed_chunks),
+        (SELECT COALESCE(SUM(size_bytes), 0) FROM doomed);
+$$ LANGUAGE sql;
+
+-- Evict least recently accessed rows of a configuration, with their chunks, until it fits p_quota_bytes
+CREATE OR REPLACE FUNCTION evict_cache_lru(p_configuration_id UUID, p_quota_bytes BIGINT)
+RETURNS TABLE(deleted_rows BIGINT, deleted_bytes BIGINT) AS $$
+    WITH ranked AS (
+        SELECT id, SUM(size_bytes) OVER (ORDER BY last_accessed_at DESC, id) AS running_bytes
+        FROM cache
+        WHERE configuration_id = p_configuration_id
+    ), doomed AS (
+        DELETE FROM cache
+        WHERE id IN (SELECT id FROM ranked WHERE running_bytes > p_quota_bytes)
+        RETURNING cache_key, etag, size_bytes
+    ), doomed_chunks AS (
+        DELETE FROM cache_chunks c
+        USING doomed d
+        WHERE c.configuration_id = p_configuration_id AND c.cache_key = d.cache_key AND c.etag = d.etag
+    )
+    SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM doomed;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION cache_table_stats()
+RETURNS TABLE(total_rows BIGINT, expired_rows BIGINT, tracked_bytes BIGINT, relation_bytes BIGINT) AS $$
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE expires_at < CURRENT_TIMESTAMP),
+        COALESCE(SUM(size_bytes), 0),
+        pg_total_relation_size('cache')
+    FROM cache;
+$$ LANGUAGE sql;
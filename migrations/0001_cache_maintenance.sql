@@ -0,0 +1,58 @@
+-- Cache table maintenance: unique cache keys, size accounting and sweeping
+
+-- Keep only the newest row for each (configuration_id, cache_key)
+DELETE FROM cache a
+USING cache b
+WHERE a.configuration_id = b.configuration_id
+  AND a.cache_key = b.cache_key
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+
+ALTER TABLE cache ADD COLUMN size_bytes INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE cache ADD COLUMN last_accessed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+UPDATE cache SET size_bytes = octet_length(cache_value::text), last_accessed_at = created_at;
+
+DROP INDEX IF EXISTS idx_cache_configuration_id;
+CREATE UNIQUE INDEX idx_cache_configuration_id_cache_key ON cache(configuration_id, cache_key);
+CREATE INDEX idx_cache_configuration_id_last_accessed_at ON cache(configuration_id, last_accessed_at);
+
+-- Delete up to p_batch_size expired rows, skipping rows locked by writers
+CREATE OR REPLACE FUNCTION sweep_expired_cache(p_batch_size INTEGER)
+RETURNS TABLE(deleted_rows BIGINT, deleted_bytes BIGINT) AS $$
+    WITH doomed AS (
+        DELETE FROM cache
+        WHERE id IN (
+            SELECT id FROM cache
+            WHERE expires_at < CURRENT_TIMESTAMP
+            ORDER BY expires_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING size_bytes
+    )
+    SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM doomed;
+$$ LANGUAGE sql;
+
+-- Evict least recently accessed rows of a configuration until it fits p_quota_bytes
+CREATE OR REPLACE FUNCTION evict_cache_lru(p_configuration_id UUID, p_quota_bytes BIGINT)
+RETURNS TABLE(deleted_rows BIGINT, deleted_bytes BIGINT) AS $$
+    WITH ranked AS (
+        SELECT id, SUM(size_bytes) OVER (ORDER BY last_accessed_at DESC, id) AS running_bytes
+        FROM cache
+        WHERE configuration_id = p_configuration_id
+    ), doomed AS (
+        DELETE FROM cache
+        WHERE id IN (SELECT id FROM ranked WHERE running_bytes > p_quota_bytes)
+        RETURNING size_bytes
+    )
+    SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM doomed;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION cache_table_stats()
+RETURNS TABLE(total_rows BIGINT, expired_rows BIGINT, tracked_bytes BIGINT, relation_bytes BIGINT) AS $$
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE expires_at < CURRENT_TIMESTAMP),
+        COALESCE(SUM(size_bytes), 0),
+        pg_total_relation_size('cache')
+    FROM cache;
+$$ LANGUAGE sql;
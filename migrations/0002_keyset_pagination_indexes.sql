@@ -0,0 +1,10 @@
+-- Composite indexes backing keyset pagination on (created_at, id)
+
+DROP INDEX IF EXISTS idx_crawl_configurations_user_id;
+CREATE INDEX idx_crawl_configurations_user_id_created_at ON crawl_configurations(user_id, created_at, id);
+
+DROP INDEX IF EXISTS idx_error_logs_configuration_id;
+CREATE INDEX idx_error_logs_configuration_id_created_at ON error_logs(configuration_id, created_at, id);
+
+DROP INDEX IF EXISTS idx_performance_metrics_configuration_id;
+CREATE INDEX idx_performance_metrics_configuration_id_created_at ON performance_metrics(configuration_id, created_at, id);
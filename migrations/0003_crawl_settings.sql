@@ -0,0 +1,4 @@
+-- Link-following crawl mode for configurations
+
+ALTER TABLE crawl_configurations ADD COLUMN crawl_settings JSONB;
+CREATE INDEX idx_scraping_history_crawl_job_id ON scraping_history((metadata->>'crawl_job_id'));
@@ -0,0 +1,58 @@
+-- Delta-compressed scraping history: versioned chains of snapshots and JSON-patch deltas
+
+ALTER TABLE scraping_history ADD COLUMN source_url TEXT NOT NULL DEFAULT '';
+ALTER TABLE scraping_history ADD COLUMN version INTEGER;
+ALTER TABLE scraping_history ADD COLUMN kind TEXT NOT NULL DEFAULT 'snapshot';
+ALTER TABLE scraping_history ADD COLUMN base_version INTEGER;
+ALTER TABLE scraping_history ADD COLUMN compressed_result TEXT;
+ALTER TABLE scraping_history ADD COLUMN delta JSONB;
+
+-- Same canonical form as url_frontier.normalize_url, which keys new rows:
+-- lowercase scheme and host, no default port or fragment, '/' for an empty
+-- path, tracking parameters dropped and the query sorted. Anything that is
+-- not an http(s) URL is kept as is, as the application does. Percent-encoding
+-- is left as stored.
+CREATE FUNCTION pg_temp.normalize_history_url(p_url TEXT) RETURNS TEXT AS $$
+DECLARE
+    parts TEXT[];
+    scheme TEXT;
+    host TEXT;
+    query TEXT;
+BEGIN
+    parts := regexp_match(btrim(p_url), '^([A-Za-z][A-Za-z0-9+.-]*)://(?:[^@/?#]*@)?([^:/?#]+)(?::([0-9]*))?([^?#]*)(?:\?([^#]*))?');
+    IF parts IS NULL OR lower(parts[1]) NOT IN ('http', 'https') THEN
+        RETURN p_url;
+    END IF;
+    scheme := lower(parts[1]);
+    host := rtrim(lower(parts[2]), '.');
+    IF NULLIF(parts[3], '') IS NOT NULL
+       AND parts[3]::INTEGER <> CASE scheme WHEN 'http' THEN 80 ELSE 443 END THEN
+        host := host || ':' || parts[3]::INTEGER;
+    END IF;
+    -- Blank values keep their '=', as urlencode writes them
+    SELECT string_agg(split_part(pair, '=', 1) || '=' || substr(pair, length(split_part(pair, '=', 1)) + 2), '&'
+                      ORDER BY split_part(pair, '=', 1), substr(pair, length(split_part(pair, '=', 1)) + 2))
+    INTO query
+    FROM regexp_split_to_table(COALESCE(parts[5], ''), '&') AS pair
+    WHERE pair <> ''
+      AND lower(split_part(pair, '=', 1)) NOT LIKE 'utm\_%'
+      AND lower(split_part(pair, '=', 1)) NOT IN ('gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src');
+    RETURN scheme || '://' || host || COALESCE(NULLIF(parts[4], ''), '/') || COALESCE('?' || query, '');
+END
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Existing rows become full snapshots, numbered per chain in insertion order
+UPDATE scraping_history SET source_url = COALESCE(pg_temp.normalize_history_url(metadata->>'url'), '');
+UPDATE scraping_history h
+SET version = numbered.version, base_version = numbered.version
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY configuration_id, source_url ORDER BY created_at, id) AS version
+    FROM scraping_history
+) numbered
+WHERE h.id = numbered.id;
+
+ALTER TABLE scraping_history ALTER COLUMN version SET NOT NULL;
+ALTER TABLE scraping_history ALTER COLUMN base_version SET NOT NULL;
+
+DROP INDEX IF EXISTS idx_scraping_history_configuration_id;
+CREATE UNIQUE INDEX idx_scraping_history_chain_version ON scraping_history(configuration_id, source_url, version);
@@ -0,0 +1,3 @@
+-- Strong ETag stored with each cache entry for conditional GETs
+
+ALTER TABLE cache ADD COLUMN etag TEXT;
@@ -0,0 +1,5 @@
+-- Per-configuration render profiles and the per-page cost they are tuned against
+
+ALTER TABLE crawl_configurations ADD COLUMN render_profile JSONB;
+ALTER TABLE performance_metrics ADD COLUMN bytes_transferred BIGINT;
+ALTER TABLE performance_metrics ADD COLUMN render_time FLOAT;
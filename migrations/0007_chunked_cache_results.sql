@@ -0,0 +1,70 @@
+-- Chunked layout for cached results with long record lists
+--
+-- The cache row keeps the result with its record list emptied plus where
+-- the records went; the records live in fixed-size chunk rows keyed by the
+-- result's ETag, so a rewrite never mixes two versions of a result.
+-- Rows keyed on query strings are no longer read and expire on their own.
+
+ALTER TABLE cache ADD COLUMN records_key TEXT;
+ALTER TABLE cache ADD COLUMN record_count INTEGER;
+ALTER TABLE cache ADD COLUMN chunk_size INTEGER;
+
+CREATE TABLE cache_chunks (
+    configuration_id UUID REFERENCES crawl_configurations(id),
+    cache_key TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    records JSONB NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (configuration_id, cache_key, etag, chunk_index)
+);
+CREATE INDEX idx_cache_chunks_expires_at ON cache_chunks(expires_at);
+
+-- Expired chunk rows are swept alongside expired cache rows. Their bytes
+-- are already counted in the size_bytes of the row they belong to.
+CREATE OR REPLACE FUNCTION sweep_expired_cache(p_batch_size INTEGER)
+RETURNS TABLE(deleted_rows BIGINT, deleted_bytes BIGINT) AS $$
+    WITH doomed AS (
+        DELETE FROM cache
+        WHERE id IN (
+            SELECT id FROM cache
+            WHERE expires_at < CURRENT_TIMESTAMP
+            ORDER BY expires_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING size_bytes
+    ), doomed_chunks AS (
+        DELETE FROM cache_chunks
+        WHERE ctid IN (
+            SELECT ctid FROM cache_chunks
+            WHERE expires_at < CURRENT_TIMESTAMP
+            ORDER BY expires_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING 1
+    )
+    SELECT
+        (SELECT COUNT(*) FROM doomed) + (SELECT COUNT(*) FROM doomed_chunks),
+        (SELECT COALESCE(SUM(size_bytes), 0) FROM doomed);
+$$ LANGUAGE sql;
+
+-- Evicting a cache row takes its chunks with it
+CREATE OR REPLACE FUNCTION evict_cache_lru(p_configuration_id UUID, p_quota_bytes BIGINT)
+RETURNS TABLE(deleted_rows BIGINT, deleted_bytes BIGINT) AS $$
+    WITH ranked AS (
+        SELECT id, SUM(size_bytes) OVER (ORDER BY last_accessed_at DESC, id) AS running_bytes
+        FROM cache
+        WHERE configuration_id = p_configuration_id
+    ), doomed AS (
+        DELETE FROM cache
+        WHERE id IN (SELECT id FROM ranked WHERE running_bytes > p_quota_bytes)
+        RETURNING cache_key, etag, size_bytes
+    ), doomed_chunks AS (
+        DELETE FROM cache_chunks c
+        USING doomed d
+        WHERE c.configuration_id = p_configuration_id AND c.cache_key = d.cache_key AND c.etag = d.etag
+    )
+    SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM doomed;
+$$ LANGUAGE sql;
@@ -0,0 +1,20 @@
+-- Rolling endpoint health checkpoints, written periodically by every worker.
+-- Each worker aggregates only the requests it served, so rows carry the
+-- worker that wrote them; a host-wide view merges the latest row per worker.
+
+CREATE TABLE IF NOT EXISTS metrics_checkpoints (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    configuration_id UUID REFERENCES crawl_configurations(id),
+    worker TEXT,
+    window_seconds INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    avg_execution_time FLOAT,
+    p50 FLOAT,
+    p95 FLOAT,
+    p99 FLOAT,
+    sketch JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_metrics_checkpoints_configuration_id ON metrics_checkpoints(configuration_id, created_at);
@@ -0,0 +1,3 @@
+-- Time each scrape spent queued for a scheduler slot, next to its execution time
+
+ALTER TABLE performance_metrics ADD COLUMN queue_wait FLOAT;
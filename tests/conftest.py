@@ -0,0 +1,12 @@
+import os
+import shutil
+import tempfile
+
+# Shared state is created when the app is imported, so this must run before
+# any test module imports it. A private directory keeps test runs from
+# writing to, or resetting, the counters of a live server on the same host.
+SHARED_STATE_DIR = tempfile.mkdtemp(prefix="crawato-test-")
+os.environ["SHARED_STATE_DIR"] = SHARED_STATE_DIR
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SHARED_STATE_DIR, ignore_errors=True)
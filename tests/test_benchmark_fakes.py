@@ -0,0 +1,63 @@
+import pytest
+from datetime import datetime, timedelta
+from postgrest.exceptions import APIError
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.stats import percentile, summarize_latencies
+from app.db import database
+from app.db.pagination import split_page
+import httpx
+
+def test_fake_supabase_pages_like_postgrest(mocker):
+    fake = FakeSupabase()
+    mocker.patch('app.db.database.supabase', fake)
+    for index in range(5):
+        fake.write("crawl_configurations", {
+            "user_id": "user", "name": f"Config {index}", "url": "http://example.com", "selectors": {},
+            "created_at": f"2024-01-01T00:00:0{index // 2}"
+        }, None)
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = split_page(database.get_crawl_configurations("user", cursor=cursor, limit=2).data, 2)
+        seen.extend(row["name"] for row in rows)
+        if cursor is None:
+            break
+    assert sorted(seen) == [f"Config {index}" for index in range(5)]
+    assert len(seen) == 5
+
+def test_fake_supabase_cache_upsert_and_expiry(mocker):
+    fake = FakeSupabase()
+    mocker.patch('app.db.database.supabase', fake)
+    later = (datetime.utcnow() + timedelta(minutes=5)).isoformat()
+    database.set_cache("config", "key", {"v": 1}, later)
+    database.set_cache("config", "key", {"v": 2}, later)
+    assert len(fake.tables["cache"]) == 1
+    assert database.get_cache("config", "key").data[0]["cache_value"] == {"v": 2}
+
+    database.set_cache("config", "old", {"v": 1}, (datetime.utcnow() - timedelta(minutes=5)).isoformat())
+    assert database.get_cache("config", "old").data == []
+
+def test_fake_supabase_single_raises_like_postgrest():
+    fake = FakeSupabase()
+    fake.write("users", {"email": "a@example.com"}, None)
+    assert fake.table("users").select("*").eq("email", "a@example.com").single().execute().data["email"] == "a@example.com"
+    with pytest.raises(APIError) as error:
+        fake.table("users").select("*").eq("email", "b@example.com").single().execute()
+    assert error.value.code == "PGRST116"
+    assert fake.table("users").select("*").eq("email", "b@example.com").maybe_single().execute() is None
+
+def test_fixture_server_serves_corpus():
+    with FixtureServer(pages={"small": "<h1>Hi</h1>"}) as server:
+        assert httpx.get(server.url("small")).text == "<h1>Hi</h1>"
+        assert httpx.get(f"{server.base_url}/elsewhere").status_code == 404
+
+def test_latency_summary():
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([], 0.5) is None
+    summary = summarize_latencies([0.001] * 99 + [0.1], elapsed=1.0, errors=1)
+    assert summary["requests"] == 101
+    assert summary["requests_per_second"] == 100
+    assert summary["p50_ms"] == 1.0
+    assert summary["p99_ms"] == 1.0
+    assert summary["max_ms"] == 100.0
@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import Mock
+from app.services.bulk_configurations import parse_bulk_payload, write_configurations
+
+def test_parse_json_array():
+    rows = parse_bulk_payload(b'[{"name": "a"}, {"name": "b"}]', "application/json")
+    assert rows == [(0, {"name": "a"}), (1, {"name": "b"})]
+
+def test_parse_ndjson_reports_bad_lines():
+    rows = parse_bulk_payload(b'{"name": "a"}\n\nnot json\n{"name": "b"}\n', "application/x-ndjson")
+    # Indexes are line numbers in the body, counting the blank line
+    assert rows[0] == (0, {"name": "a"})
+    assert rows[1][0] == 2 and isinstance(rows[1][1], ValueError)
+    assert rows[2] == (3, {"name": "b"})
+
+def test_parse_rejects_non_array():
+    with pytest.raises(ValueError):
+        parse_bulk_payload(b'{"name": "a"}', "application/json")
+
+def test_write_configurations_chunks_and_checks_ownership(mocker):
+    create = mocker.patch('app.services.bulk_configurations.create_crawl_configurations',
+                          side_effect=lambda rows: Mock(data=rows))
+    mocker.patch('app.services.bulk_configurations.get_owned_configuration_ids', return_value=["1"])
+    upsert = mocker.patch('app.services.bulk_configurations.upsert_crawl_configurations',
+                          side_effect=lambda rows: Mock(data=rows))
+    rows = [
+        (0, {"name": "a"}),
+        (1, {"name": "b"}),
+        (2, {"name": "c"}),
+        (3, {"id": "1", "name": "d"}),
+        (4, {"id": "2", "name": "e"}),
+    ]
+    report = write_configurations("456", rows, chunk_size=2)
+    assert create.call_count == 2
+    assert create.call_args_list[0][0][0][0]["user_id"] == "456"
+    upsert.assert_called_once_with([{"id": "1", "name": "d", "user_id": "456"}])
+    assert report["created"] == 3
+    assert report["updated"] == 1
+    assert report["errors"] == [{"index": 4, "error": "Configuration not found"}]
+
+def test_write_configurations_reports_failed_chunk(mocker):
+    mocker.patch('app.services.bulk_configurations.create_crawl_configurations', side_effect=Exception("boom"))
+    report = write_configurations("456", [(0, {"name": "a"}), (1, {"name": "b"})], chunk_size=10)
+    assert report["failed"] == 2
+    assert [error["index"] for error in report["errors"]] == [0, 1]
@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import Mock
+from app.services.cache_maintenance import CacheMaintenance
+
+def test_sweep_expired_runs_batches_until_short(mocker):
+    sweep = mocker.patch('app.services.cache_maintenance.sweep_expired_cache', side_effect=[
+        Mock(data=[{"deleted_rows": 2, "deleted_bytes": 200}]),
+        Mock(data=[{"deleted_rows": 1, "deleted_bytes": 50}]),
+    ])
+    maintenance = CacheMaintenance(batch_size=2, quota_bytes=1000)
+    maintenance.sweep_expired()
+    assert sweep.call_count == 2
+    assert maintenance.stats["expired_rows_deleted"] == 3
+    assert maintenance.stats["expired_bytes_reclaimed"] == 250
+
+def test_enforce_quotas_only_for_written_configurations(mocker):
+    evict = mocker.patch('app.services.cache_maintenance.evict_cache_lru', return_value=Mock(data=[{"deleted_rows": 1, "deleted_bytes": 10}]))
+    maintenance = CacheMaintenance(batch_size=100, quota_bytes=1000)
+    maintenance.note_write("789")
+    maintenance.note_write("789")
+    maintenance.enforce_quotas()
+    evict.assert_called_once_with("789", 1000)
+    assert maintenance.stats["evicted_rows"] == 1
+    maintenance.enforce_quotas()
+    assert evict.call_count == 1
+
+def test_sweep_flushes_access_times_and_records_errors(mocker):
+    touch = mocker.patch('app.services.cache_maintenance.touch_cache_entries')
+    mocker.patch('app.services.cache_maintenance.sweep_expired_cache', side_effect=Exception("boom"))
+    maintenance = CacheMaintenance(batch_size=100, quota_bytes=1000)
+    maintenance.note_access("abc")
+    stats = maintenance.sweep()
+    assert touch.call_args[0][0] == ["abc"]
+    assert stats["sweeps"] == 1
+    assert stats["last_error"] == "boom"
+
+def test_flush_touches_rows_hit_through_the_shared_pointer(mocker):
+    touch_keys = mocker.patch('app.services.cache_maintenance.touch_cache_keys')
+    mocker.patch('app.services.cache_maintenance.touch_cache_entries')
+    maintenance = CacheMaintenance(batch_size=100, quota_bytes=1000)
+    maintenance.note_key_access("789", "endpoint:")
+    maintenance.note_key_access("789", "endpoint:")
+    maintenance.flush_access_times()
+    touch_keys.assert_called_once()
+    assert touch_keys.call_args[0][:2] == ("789", ["endpoint:"])
+    maintenance.flush_access_times()
+    assert touch_keys.call_count == 1
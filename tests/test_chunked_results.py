@@ -0,0 +1,91 @@
+import pytest
+from app.services.chunked_results import (
+    ResultChunkCache, ResultLayout, ResultSlice, decode_offset_cursor, encode_offset_cursor, find_records_key, split_result
+)
+from app.services.data_processing import process_and_validate_data
+
+def build_result(count):
+    return {"source": "test", "tags": ["a"], "items": [{"index": i, "name": f"item {i}", "extra": "x" * 10} for i in range(count)]}
+
+def test_split_keeps_small_results_whole():
+    value = build_result(3)
+    assert split_result(value, 10) == (value, "items", [])
+    assert split_result(["not", "a", "dict"], 1) == (["not", "a", "dict"], None, [])
+
+def test_split_chunks_the_longest_list():
+    envelope, records_key, chunks = split_result(build_result(25), 10)
+    assert records_key == "items"
+    assert envelope == {"source": "test", "tags": ["a"], "items": []}
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert chunks[2][0]["index"] == 20
+
+def pipeline_result(count):
+    raw = {
+        "data": [{"title": f"<b>Item {i}</b>", "price": i} for i in range(count)],
+        "metadata": {"url": "https://example.com", "status": 200, "render": {"requests": 3}},
+    }
+    return process_and_validate_data(raw, {"data": list}, {})
+
+def test_records_found_inside_the_pipeline_envelope():
+    assert find_records_key({"data": {"items": [1, 2], "tags": [1]}, "links": [1]}) == "data.items"
+    envelope, records_key, chunks = split_result(pipeline_result(25), 10)
+    assert records_key == "data"
+    assert envelope["data"] == [] and envelope["metadata"]["status"] == 200
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+    layout = ResultLayout.from_row({"cache_value": pipeline_result(25), "etag": '"a"'})
+    assert layout.record_count == 25
+    page = ResultSlice(20, 10, ["title"]).page(layout, layout.records[20:25])
+    assert page["data"] == [{"title": f"Item {i}"} for i in range(20, 25)]
+    assert page["metadata"]["url"] == "https://example.com"
+
+def test_layout_from_rows():
+    inline = ResultLayout.from_row({"cache_value": build_result(4), "etag": '"a"'})
+    assert not inline.chunked
+    assert inline.records_key == "items" and inline.record_count == 4
+    chunked = ResultLayout.from_row({
+        "cache_value": {"items": []}, "etag": '"b"', "records_key": "items",
+        "record_count": 25, "chunk_size": 10, "size_bytes": 2500
+    })
+    assert chunked.chunked
+    assert chunked.chunk_range(9, 21) == range(0, 3)
+    assert chunked.chunk_range(10, 20) == range(1, 2)
+    assert chunked.chunk_range(5, 5) == range(0)
+    assert chunked.chunk_bytes(10) == 1000
+
+def test_cursor_round_trip_and_validation():
+    assert decode_offset_cursor(encode_offset_cursor(150)) == 150
+    for cursor in ("garbage!", encode_offset_cursor(-1), "WyJ4Il0"):
+        with pytest.raises(ValueError):
+            decode_offset_cursor(cursor)
+    with pytest.raises(ValueError):
+        ResultSlice.from_query(10, 5, encode_offset_cursor(20), None)
+
+def test_slice_bounds_cursor_and_projection():
+    layout = ResultLayout.from_row({"cache_value": build_result(25), "etag": '"a"'})
+    result_slice = ResultSlice.from_query(None, 10, encode_offset_cursor(10), ["index"])
+    assert not result_slice.whole
+    assert result_slice.bounds(25) == (10, 20)
+    assert decode_offset_cursor(result_slice.next_cursor(25)) == 20
+    assert ResultSlice(20, 10).next_cursor(25) is None
+    page = result_slice.page(layout, layout.records[10:20])
+    assert page["source"] == "test"
+    assert page["items"][0] == {"index": 10}
+    assert ResultSlice.from_query(None, None, None, None).whole
+
+def test_projection_of_results_without_records():
+    layout = ResultLayout.from_row({"cache_value": {"title": "T", "price": 3}, "etag": '"a"'})
+    assert layout.records_key is None
+    assert ResultSlice(fields=["title"]).page(layout, []) == {"title": "T"}
+
+def test_chunk_cache_evicts_least_recently_used():
+    layout = ResultLayout('"a"', {"items": []}, "items", 30, 10, size_bytes=3000)
+    cache = ResultChunkCache(max_bytes=2500)
+    for index in range(3):
+        cache.put_chunk(layout, index, [index] * 10)
+    assert cache.get_chunk('"a"', 0) is None
+    assert cache.get_chunk('"a"', 1) == [1] * 10
+    cache.put_chunk(layout, 0, [0] * 10)
+    assert cache.get_chunk('"a"', 2) is None
+    assert cache.get_chunk('"a"', 1) == [1] * 10
+    assert cache.total_bytes == 2000
@@ -3,6 +3,8 @@ from fastapi.testclient import TestClient
 from app.main import app
 from unittest.mock import Mock, patch
 from app.core.security import create_access_token
+from app.api.auth import UserInDB, get_current_user
+from benchmarks.fake_supabase import FakeSupabase
 
 client = TestClient(app)
 
@@ -12,6 +14,13 @@ def mock_supabase(mocker):
     mocker.patch('app.db.database.supabase', mock)
     return mock
 
+@pytest.fixture
+def current_user():
+    # Depends() captured get_current_user at import time, so patching the module does not reach it
+    app.dependency_overrides[get_current_user] = lambda: UserInDB(id="123", email="test@example.com", hashed_password="x")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
 @pytest.fixture
 def auth_headers():
     access_token = create_access_token(data={"sub": "test@example.com"})
@@ -46,19 +55,61 @@ def test_create_configuration(mock_supabase, auth_headers):
     assert response.json()["name"] == "Test Config"
     assert response.json()["url"] == "https://supabase.com/pricing"
 
-def test_get_configurations(mock_supabase, auth_headers):
-    mock_supabase.table().select().eq().execute.return_value.data = [{
+def test_get_configurations(current_user, mocker):
+    get_configurations = mocker.patch('app.api.configurations.get_crawl_configurations', return_value=Mock(data=[{
         "id": "123",
         "name": "Test Config",
         "url": "https://supabase.com/pricing",
         "selectors": {"title": "h1"},
         "created_at": "2023-01-01T00:00:00",
         "updated_at": "2023-01-01T00:00:00"
-    }]
+    }]))
+
+    response = client.get("/configurations/configurations")
 
-    with patch('app.api.auth.get_current_user', return_value={"id": "123", "email": "test@example.com"}):
-        response = client.get("/configurations/configurations", headers=auth_headers)
-    
     assert response.status_code == 200
     assert len(response.json()) == 1
     assert response.json()[0]["name"] == "Test Config"
+    assert "X-Next-Cursor" not in response.headers
+    get_configurations.assert_called_once_with(user_id="123", fields=None, cursor=None, limit=100)
+
+def test_get_configurations_next_cursor(current_user, mocker):
+    # The query asks for one row more than the page to learn whether another page follows
+    get_configurations = mocker.patch('app.api.configurations.get_crawl_configurations', return_value=Mock(data=[{
+        "id": str(i),
+        "name": f"Config {i}",
+        "created_at": f"2023-01-0{i}T00:00:00"
+    } for i in range(1, 4)]))
+
+    response = client.get("/configurations/configurations?limit=2&fields=name")
+
+    assert response.status_code == 200
+    assert [config["id"] for config in response.json()] == ["1", "2"]
+    assert "X-Next-Cursor" in response.headers
+    get_configurations.assert_called_once_with(user_id="123", fields=["name"], cursor=None, limit=2)
+
+@pytest.fixture
+def fake_supabase(mocker):
+    fake = FakeSupabase()
+    mocker.patch('app.db.database.supabase', fake)
+    fake.write("crawl_configurations", {"id": "owned", "user_id": "123", "url": "https://example.com", "selectors": {}}, None)
+    fake.write("crawl_configurations", {"id": "foreign", "user_id": "999", "url": "https://example.com", "selectors": {}}, None)
+    return fake
+
+@pytest.mark.parametrize("config_id", ["missing", "foreign"])
+def test_metrics_and_errors_of_missing_or_foreign_configuration(current_user, fake_supabase, config_id):
+    for path in ("metrics", "errors"):
+        assert client.get(f"/configurations/configurations/{config_id}/{path}").status_code == 404
+    assert client.get("/configurations/configurations/owned/metrics").status_code == 200
+
+@pytest.mark.parametrize("config_id", ["missing", "foreign"])
+def test_crawl_of_missing_or_foreign_configuration(current_user, fake_supabase, mocker, config_id):
+    start = mocker.patch('app.api.configurations.crawl_jobs.start')
+    assert client.post(f"/configurations/configurations/{config_id}/crawl").status_code == 404
+    start.assert_not_called()
+
+@pytest.mark.parametrize("config_id", ["missing", "foreign"])
+def test_history_of_missing_or_foreign_configuration(current_user, fake_supabase, config_id):
+    for path in ("history", "history/diff?from_version=1&to_version=2", "history/1"):
+        assert client.get(f"/configurations/configurations/{config_id}/{path}").status_code == 404
+    assert client.get("/configurations/configurations/owned/history").json() == []
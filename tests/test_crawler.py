@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from app.services.crawler import CrawlJob, run_crawl
+from app.services.scheduler import FairScheduler, BULK
+
+LINKS = {
+    "https://example.com/": ["/a", "/b", "/c"],
+    "https://example.com/a": ["/d", "https://elsewhere.com/"],
+    "https://example.com/b": [],
+    "https://example.com/c": ["/a"],
+    "https://example.com/d": [],
+}
+
+class FakeCrawler:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+@pytest.mark.asyncio
+async def test_crawl_waits_for_queue_room_instead_of_failing_pages(mocker):
+    async def scrape(crawler, url, selectors, render_profile):
+        # The slow page must not hold up the others
+        await asyncio.sleep(0.05 if url.endswith("/b") else 0.001)
+        return {"data": {"title": url}, "links": {"internal": [{"href": href} for href in LINKS[url]]}}
+
+    mocker.patch('app.services.crawler.install_render_hooks')
+    mocker.patch('app.services.crawler.scrape_single_url', side_effect=scrape)
+    # One slot and one queued request per user, so most of the workers are turned away at first
+    scheduler = FairScheduler(max_concurrency=1, user_max_concurrency=1, user_max_queued=1)
+    mocker.patch('app.services.crawler.scraping_scheduler', scheduler)
+    mocker.patch('app.services.crawler.QUEUE_FULL_RETRY_SECONDS', 0.001)
+    history = mocker.patch('app.services.crawler.create_scraping_history')
+
+    job = CrawlJob({"id": "789", "url": "https://example.com", "selectors": {}}, "456", {"concurrency": 4, "max_depth": 2})
+    await run_crawl(job, crawler_class=lambda **kwargs: FakeCrawler())
+
+    assert job.status == "completed", job.error
+    assert scheduler.rejected[BULK] > 0
+    assert job.pages_failed == 0
+    assert job.pages_crawled == 5
+    assert sorted(call.kwargs["metadata"]["url"] for call in history.call_args_list) == sorted(LINKS)
@@ -3,9 +3,18 @@ from fastapi.testclient import TestClient
 from app.main import app
 from unittest.mock import Mock, patch
 from app.core.security import create_access_token
+from app.services.routing import routing_table
+from app.core.rate_limit import limiter
+from app.api.auth import UserInDB, get_current_user
+from postgrest.exceptions import APIError
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    # Counters are shared between processes, so clear what earlier runs left
+    limiter.reset()
+
 @pytest.fixture
 def mock_supabase(mocker):
     mock = Mock()
@@ -41,28 +50,97 @@ def test_create_dynamic_endpoint(mock_supabase, auth_headers):
 
 @pytest.mark.asyncio
 async def test_dynamic_endpoint(mock_supabase, mocker, auth_headers):
-    mock_supabase.table().select().eq().single().execute.return_value.data = {
+    routing_table.invalidate_endpoint("test-endpoint")
+    mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value={
         "id": "123",
         "user_id": "456",
         "endpoint_url": "test-endpoint",
         "configuration_id": "789",
         "data_schema": {"title": "string"},
-        "transformations": {"title": "lambda x: x.upper()"}
-    }
-    print(1)
-    mock_supabase.table().select().eq().execute.return_value.data = [{
+        "transformations": {"title": "upper"}
+    })
+    mocker.patch('app.services.routing.storage.get_crawl_configuration', return_value={
+        "id": "789",
+        "user_id": "456",
         "url": "https://supabase.com/pricing",
         "selectors": {"title": "h1"}
-    }]
-
-    print(2)
-    
+    })
+    mocker.patch('app.api.dynamic_endpoints.shared_cached_response', return_value=None)
+    mocker.patch('app.api.dynamic_endpoints.storage.get_cache', return_value=None)
+    mocker.patch('app.api.dynamic_endpoints.storage.set_cache', return_value=None)
     mocker.patch('app.api.dynamic_endpoints.scrape_url', return_value={"data": {"title": "Test Page"}})
-    print(3)
     mocker.patch('app.api.dynamic_endpoints.process_and_validate_data', return_value={"title": "TEST PAGE"})
-    print(4)
+    metric = mocker.patch('app.api.dynamic_endpoints.create_performance_metric')
     response = client.get("/dynamic/test-endpoint?value=1", headers=auth_headers)
     print(f"Response status code: {response.status_code}")
     print(f"Response content: {response.content}")
     assert response.status_code == 200
     assert response.json()["title"] == "TEST PAGE"
+    assert metric.call_args.kwargs["queue_wait"] >= 0
+
+def test_dynamic_endpoint_pages_chunked_results(mock_supabase, mocker):
+    from app.db.backends.memory_backend import MemoryBackend
+    from app.services.chunked_results import ResultChunkCache
+
+    routing_table.invalidate_endpoint("paged-endpoint")
+    mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value={
+        "id": "123",
+        "user_id": "456",
+        "endpoint_url": "paged-endpoint",
+        "configuration_id": "paged-789",
+        "data_schema": {},
+        "transformations": {}
+    })
+    mocker.patch('app.services.routing.storage.get_crawl_configuration', return_value={
+        "id": "paged-789",
+        "user_id": "456",
+        "url": "https://example.com",
+        "selectors": {"title": "h1"}
+    })
+    backend = MemoryBackend()
+    mocker.patch('app.api.dynamic_endpoints.storage', backend)
+    mocker.patch('app.api.dynamic_endpoints.result_chunks', ResultChunkCache(10 ** 7))
+    mocker.patch('app.api.dynamic_endpoints.settings.RESULT_CHUNK_RECORDS', 100)
+    mocker.patch('app.api.dynamic_endpoints.scrape_url', return_value={"data": {}})
+    items = [{"index": i, "name": f"item {i}"} for i in range(250)]
+    mocker.patch('app.api.dynamic_endpoints.process_and_validate_data', return_value={"count": 250, "items": items})
+
+    response = client.get("/dynamic/paged-endpoint?offset=190&limit=20&fields=index")
+    assert response.status_code == 200
+    assert response.json() == {"count": 250, "items": [{"index": i} for i in range(190, 210)]}
+    assert response.headers["X-Total-Count"] == "250"
+    assert len(backend.cache_chunks) == 3
+    assert 'rel="next"' in response.headers["Link"] and "offset" not in response.headers["Link"]
+
+    # Later pages read chunks back from storage once the local copies are gone
+    mocker.patch('app.api.dynamic_endpoints.result_chunks', ResultChunkCache(10 ** 7))
+    response = client.get(f"/dynamic/paged-endpoint?cursor={response.headers['X-Next-Cursor']}&limit=100")
+    assert [item["index"] for item in response.json()["items"]] == list(range(210, 250))
+    assert "X-Next-Cursor" not in response.headers
+
+    mocker.patch('app.api.dynamic_endpoints.shared_cached_response', return_value=None)
+    mocker.patch('app.api.dynamic_endpoints.encoded_responses.get', return_value=None)
+    response = client.get("/dynamic/paged-endpoint")
+    assert response.json()["items"] == items
+
+    assert client.get("/dynamic/paged-endpoint?offset=1&cursor=abc").status_code == 400
+
+@pytest.mark.parametrize("error", [
+    ValueError("badly formed hexadecimal UUID string"),
+    APIError({"code": "22P02", "message": 'invalid input syntax for type uuid: "not-a-uuid"'}),
+])
+def test_create_dynamic_endpoint_for_malformed_configuration_id(mocker, error):
+    app.dependency_overrides[get_current_user] = lambda: UserInDB(id="456", email="test@example.com", hashed_password="x")
+    try:
+        mocker.patch('app.api.dynamic_endpoints.storage.get_crawl_configuration', side_effect=error)
+        create = mocker.patch('app.api.dynamic_endpoints.create_custom_endpoint')
+        response = client.post("/dynamic/create", json={
+            "configuration_id": "not-a-uuid",
+            "endpoint_url": "test-endpoint",
+            "data_schema": {},
+            "transformations": {}
+        })
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+    assert response.status_code == 404
+    create.assert_not_called()
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from unittest.mock import Mock
+from app.services.events import EventBroker, format_event
+
+def test_publish_only_on_change_and_shares_frame():
+    broker = EventBroker(queue_size=4)
+    first = broker.subscribe("test-endpoint")
+    second = broker.subscribe("test-endpoint")
+    assert broker.publish("test-endpoint", '"abc"', b'{"title":"A"}')
+    assert not broker.publish("test-endpoint", '"abc"', b'{"title":"A"}')
+    frame = first.queue.get_nowait()
+    assert frame == format_event("abc", b'{"title":"A"}')
+    assert second.queue.get_nowait() is frame
+
+def test_late_subscriber_gets_latest_event():
+    broker = EventBroker(queue_size=4)
+    broker.subscribe("test-endpoint")
+    broker.publish("test-endpoint", '"abc"', b"{}")
+    late = broker.subscribe("test-endpoint")
+    assert late.queue.qsize() == 1
+
+def test_slow_subscriber_keeps_latest_events():
+    broker = EventBroker(queue_size=2)
+    subscriber = broker.subscribe("test-endpoint")
+    for version in range(5):
+        broker.publish("test-endpoint", f'"{version}"', str(version).encode())
+    assert subscriber.dropped == 3
+    assert subscriber.queue.get_nowait() == format_event("3", b"3")
+    assert subscriber.queue.get_nowait() == format_event("4", b"4")
+
+def test_publish_without_subscribers_is_ignored():
+    assert not EventBroker(queue_size=2).publish("test-endpoint", '"abc"', b"{}")
+
+@pytest.mark.asyncio
+async def test_refresher_publishes_and_stops_with_last_subscriber():
+    broker = EventBroker(queue_size=4)
+    subscriber = broker.subscribe("test-endpoint")
+    calls = []
+
+    async def refresh():
+        calls.append(1)
+        return Mock(etag='"abc"', body=b"{}")
+
+    broker.ensure_refresher("test-endpoint", refresh, interval_seconds=0.01)
+    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=1)
+    assert frame == format_event("abc", b"{}")
+    await asyncio.sleep(0.05)
+    assert len(calls) > 1
+    assert subscriber.queue.empty()
+
+    refresher = broker.topics["test-endpoint"].refresher
+    broker.unsubscribe("test-endpoint", subscriber)
+    await asyncio.sleep(0)
+    assert refresher.cancelled() or refresher.done()
+    assert "test-endpoint" not in broker.topics
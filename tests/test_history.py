@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import Mock
+from postgrest.exceptions import APIError
+from app.services.json_patch import make_patch, apply_patch
+from app.services.history import HistoryStore, encode_snapshot, decode_snapshot
+
+def test_make_patch_round_trip():
+    source = {"title": "a", "items": [1, 2, 3], "nested": {"x": 1, "gone": True}, "a/b": 1}
+    target = {"title": "b", "items": [1, 5], "nested": {"x": 1, "new": [1]}, "a/b": 2}
+    patch = make_patch(source, target)
+    assert apply_patch(source, patch) == target
+    assert source["items"] == [1, 2, 3]
+
+def test_make_patch_identical_is_empty():
+    assert make_patch({"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}) == []
+
+def test_snapshot_compression_threshold():
+    small = encode_snapshot({"a": 1}, compression_threshold=100)
+    assert small == {"result": {"a": 1}, "compressed_result": None}
+    big_result = {"items": ["x" * 50] * 100}
+    big = encode_snapshot(big_result, compression_threshold=100)
+    assert big["result"] is None
+    assert decode_snapshot(big) == big_result
+
+class FakeHistoryTable:
+    def __init__(self):
+        self.rows = []
+
+    def insert(self, row):
+        self.rows.append(row)
+        return Mock(data=[row])
+
+    def latest(self, configuration_id, source_url):
+        rows = [row for row in self.rows if row["source_url"] == source_url]
+        return Mock(data=rows[-1:])
+
+    def snapshot(self, configuration_id, source_url, version):
+        rows = [row for row in self.rows if row["kind"] == "snapshot" and row["version"] <= version]
+        return Mock(data=rows[-1:])
+
+    def range(self, configuration_id, source_url, after_version, to_version):
+        return Mock(data=[row for row in self.rows if after_version < row["version"] <= to_version])
+
+@pytest.fixture
+def history_table(mocker):
+    table = FakeHistoryTable()
+    mocker.patch('app.services.history.insert_scraping_history', side_effect=table.insert)
+    mocker.patch('app.services.history.get_latest_scraping_history', side_effect=table.latest)
+    mocker.patch('app.services.history.get_scraping_history_snapshot', side_effect=table.snapshot)
+    mocker.patch('app.services.history.get_scraping_history_range', side_effect=table.range)
+    return table
+
+def test_history_store_writes_deltas_and_reconstructs(history_table):
+    store = HistoryStore(snapshot_interval=3, compression_threshold=10_000)
+    results = [{"items": list(range(50)), "run": run} for run in range(5)]
+    for result in results:
+        store.record("789", "success", result, {"url": "https://example.com"})
+
+    assert [row["kind"] for row in history_table.rows] == ["snapshot", "delta", "delta", "snapshot", "delta"]
+    assert history_table.rows[0]["source_url"] == "https://example.com/"
+
+    # A fresh store has to rebuild every version from the table
+    fresh = HistoryStore(snapshot_interval=3, compression_threshold=10_000)
+    for version, result in enumerate(results, start=1):
+        assert fresh.reconstruct("789", "https://example.com/", version) == result
+    assert fresh.diff("789", "https://example.com/", 1, 2) == [{"op": "replace", "path": "/run", "value": 1}]
+
+def test_history_store_missing_version(history_table):
+    store = HistoryStore(snapshot_interval=3, compression_threshold=10_000)
+    with pytest.raises(LookupError):
+        store.reconstruct("789", "", 1)
+
+def test_history_store_reloads_head_after_version_conflict(history_table, mocker):
+    store = HistoryStore(snapshot_interval=10, compression_threshold=10_000)
+    other_worker = HistoryStore(snapshot_interval=10, compression_threshold=10_000)
+    metadata = {"url": "https://example.com"}
+    store.record("789", "success", {"run": 0}, metadata)
+    other_worker.record("789", "success", {"run": 1}, metadata)
+
+    def unique_insert(row):
+        if any(existing["version"] == row["version"] for existing in history_table.rows):
+            raise APIError({"code": "23505", "message": "duplicate key value violates unique constraint", "details": None, "hint": None})
+        return history_table.insert(row)
+
+    mocker.patch('app.services.history.insert_scraping_history', side_effect=unique_insert)
+    store.record("789", "success", {"run": 2}, metadata)
+    store.record("789", "success", {"run": 3}, metadata)
+
+    assert [row["version"] for row in history_table.rows] == [1, 2, 3, 4]
+    assert store.reconstruct("789", "https://example.com/", 3) == {"run": 2}
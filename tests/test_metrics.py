@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from app.services.metrics import QuantileSketch, RollingAggregator, MetricsRegistry, health_status, run_checkpoints
+
+def test_quantile_sketch_relative_accuracy():
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in range(1, 1001):
+        sketch.add(value / 1000)
+    assert sketch.quantile(0.5) == pytest.approx(0.5, rel=0.02)
+    assert sketch.quantile(0.99) == pytest.approx(0.99, rel=0.02)
+
+def test_quantile_sketch_merge_and_subtract():
+    first = QuantileSketch()
+    second = QuantileSketch()
+    for value in [0.1, 0.2, 0.3]:
+        first.add(value)
+    for value in [5.0, 6.0]:
+        second.add(value)
+    first.merge(second)
+    assert first.count == 5
+    first.subtract(second)
+    assert first.count == 3
+    assert first.quantile(1.0) == pytest.approx(0.3, rel=0.02)
+
+def test_rolling_aggregator_error_rate_uses_same_window():
+    aggregator = RollingAggregator(window_seconds=60, slot_seconds=10)
+    aggregator.record(1.0, now=1000)
+    aggregator.record(3.0, now=1001)
+    aggregator.record(None, error=True, now=1002)
+    snapshot = aggregator.snapshot(now=1003)
+    assert snapshot["count"] == 3
+    assert snapshot["error_count"] == 1
+    assert snapshot["error_rate"] == pytest.approx(1 / 3)
+    assert snapshot["avg_execution_time"] == pytest.approx(2.0)
+
+def test_rolling_aggregator_expires_old_slots():
+    aggregator = RollingAggregator(window_seconds=60, slot_seconds=10)
+    aggregator.record(1.0, error=True, now=1000)
+    aggregator.record(2.0, now=1065)
+    snapshot = aggregator.snapshot(now=1066)
+    assert snapshot["count"] == 1
+    assert snapshot["error_count"] == 0
+    assert snapshot["p50"] == pytest.approx(2.0, rel=0.02)
+
+def test_snapshot_is_computed_once_per_slot():
+    aggregator = RollingAggregator(window_seconds=60, slot_seconds=10)
+    aggregator.record(1.0, now=1000)
+    first = aggregator.snapshot(now=1001)
+    aggregator.record(2.0, now=1002)
+    assert aggregator.snapshot(now=1003) is first
+    assert aggregator.snapshot(now=1011)["count"] == 2
+    assert aggregator.compute(now=1012)["count"] == 2
+
+def test_registry_checkpoint_only_dirty():
+    registry = MetricsRegistry(window_seconds=60, slot_seconds=10)
+    registry.record("789", 0.5)
+    rows = registry.checkpoint()
+    assert len(rows) == 1
+    assert rows[0]["configuration_id"] == "789"
+    assert rows[0]["worker"] == registry.worker
+    assert registry.checkpoint() == []
+
+@pytest.mark.asyncio
+async def test_failed_checkpoint_is_retried(mocker):
+    registry = MetricsRegistry(window_seconds=60, slot_seconds=10)
+    registry.record("789", 0.5)
+    write = mocker.patch('app.services.metrics.create_metrics_checkpoints', side_effect=[RuntimeError("down"), None])
+    task = asyncio.create_task(run_checkpoints(registry, 0.001))
+    for _ in range(1000):
+        if write.call_count == 2:
+            break
+        await asyncio.sleep(0.001)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert write.call_count == 2
+    assert [row["configuration_id"] for row in write.call_args.args[0]] == ["789"]
+    assert registry.checkpoint() == []
+
+def test_health_status():
+    assert health_status({"error_rate": None}) == "healthy"
+    assert health_status({"error_rate": 0.5}) == "unhealthy"
@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import Mock
+from httpx import QueryParams
+from app.db.pagination import encode_cursor, decode_cursor, select_columns, keyset_page, split_page
+
+ROW_ID = "5f0c2a52-8d0e-4c8b-9a36-1f1d0f4b7e21"
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"created_at": "2023-01-01T00:00:00+00:00", "id": ROW_ID})
+    assert decode_cursor(cursor) == ("2023-01-01T00:00:00+00:00", ROW_ID)
+
+def test_decode_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+@pytest.mark.parametrize("created_at, row_id", [
+    ('2023-01-01",id.gt."0', ROW_ID),
+    ("2023-01-01T00:00:00", '0"),(id.gt.0'),
+    (None, ROW_ID),
+])
+def test_decode_rejects_values_that_are_not_timestamps_and_uuids(created_at, row_id):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor({"created_at": created_at, "id": row_id}))
+
+def test_select_columns_projection():
+    allowed = ("id", "name", "url", "created_at")
+    assert select_columns(["name"], allowed) == "created_at,id,name"
+    assert select_columns(None, allowed) == "created_at,id,name,url"
+    with pytest.raises(ValueError):
+        select_columns(["password"], allowed)
+
+def test_keyset_page_filters_after_cursor():
+    query = Mock()
+    query.params = QueryParams()
+    cursor = encode_cursor({"created_at": "2023-01-01T00:00:00", "id": ROW_ID})
+    keyset_page(query, cursor, 10, descending=True)
+    assert query.params["order"] == "created_at.desc,id.desc"
+    assert query.params["or"] == f'(created_at.lt."2023-01-01T00:00:00",and(created_at.eq."2023-01-01T00:00:00",id.lt."{ROW_ID}"))'
+    query.limit.assert_called_once_with(11)
+
+def test_split_page():
+    rows = [{"created_at": "2023-01-01", "id": f"00000000-0000-0000-0000-00000000000{i}"} for i in range(3)]
+    page, next_cursor = split_page(rows, 2)
+    assert len(page) == 2
+    assert decode_cursor(next_cursor) == ("2023-01-01", rows[1]["id"])
+    assert split_page(rows, 3) == (rows, None)
@@ -0,0 +1,119 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.security import create_access_token
+from app.core.rate_limit import limiter
+from app.services.profiling import Profile, ProfileStore, RequestProfiler, phase, profile_store
+from app.services.routing import routing_table
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    limiter.reset()
+    profile_store.clear()
+
+def auth_headers(email):
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': email})}"}
+
+def build_rows(count):
+    return [{"index": i, "value": str(i) * 10} for i in range(count)]
+
+def test_store_evicts_oldest():
+    store = ProfileStore(max_entries=2)
+    profiles = [Profile("endpoint", "header") for _ in range(3)]
+    for profile in profiles:
+        store.add(profile)
+    assert store.get(profiles[0].id) is None
+    assert [entry["id"] for entry in store.list()] == [profiles[2].id, profiles[1].id]
+
+def test_sample_rate_validation():
+    profiler = RequestProfiler(ProfileStore())
+    with pytest.raises(ValueError):
+        profiler.set_sample_rate("endpoint", 1.5)
+    assert not profiler.should_sample("endpoint")
+    profiler.set_sample_rate("endpoint", 1.0)
+    assert profiler.should_sample("endpoint")
+
+@pytest.mark.asyncio
+async def test_profile_captures_functions_allocations_and_phases():
+    store = ProfileStore()
+    profiler = RequestProfiler(store)
+    async with profiler.profile("endpoint", "header") as profile:
+        with phase("build"):
+            rows = build_rows(1000)
+    assert len(rows) == 1000
+    assert store.get(profile.id) is profile
+    assert profile.wall_ms >= profile.phases_ms["build"] > 0
+    assert any("build_rows" in row["function"] for row in profile.functions)
+    assert any("test_profiling.py" in row["location"] for row in profile.allocations)
+    assert not profiler.active
+
+@pytest.mark.asyncio
+async def test_no_trigger_and_nested_profiles_are_skipped():
+    store = ProfileStore()
+    profiler = RequestProfiler(store)
+    async with profiler.profile("endpoint", None) as profile:
+        assert profile is None
+        with phase("ignored"):
+            pass
+    async with profiler.profile("endpoint", "header") as outer:
+        async with profiler.profile("endpoint", "sampled") as inner:
+            assert inner is None
+    assert [entry["id"] for entry in store.list()] == [outer.id]
+
+@pytest.mark.asyncio
+async def test_profile_records_errors():
+    store = ProfileStore()
+    with pytest.raises(RuntimeError):
+        async with RequestProfiler(store).profile("endpoint", "header"):
+            raise RuntimeError("boom")
+    assert store.list()[0]["error"] == "boom"
+
+def mock_route(mocker):
+    routing_table.invalidate_endpoint("test-endpoint")
+    mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value={
+        "id": "123",
+        "user_id": "456",
+        "endpoint_url": "test-endpoint",
+        "configuration_id": "789",
+        "data_schema": {"title": "string"},
+        "transformations": {}
+    })
+    mocker.patch('app.services.routing.storage.get_crawl_configuration', return_value={
+        "id": "789", "user_id": "456", "url": "https://example.com", "selectors": {"title": "h1"}
+    })
+    mocker.patch('app.api.dynamic_endpoints.shared_cached_response', return_value=None)
+    mocker.patch('app.api.dynamic_endpoints.storage.get_cache', return_value={
+        "id": "1", "cache_value": {"title": "Cached"}, "etag": None
+    })
+    mocker.patch('app.api.dynamic_endpoints.cache_maintenance.note_access')
+
+def test_header_profiles_admin_requests(mocker):
+    mock_route(mocker)
+    mocker.patch('app.api.auth.settings.ADMIN_EMAILS', ["admin@example.com"])
+    mocker.patch('app.api.auth.storage.get_user_by_email', return_value={
+        "id": "1", "email": "admin@example.com", "hashed_password": "x"
+    })
+    headers = {**auth_headers("admin@example.com"), "X-Profile": "1"}
+
+    response = client.get("/dynamic/test-endpoint", headers=headers)
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    response = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["trigger"] == "header"
+    assert body["status_code"] == 200
+    assert "cache_read" in body["phases_ms"]
+
+def test_header_ignored_for_other_users(mocker):
+    mock_route(mocker)
+    mocker.patch('app.api.auth.storage.get_user_by_email', return_value={
+        "id": "2", "email": "user@example.com", "hashed_password": "x"
+    })
+    response = client.get("/dynamic/test-endpoint", headers={**auth_headers("user@example.com"), "X-Profile": "1"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert profile_store.list() == []
@@ -0,0 +1,149 @@
+import pytest
+from app.services.render_profiles import (
+    install_render_hooks, render_session, resolve_render_profile, DEFAULT_RENDER_PROFILE
+)
+
+class FakeRequest:
+    def __init__(self, url, resource_type, size=0):
+        self.url = url
+        self.resource_type = resource_type
+        self.size = size
+
+    async def sizes(self):
+        return {"responseBodySize": self.size, "responseHeadersSize": 100}
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+class FakePage:
+    """Just enough of a Playwright page to drive the render hooks."""
+
+    def __init__(self, requests):
+        self.requests = requests
+        self.viewport = None
+        self.waited_for = None
+        self.handlers = {}
+        self.router = None
+
+    async def set_viewport_size(self, size):
+        self.viewport = size
+
+    async def route(self, pattern, handler):
+        self.router = handler
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def wait_for_load_state(self, state, timeout):
+        self.waited_for = state
+
+    async def wait_for_selector(self, selector, timeout):
+        self.waited_for = selector
+
+    async def load(self):
+        routes = []
+        for request in self.requests:
+            route = FakeRoute(request)
+            await self.router(route)
+            routes.append(route)
+            if route.outcome == "continued":
+                self.handlers["requestfinished"](request)
+        return routes
+
+class FakeStrategy:
+    def __init__(self, page):
+        self.page = page
+        self.hooks = {}
+
+    def set_hook(self, hook_type, hook):
+        self.hooks[hook_type] = hook
+
+    async def crawl(self):
+        await self.hooks["before_goto"](self.page)
+        routes = await self.page.load()
+        await self.hooks["after_goto"](self.page)
+        await self.hooks["before_return_html"](self.page, "<html></html>")
+        return routes
+
+class FakeCrawler:
+    def __init__(self, page):
+        self.crawler_strategy = FakeStrategy(page)
+
+    async def arun(self):
+        return await self.crawler_strategy.crawl()
+
+def test_resolve_fills_defaults_and_blocks_scripts_without_javascript():
+    assert resolve_render_profile(None) == DEFAULT_RENDER_PROFILE
+    profile = resolve_render_profile({"javascript": False, "wait_until": "networkidle", "max_script_bytes": None})
+    assert "script" in profile["blocked_resource_types"]
+    assert profile["wait_until"] == "networkidle"
+    assert "script" not in DEFAULT_RENDER_PROFILE["blocked_resource_types"]
+
+@pytest.mark.asyncio
+async def test_lean_profile_blocks_heavy_resources_and_counts_bytes():
+    page = FakePage([
+        FakeRequest("https://example.com/", "document", 5000),
+        FakeRequest("https://example.com/hero.jpg", "image", 90000),
+        FakeRequest("https://example.com/site.css", "stylesheet", 20000),
+        FakeRequest("https://www.google-analytics.com/analytics.js", "script", 40000),
+        FakeRequest("https://example.com/app.js", "script", 3000),
+    ])
+    crawler = FakeCrawler(page)
+    install_render_hooks(crawler)
+
+    with render_session(None) as stats:
+        routes = await crawler.arun()
+
+    assert [route.outcome for route in routes] == ["continued", "aborted", "aborted", "aborted", "continued"]
+    assert page.viewport == {"width": 1280, "height": 720}
+    assert stats.blocked_requests == 3
+    assert stats.requests == 2
+    assert stats.bytes_transferred == 5000 + 3000 + 200
+    assert stats.render_time is not None
+
+@pytest.mark.asyncio
+async def test_script_budget_and_selector_wait():
+    page = FakePage([
+        FakeRequest("https://example.com/a.js", "script", 6000),
+        FakeRequest("https://example.com/b.js", "script", 6000),
+        FakeRequest("https://example.com/c.js", "script", 6000),
+    ])
+    crawler = FakeCrawler(page)
+    install_render_hooks(crawler)
+    profile = {"max_script_bytes": 10000, "wait_until": "selector", "wait_for_selector": "#prices", "blocked_domains": []}
+
+    with render_session(profile) as stats:
+        # Byte counts land asynchronously, so settle each one before the next request
+        await crawler.crawler_strategy.hooks["before_goto"](page)
+        outcomes = []
+        for request in page.requests:
+            route = FakeRoute(request)
+            await page.router(route)
+            outcomes.append(route.outcome)
+            if route.outcome == "continued":
+                page.handlers["requestfinished"](request)
+                await crawler.crawler_strategy.hooks["before_return_html"](page, "")
+        await crawler.crawler_strategy.hooks["after_goto"](page)
+
+    assert outcomes == ["continued", "continued", "aborted"]
+    assert page.waited_for == "#prices"
+    assert stats.blocked_requests == 1
+
+@pytest.mark.asyncio
+async def test_hooks_do_nothing_outside_a_session():
+    page = FakePage([FakeRequest("https://example.com/hero.jpg", "image")])
+    crawler = FakeCrawler(page)
+    install_render_hooks(crawler)
+    await crawler.crawler_strategy.hooks["before_goto"](page)
+    assert page.router is None and page.viewport is None
+
+def test_install_skips_crawlers_without_hooks():
+    install_render_hooks(object())
@@ -0,0 +1,53 @@
+import gzip
+from app.services.shared_state import SharedBlobStore
+from app.services.response_encoding import (
+    EncodedResponse, EncodedResponseCache, encode_json, etag_matches, choose_encoding
+)
+
+def test_etag_is_stable_and_matches():
+    first = EncodedResponse(encode_json({"title": "Test"}))
+    second = EncodedResponse(encode_json({"title": "Test"}))
+    assert first.etag == second.etag
+    assert etag_matches(first.etag, first.etag)
+    assert etag_matches(f'"other", W/{first.etag}', first.etag)
+    assert etag_matches("*", first.etag)
+    assert not etag_matches('"other"', first.etag)
+    assert not etag_matches(None, first.etag)
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding(None) is None
+
+def test_variant_compresses_above_threshold_only():
+    entry = EncodedResponse(encode_json({"items": ["x" * 10] * 200}))
+    body, encoding = entry.variant("gzip", min_bytes=1024)
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == entry.body
+    assert entry.variant("gzip", min_bytes=1024)[0] is body
+
+    small = EncodedResponse(encode_json({"a": 1}))
+    assert small.variant("gzip", min_bytes=1024) == (small.body, None)
+
+def test_cache_evicts_least_recently_used():
+    cache = EncodedResponseCache(max_bytes=100)
+    first = cache.put(EncodedResponse(b"a" * 40))
+    second = cache.put(EncodedResponse(b"b" * 40))
+    cache.get(first.etag)
+    cache.put(EncodedResponse(b"c" * 40))
+    assert cache.get(first.etag) is first
+    assert cache.get(second.etag) is None
+    assert cache.total_bytes == 80
+
+def test_workers_share_bodies_and_variants(tmp_path):
+    store = SharedBlobStore(str(tmp_path), max_bytes=1024 * 1024)
+    first_worker = EncodedResponseCache(max_bytes=1024 * 1024, shared=store, shared_ttl_seconds=60)
+    second_worker = EncodedResponseCache(max_bytes=1024 * 1024, shared=store, shared_ttl_seconds=60)
+
+    entry = first_worker.put(EncodedResponse(encode_json({"items": ["x" * 10] * 200})))
+    compressed, _ = first_worker.variant(entry, "gzip", min_bytes=1024)
+
+    shared = second_worker.get(entry.etag)
+    assert shared.body == entry.body
+    assert shared.variants == {}
+    assert second_worker.variant(shared, "gzip", min_bytes=1024) == (compressed, "gzip")
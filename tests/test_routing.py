@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import Mock
+from app.services.routing import Pipeline, RoutingTable
+from app.services.shared_state import SharedCounters
+
+ENDPOINT = {
+    "id": "123",
+    "user_id": "456",
+    "endpoint_url": "test-endpoint",
+    "configuration_id": "789",
+    "data_schema": {"title": "string"},
+    "transformations": {"title": "upper"}
+}
+
+CONFIGURATION = {"id": "789", "user_id": "456", "url": "https://supabase.com/pricing", "selectors": {"title": "h1"}}
+
+def test_pipeline_compiles_schema_and_transformations():
+    pipeline = Pipeline({"title": "string", "views": "integer"}, {"title": "upper"})
+    assert pipeline.schema == {"title": str, "views": int}
+    assert pipeline.transformations["title"]("abc") == "ABC"
+
+@pytest.mark.asyncio
+async def test_resolve_uses_endpoint_configuration(mocker):
+    get_endpoint = mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value=ENDPOINT)
+    get_configuration = mocker.patch('app.services.routing.storage.get_crawl_configuration', return_value=CONFIGURATION)
+    table = RoutingTable()
+
+    route = await table.resolve("test-endpoint")
+    assert route.configuration["url"] == "https://supabase.com/pricing"
+    get_configuration.assert_called_once_with("789")
+
+    # Second lookup is served from memory
+    assert await table.resolve("test-endpoint") is route
+    assert get_endpoint.call_count == 1
+
+@pytest.mark.asyncio
+async def test_resolve_missing_endpoint(mocker):
+    mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value=None)
+    assert await RoutingTable().resolve("missing") is None
+
+def test_load_and_invalidate(mocker):
+    mocker.patch('app.services.routing.get_custom_endpoints', return_value=Mock(data=[ENDPOINT]))
+    mocker.patch('app.services.routing.get_crawl_configurations_by_ids', return_value=Mock(data=[CONFIGURATION]))
+    table = RoutingTable()
+    assert table.load() == 1
+
+    table.update_configuration({**CONFIGURATION, "url": "https://example.com"})
+    assert table.routes["test-endpoint"].configuration["url"] == "https://example.com"
+
+    table.invalidate_configuration("789")
+    assert "test-endpoint" not in table.routes
+
+@pytest.mark.asyncio
+async def test_resolve_rejects_another_users_configuration(mocker):
+    mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value=ENDPOINT)
+    mocker.patch('app.services.routing.storage.get_crawl_configuration', return_value={**CONFIGURATION, "user_id": "999"})
+    assert await RoutingTable().resolve("test-endpoint") is None
+
+def test_load_skips_another_users_configuration(mocker):
+    mocker.patch('app.services.routing.get_custom_endpoints', return_value=Mock(data=[ENDPOINT]))
+    mocker.patch('app.services.routing.get_crawl_configurations_by_ids', return_value=Mock(data=[{**CONFIGURATION, "user_id": "999"}]))
+    assert RoutingTable().load() == 0
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_workers(mocker, tmp_path):
+    get_endpoint = mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value=ENDPOINT)
+    mocker.patch('app.services.routing.storage.get_crawl_configuration', return_value=CONFIGURATION)
+    path = str(tmp_path / "counters.bin")
+    first = RoutingTable(counters=SharedCounters(path, stripes=1))
+    second = RoutingTable(counters=SharedCounters(path, stripes=1))
+    await first.resolve("test-endpoint")
+    await second.resolve("test-endpoint")
+
+    first.invalidate_configuration("789")
+    get_endpoint.return_value = None
+    assert await second.resolve("test-endpoint") is None
+
+@pytest.mark.asyncio
+async def test_routes_expire_after_ttl(mocker):
+    get_endpoint = mocker.patch('app.services.routing.storage.get_custom_endpoint', return_value=ENDPOINT)
+    mocker.patch('app.services.routing.storage.get_crawl_configuration', return_value=CONFIGURATION)
+    table = RoutingTable(ttl=0)
+    await table.resolve("test-endpoint")
+    await table.resolve("test-endpoint")
+    assert get_endpoint.call_count == 2
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from app.services.scheduler import FairScheduler, QueueFullError, INTERACTIVE, BULK
+
+async def _order_of_service(scheduler, requests):
+    served = []
+
+    async def run(user_id, priority):
+        async with scheduler.slot(user_id, priority):
+            served.append((user_id, priority))
+            await asyncio.sleep(0)
+
+    tasks = [asyncio.create_task(run(user_id, priority)) for user_id, priority in requests]
+    await asyncio.gather(*tasks)
+    return served
+
+@pytest.mark.asyncio
+async def test_users_are_served_round_robin():
+    scheduler = FairScheduler(max_concurrency=1, user_max_concurrency=1, user_max_queued=10)
+    blocker = await scheduler.acquire("blocker")
+    requests = [("heavy", BULK)] * 3 + [("light", BULK)] * 2
+    task = asyncio.create_task(_order_of_service(scheduler, requests))
+    while scheduler.stats()[BULK]["queued"] < len(requests):
+        await asyncio.sleep(0)
+    scheduler.release("blocker")
+    served = await task
+    assert [user_id for user_id, _ in served] == ["heavy", "light", "heavy", "light", "heavy"]
+
+@pytest.mark.asyncio
+async def test_interactive_goes_first_and_has_reserved_slots():
+    scheduler = FairScheduler(max_concurrency=2, user_max_concurrency=5, user_max_queued=10, interactive_reserved=1)
+    await scheduler.acquire("bulk-user", BULK)
+    queued_bulk = asyncio.create_task(scheduler.acquire("bulk-user", BULK))
+    await asyncio.sleep(0)
+    assert not queued_bulk.done()
+
+    wait = await asyncio.wait_for(scheduler.acquire("web-user", INTERACTIVE), timeout=1)
+    assert wait >= 0
+    assert scheduler.stats()[INTERACTIVE]["queue_wait"]["count"] == 1
+    scheduler.release("bulk-user", BULK)
+    await asyncio.wait_for(queued_bulk, timeout=1)
+
+@pytest.mark.asyncio
+async def test_slot_reports_time_spent_queued():
+    scheduler = FairScheduler(max_concurrency=1, user_max_concurrency=1, user_max_queued=10)
+    await scheduler.acquire("first")
+
+    async def queued():
+        async with scheduler.slot("second") as wait:
+            return wait
+
+    task = asyncio.create_task(queued())
+    await asyncio.sleep(0.05)
+    scheduler.release("first")
+    assert await asyncio.wait_for(task, timeout=1) >= 0.05
+
+@pytest.mark.asyncio
+async def test_per_user_concurrency_and_queue_depth():
+    scheduler = FairScheduler(max_concurrency=4, user_max_concurrency=1, user_max_queued=1)
+    await scheduler.acquire("user")
+    queued = asyncio.create_task(scheduler.acquire("user"))
+    await asyncio.sleep(0)
+    assert not queued.done()
+    with pytest.raises(QueueFullError):
+        await scheduler.acquire("user")
+    assert scheduler.stats()[BULK]["rejected"] == 1
+
+    # Other users still get the idle capacity
+    await asyncio.wait_for(scheduler.acquire("other"), timeout=1)
+    scheduler.release("user")
+    await asyncio.wait_for(queued, timeout=1)
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = FairScheduler(max_concurrency=1, user_max_concurrency=1, user_max_queued=10)
+    await scheduler.acquire("first")
+    waiting = asyncio.create_task(scheduler.acquire("second"))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    scheduler.release("first")
+    assert scheduler.users == {}
+    assert scheduler.running == {INTERACTIVE: 0, BULK: 0}
+
+def test_weights_must_be_positive():
+    scheduler = FairScheduler(max_concurrency=1, user_max_concurrency=1, user_max_queued=1)
+    with pytest.raises(ValueError):
+        scheduler.set_weight("user", 0)
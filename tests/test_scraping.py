@@ -4,6 +4,7 @@ from app.main import app
 from app.services.scraping_service import scrape_url
 from unittest.mock import AsyncMock, patch, Mock
 from app.core.security import create_access_token
+from benchmarks.fixture_server import FixtureServer
 
 
 
@@ -25,14 +26,15 @@ def mock_crawl4ai(mocker):
 
 @pytest.mark.asyncio
 async def test_scrape_url():
-    url = "https://www.coinbase.com/explore"
     selectors = {
         "title": "h1",
         "description": "meta[name='description']::attr(content)",
         "first_paragraph": "p:first-of-type"
     }
 
-    result = await scrape_url(url, selectors)
+    # Scrape the local corpus instead of a live site
+    with FixtureServer() as server:
+        result = await scrape_url(server.url("small"), selectors)
     print(result)
 
     assert "data" in result
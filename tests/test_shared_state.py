@@ -0,0 +1,59 @@
+import time
+from limits import RateLimitItemPerMinute
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from app.services.shared_state import SharedCounters, SharedBlobStore
+
+def test_counters_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "counters.bin")
+    first = SharedCounters(path, stripes=8, slots_per_stripe=4)
+    second = SharedCounters(path, stripes=8, slots_per_stripe=4)
+    assert first.incr("client", 60) == 1
+    assert second.incr("client", 60) == 2
+    assert first.get("client") == 2
+    second.clear("client")
+    assert first.get("client") == 0
+
+def test_counters_restart_after_expiry(tmp_path):
+    counters = SharedCounters(str(tmp_path / "counters.bin"), stripes=1, slots_per_stripe=2)
+    counters.incr("client", 0.01, amount=5)
+    time.sleep(0.02)
+    assert counters.get("client") == 0
+    assert counters.incr("client", 60) == 1
+
+def test_full_stripe_reuses_the_slot_closest_to_expiry(tmp_path):
+    counters = SharedCounters(str(tmp_path / "counters.bin"), stripes=1, slots_per_stripe=2)
+    counters.incr("short", 10)
+    counters.incr("long", 100)
+    counters.incr("new", 50)
+    assert counters.get("short") == 0
+    assert counters.get("long") == 1
+    assert counters.get("new") == 1
+
+def test_limits_storage_enforces_one_limit_across_instances(tmp_path):
+    uri = f"shm://{tmp_path}/ratelimit.bin"
+    workers = [FixedWindowRateLimiter(storage_from_string(uri)) for _ in range(2)]
+    limit = RateLimitItemPerMinute(3)
+    allowed = [workers[i % 2].hit(limit, "client") for i in range(5)]
+    assert allowed == [True, True, True, False, False]
+
+def test_blob_store_expiry_and_size_bound(tmp_path):
+    store = SharedBlobStore(str(tmp_path), max_bytes=100, sweep_every=1000)
+    store.set("gone", b"x", ttl=-1)
+    assert store.get("gone") is None
+    assert store.get("missing") is None
+
+    store.set("old", b"a" * 60, ttl=60)
+    time.sleep(0.01)
+    store.set("new", b"b" * 60, ttl=60)
+    assert store.get("old") == b"a" * 60
+    assert store.sweep() == 2
+    assert store.get("old") is None
+    assert store.get("new") == b"b" * 60
+
+def test_blob_store_treats_truncated_files_as_misses(tmp_path):
+    store = SharedBlobStore(str(tmp_path), max_bytes=100)
+    for content in (b"", b"\x01\x02\x03"):
+        with open(store._path("broken"), "wb") as f:
+            f.write(content)
+        assert store.get("broken") is None
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.lifespan import lifespan
+from app.db.database import LazySupabaseClient
+from app.main import create_app
+from app.services.response_encoding import encoded_responses, encode_json, make_etag
+from benchmarks.fake_supabase import FakeSupabase
+
+def test_importing_app_defers_heavy_dependencies():
+    code = (
+        "import sys, app.main; "
+        "print(','.join(name for name in ('crawl4ai', 'bs4', 'passlib', 'supabase') if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    assert result.stdout.strip() == ""
+
+def test_lifespan_reports_phases_and_warms_cached_responses(mocker):
+    fake = FakeSupabase()
+    mocker.patch('app.db.database.supabase', fake)
+    connect = mocker.patch.object(LazySupabaseClient, "connect")
+    mocker.patch.object(settings, "WARMUP_CACHED_RESPONSES", 10)
+    body = encode_json({"title": "Warm"})
+    fake.write("cache", {
+        "configuration_id": "config",
+        "cache_key": "warm-endpoint:",
+        "cache_value": {"title": "Warm"},
+        "etag": make_etag(body),
+        "expires_at": (datetime.utcnow() + timedelta(minutes=5)).isoformat(),
+        "last_accessed_at": datetime.utcnow().isoformat(),
+    }, None)
+
+    app = create_app()
+    with TestClient(app):
+        phases = app.state.startup_timings
+        assert {"storage", "routing_table", "background_tasks", "warm_cached_responses"} <= set(phases)
+        assert "warm_browser" not in phases
+        assert encoded_responses.get(make_etag(body)).body == body
+    # The swapped-in client is used as is; no real one is built
+    connect.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_lifespan_waits_for_background_tasks_on_shutdown(mocker):
+    finished = []
+
+    async def background(*args):
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            await asyncio.sleep(0)
+            finished.append(True)
+
+    mocker.patch('app.db.database.supabase', FakeSupabase())
+    mocker.patch('app.core.lifespan.run_checkpoints', side_effect=background)
+    mocker.patch('app.core.lifespan.run_sweeper', side_effect=background)
+    async with lifespan(create_app()):
+        # Let the background tasks start
+        await asyncio.sleep(0.01)
+    assert finished == [True, True]
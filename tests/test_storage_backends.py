@@ -0,0 +1,91 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from app.db.backends.memory_backend import MemoryBackend
+from app.db.backends.supabase_backend import SupabaseBackend
+from app.db.backends.postgres_backend import PostgresBackend
+from app.db.storage import create_storage
+from postgrest.exceptions import APIError
+from benchmarks.fake_supabase import FakeQuery, FakeSupabase
+
+CONFIGURATION_ID = str(uuid.uuid4())
+
+@pytest.fixture(params=["memory", "supabase"])
+def backend(request, mocker):
+    if request.param == "memory":
+        return MemoryBackend()
+    mocker.patch('app.db.database.supabase', FakeSupabase())
+    return SupabaseBackend()
+
+def _in(minutes: int) -> str:
+    return (datetime.utcnow() + timedelta(minutes=minutes)).isoformat()
+
+@pytest.mark.asyncio
+async def test_cache_round_trip_and_upsert(backend):
+    await backend.connect()
+    assert await backend.get_cache(CONFIGURATION_ID, "key") is None
+    await backend.set_cache(CONFIGURATION_ID, "key", {"v": 1}, _in(5), etag='"a"')
+    await backend.set_cache(CONFIGURATION_ID, "key", {"v": 2}, _in(5), etag='"b"')
+    row = await backend.get_cache(CONFIGURATION_ID, "key")
+    assert row["cache_value"] == {"v": 2}
+    assert row["etag"] == '"b"'
+    assert row["size_bytes"] == len(b'{"v": 2}')
+    assert row["id"]
+
+@pytest.mark.asyncio
+async def test_expired_cache_is_a_miss(backend):
+    await backend.set_cache(CONFIGURATION_ID, "old", {"v": 1}, _in(-5))
+    assert await backend.get_cache(CONFIGURATION_ID, "old") is None
+
+@pytest.mark.asyncio
+async def test_cache_chunks_round_trip(backend):
+    await backend.set_cache_chunks(CONFIGURATION_ID, "chunked", '"a"', [[1, 2], [3, 4], [5]], _in(5))
+    await backend.set_cache(
+        CONFIGURATION_ID, "chunked", {"items": []}, _in(5), etag='"a"', size_bytes=20,
+        records_key="items", record_count=5, chunk_size=2
+    )
+    row = await backend.get_cache(CONFIGURATION_ID, "chunked")
+    assert (row["records_key"], row["record_count"], row["chunk_size"]) == ("items", 5, 2)
+    chunks = await backend.get_cache_chunks(CONFIGURATION_ID, "chunked", '"a"', 1, 2)
+    assert [(chunk["chunk_index"], chunk["records"]) for chunk in chunks] == [(1, [3, 4]), (2, [5])]
+    assert await backend.get_cache_chunks(CONFIGURATION_ID, "chunked", '"b"', 0, 2) == []
+
+@pytest.mark.asyncio
+async def test_missing_rows_are_none(backend):
+    assert await backend.get_custom_endpoint("missing") is None
+    assert await backend.get_crawl_configuration(CONFIGURATION_ID) is None
+    assert await backend.get_user_by_email("nobody@example.com") is None
+
+@pytest.mark.asyncio
+async def test_supabase_backend_misses_do_not_raise(mocker):
+    # PostgREST answers single() with a 406 (PGRST116) when no row matches
+    mocker.patch.object(FakeQuery, "single", side_effect=APIError({
+        "code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned",
+        "details": "Results contain 0 rows", "hint": None
+    }))
+    mocker.patch('app.db.database.supabase', FakeSupabase())
+    backend = SupabaseBackend()
+    assert await backend.get_cache(CONFIGURATION_ID, "missing") is None
+    assert await backend.get_custom_endpoint("missing") is None
+    assert await backend.get_crawl_configuration(CONFIGURATION_ID) is None
+
+def test_create_storage_selects_backend(mocker):
+    assert isinstance(create_storage("memory"), MemoryBackend)
+    assert isinstance(create_storage("supabase"), SupabaseBackend)
+    mocker.patch('app.db.storage.settings.DATABASE_URL', "")
+    with pytest.raises(ValueError):
+        create_storage("postgres")
+    with pytest.raises(ValueError):
+        create_storage("redis")
+
+@pytest.mark.database
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.environ.get("DATABASE_URL"), reason="DATABASE_URL not set")
+async def test_postgres_backend_reads_cache_and_users():
+    backend = PostgresBackend(os.environ["DATABASE_URL"], min_size=1, max_size=2)
+    try:
+        assert await backend.get_user_by_email(f"{uuid.uuid4()}@example.com") is None
+        assert await backend.get_cache(CONFIGURATION_ID, "missing") is None
+    finally:
+        await backend.close()
@@ -0,0 +1,33 @@
+import pytest
+from app.services.url_frontier import normalize_url, site_of, BloomFilter, UrlFrontier
+
+def test_normalize_url_canonicalizes():
+    assert normalize_url("HTTPS://Example.COM:443/a?b=2&a=1&utm_source=x#top") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/x") == "http://example.com:8080/x"
+
+def test_normalize_url_resolves_relative_links():
+    assert normalize_url("../b", base="https://example.com/a/c/") == "https://example.com/a/b"
+    assert normalize_url("mailto:someone@example.com", base="https://example.com/") is None
+    assert normalize_url("javascript:void(0)", base="https://example.com/") is None
+
+def test_site_of_ignores_www():
+    assert site_of("https://www.example.com/x") == "example.com"
+
+def test_bloom_filter_membership():
+    bloom = BloomFilter(capacity=1000, error_rate=1e-3)
+    assert bloom.add("https://example.com/1")
+    assert not bloom.add("https://example.com/1")
+    assert "https://example.com/1" in bloom
+    false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(1000))
+    assert false_positives < 10
+
+def test_frontier_limits():
+    frontier = UrlFrontier(max_depth=1, max_pages=2)
+    assert frontier.push("https://example.com/", 0)
+    assert not frontier.push("https://example.com/", 0)
+    assert not frontier.push("https://example.com/deep", 2)
+    assert frontier.push("https://example.com/a", 1)
+    assert not frontier.push("https://example.com/b", 1)
+    assert frontier.pop() == ("https://example.com/", 0)
+    assert len(frontier) == 1